@@ -1,32 +1,46 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, send_from_directory, make_response, Response
-from flask_mail import Mail, Message
-from supabase import create_client, Client
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, send_from_directory, send_file, Response
 import os
 from datetime import datetime, timedelta
 # Password hashing removed as per request
 from dotenv import load_dotenv
 import uuid
-import pandas as pd
-from io import BytesIO
-import base64
-import xlsxwriter
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from reportlab.lib.units import inch
+import hashlib
+import json
+import logging
+import tempfile
+# xlsxwriter and reportlab are imported inside the report generators
+# so cold starts that never build a report don't pay for them
 from werkzeug.utils import secure_filename
-from werkzeug.security import generate_password_hash, check_password_hash
+from itsdangerous import URLSafeTimedSerializer, BadSignature
 import random
 import re
+from placement_stats import PlacementStats, PlacementSummary, OFFER_STATUS, sort_students_by_priority, ensure_priority_order, parse_hiring_rounds, summarize_students, first_offer_per_student, normalize_student_number
+from query_cache import QueryCache
+from supabase_clients import build_clients, SharedPool
+from query_batch import fetch_all
+from company_listing import CARD_COLUMNS, ADMIN_COLUMNS, ADMIN_PAGE_SIZE, DEFAULT_PAGE_SIZE, parse_listing_args
+from report_jobs import ArtifactStore, ReportJobs, DONE, FAILED, EXTENSIONS
+from repositories import Repositories, SupabaseBackend, DuplicateKeyError
+from request_metrics import MetricsRegistry, InstrumentedBackend, init_app as init_request_metrics
+from storage_uploads import SupabaseStorage, StorageError
+from local_storage import LocalStorage
+from student_import import MAX_IMPORT_ROWS, read_sheet, round_values, parse_students, import_students as run_student_import
+from http_caching import row_validators, conditional_response, init_static_caching
+from sitemap import SitemapCache
+from email_outbox import EmailOutbox, SMTPConnection
+from password_hashing import PasswordHasher
+from rate_limiting import RateLimiter, Limit, create_store as create_bucket_store
+from session_store import ServerSideSessionInterface, ProfileCache, create_store, PROFILE_COLUMNS
 
 # Load environment variables from .env file
 load_dotenv()
 
+logger = logging.getLogger('placement_tracker.app')
+
 app = Flask(__name__)
 app.secret_key = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key')
 
-# Flask-Mail configuration
+# Outgoing mail (SMTP) configuration
 app.config['MAIL_SERVER'] = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
 app.config['MAIL_PORT'] = int(os.getenv('MAIL_PORT', 587))
 app.config['MAIL_USE_TLS'] = os.getenv('MAIL_USE_TLS', 'True').lower() == 'true'
@@ -34,8 +48,6 @@ app.config['MAIL_USERNAME'] = os.getenv('MAIL_USERNAME', 'placementtrackergmrit@
 app.config['MAIL_PASSWORD'] = os.getenv('MAIL_PASSWORD', '')
 app.config['MAIL_DEFAULT_SENDER'] = os.getenv('MAIL_DEFAULT_SENDER', 'placementtrackergmrit@gmail.com')
 
-mail = Mail(app)
-
 # File upload configuration for Supabase Storage
 ALLOWED_EXTENSIONS = {'pdf'}
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
@@ -45,26 +57,157 @@ SUPABASE_URL = os.getenv('SUPABASE_URL')
 SUPABASE_ANON_KEY = os.getenv('SUPABASE_ANON_KEY')
 SUPABASE_SERVICE_KEY = os.getenv('SUPABASE_SERVICE_KEY')
 
-# Initialize Supabase client
-supabase = None
-supabase_admin = None  # For storage operations that require elevated permissions
+# One keep-alive connection pool (HTTP/2 where available) for every Supabase call;
+# size it to cover QUERY_BATCH_WORKERS times the request threads per process
+supabase_pool = SharedPool(
+    max_connections=int(os.getenv('SUPABASE_POOL_SIZE', 20)),
+    keepalive_expiry=float(os.getenv('SUPABASE_POOL_KEEPALIVE', 60)),
+    http2=os.getenv('SUPABASE_HTTP2', 'true').lower() == 'true',
+    connect_timeout=float(os.getenv('SUPABASE_CONNECT_TIMEOUT', 5)),
+    read_timeout=float(os.getenv('SUPABASE_READ_TIMEOUT', 30)),
+    pool_timeout=float(os.getenv('SUPABASE_POOL_TIMEOUT', 10)),
+    retries=int(os.getenv('SUPABASE_RETRIES', 2))
+)
 
-if SUPABASE_URL and SUPABASE_ANON_KEY:
-    try:
-        # Regular client for database operations
-        supabase = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
-        
-        # Admin client for storage operations (if service key is available)
-        if SUPABASE_SERVICE_KEY:
-            supabase_admin = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
-        else:
-            print("Warning: SUPABASE_SERVICE_KEY not found. Storage operations may fail due to RLS policies.")
-            supabase_admin = supabase  # Fallback to regular client
-            
-    except Exception as e:
-        print(f"Error initializing Supabase client: {str(e)}")
-        supabase = None
-        supabase_admin = None
+# Initialize Supabase clients. They are built on first use, not at import time;
+# supabase_admin is for storage operations that require elevated permissions.
+supabase, supabase_admin = build_clients(SUPABASE_URL, SUPABASE_ANON_KEY, SUPABASE_SERVICE_KEY, supabase_pool)
+
+# Per-route latency, query and render timings (see /admin/metrics)
+metrics = MetricsRegistry()
+metrics.add_collector(supabase_pool.metric_lines)
+init_request_metrics(app, metrics, log_requests=os.getenv('REQUEST_LOG', 'true').lower() == 'true')
+
+# Student passwords: werkzeug method and cost from PASSWORD_HASH_METHOD, hashed on a
+# pool of PASSWORD_HASH_WORKERS threads (one per core by default). Hashes made with
+# older parameters are upgraded on the next successful login.
+password_hasher = PasswordHasher(
+    os.getenv('PASSWORD_HASH_METHOD', 'scrypt'),
+    salt_length=int(os.getenv('PASSWORD_SALT_LENGTH', 16)),
+    workers=int(os.getenv('PASSWORD_HASH_WORKERS', 0)) or None,
+    metrics=metrics
+)
+
+# Token bucket limits on the credential and OTP forms, checked before the view runs:
+# a throttled POST gets a 429 without touching the database, SMTP or the hasher.
+# IP buckets are loose (a campus shares a few addresses), email buckets are tight.
+RATE_LIMITS = {
+    'student_login': [Limit('ip', 60, 60), Limit('email', 5, 300)],
+    'admin_authenticate': [Limit('ip', 10, 300), Limit('email', 5, 300)],
+    'student_forgot_password': [Limit('ip', 20, 600), Limit('email', 3, 900)],
+    'student_reset_password': [Limit('ip', 30, 600), Limit('email', 5, 600)],
+    'student_register': [Limit('ip', 30, 600)]
+}
+rate_limiter = RateLimiter(
+    create_bucket_store(os.getenv('RATE_LIMIT_BACKEND', 'memory').lower(),
+                        os.getenv('RATE_LIMIT_PATH', os.path.join(tempfile.gettempdir(), 'placement_rate_limits.sqlite3'))),
+    RATE_LIMITS,
+    metrics,
+    trusted_proxies=int(os.getenv('RATE_LIMIT_TRUSTED_PROXIES', 1)),
+    enabled=os.getenv('RATE_LIMITS_ENABLED', 'true').lower() == 'true'
+)
+rate_limiter.init_app(app)
+
+# OTP emails are queued in a local SQLite outbox and sent by a background
+# worker over one kept-alive SMTP session, rate limited and retried. Serverless
+# instances (Vercel) stop background threads after the response and lose /tmp,
+# so there EMAIL_DELIVERY defaults to `inline`: sent inside the request.
+EMAIL_DELIVERY = os.getenv('EMAIL_DELIVERY', 'inline' if os.getenv('VERCEL') else 'background').lower()
+email_outbox = EmailOutbox(
+    os.getenv('EMAIL_OUTBOX_PATH', os.path.join(tempfile.gettempdir(), 'placement_outbox.sqlite3')),
+    SMTPConnection(app.config['MAIL_SERVER'], app.config['MAIL_PORT'], app.config['MAIL_USE_TLS'],
+                   app.config['MAIL_USERNAME'], app.config['MAIL_PASSWORD']),
+    app.config['MAIL_DEFAULT_SENDER'],
+    metrics,
+    rate_per_minute=int(os.getenv('EMAIL_RATE_PER_MINUTE', 30)),
+    max_attempts=int(os.getenv('EMAIL_MAX_ATTEMPTS', 5)),
+    background=EMAIL_DELIVERY != 'inline'
+)
+
+# Public pages answer conditional GETs with 304 and can be kept by the Vercel
+# edge for EDGE_CACHE_TTL seconds (anonymous visitors only); static URLs are
+# versioned by content hash and cached for a year
+EDGE_CACHE_TTL = int(os.getenv('EDGE_CACHE_TTL', 300))
+init_static_caching(app)
+
+# Table access goes through the repositories; swap the backend (see
+# sqlite_backend.py) to run the app without a Supabase project
+repos = Repositories(InstrumentedBackend(SupabaseBackend(supabase), metrics))
+
+# Model papers are streamed to Supabase Storage (resumable above 6MB) or
+# uploaded by the browser to a signed URL. LOCAL_STORAGE_DIR swaps in a local
+# stand-in with the same contract for offline development.
+MODEL_PAPER_BUCKET = 'model-papers'
+MODEL_PAPER_UPLOAD_TTL = int(os.getenv('MODEL_PAPER_UPLOAD_TTL', 900))  # Seconds to finish a signed upload
+if os.getenv('LOCAL_STORAGE_DIR'):
+    paper_storage = LocalStorage(os.getenv('LOCAL_STORAGE_DIR'), MODEL_PAPER_BUCKET, app.secret_key,
+                                 '/local-storage/storage/v1', metrics)
+    app.register_blueprint(paper_storage.blueprint, url_prefix='/local-storage/storage/v1')
+elif SUPABASE_URL and SUPABASE_ANON_KEY:
+    paper_storage = SupabaseStorage(SUPABASE_URL, SUPABASE_SERVICE_KEY or SUPABASE_ANON_KEY, MODEL_PAPER_BUCKET, metrics,
+                                    timeout=float(os.getenv('STORAGE_UPLOAD_TIMEOUT', 60)), pool=supabase_pool)
+else:
+    paper_storage = None
+paper_upload_tickets = URLSafeTimedSerializer(app.secret_key, salt='model-paper-upload')
+# Keys are unique per upload, so a key's download redirect only changes when the paper is deleted
+MODEL_PAPER_REDIRECT_MAX_AGE = 3600
+
+# Read-through cache for companies / selected_students / model_papers reads.
+# Admin write routes invalidate the entries they affect.
+query_cache = QueryCache(
+    max_entries=int(os.getenv('QUERY_CACHE_MAX_ENTRIES', 256)),
+    max_rows=int(os.getenv('QUERY_CACHE_MAX_ROWS', 50000)),
+    ttl=int(os.getenv('QUERY_CACHE_TTL', 300))
+)
+
+# Sessions: SESSION_BACKEND=memory|sqlite|redis keeps them server-side with only a
+# signed id in the cookie; the default `cookie` keeps Flask's signed cookie (the
+# only one that works across serverless instances). Either way the student profile
+# the dashboard shows is cached in the store, dropped when a password reset
+# updates the row.
+SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'cookie').lower()
+session_store = create_store(
+    SESSION_BACKEND,
+    path=os.getenv('SESSION_STORE_PATH', os.path.join(tempfile.gettempdir(), 'placement_sessions.sqlite3')),
+    url=os.getenv('SESSION_REDIS_URL', 'redis://localhost:6379/0')
+)
+if SESSION_BACKEND != 'cookie':
+    app.session_interface = ServerSideSessionInterface(session_store)
+
+def load_student_profile(student_id):
+    """The studentdetails fields in PROFILE_COLUMNS, or None for an unknown id"""
+    rows = repos.student_details.select(PROFILE_COLUMNS, id=student_id)
+    return rows[0] if rows else None
+
+student_profiles = ProfileCache(session_store, load_student_profile, ttl=int(os.getenv('STUDENT_PROFILE_TTL', 300)))
+
+def cached_select(table, columns='*', **filters):
+    """Select rows from a table with equality filters, served from query_cache when fresh"""
+    return query_cache.get_or_load(table, columns, filters,
+                                   lambda: repos.for_table(table).select(columns, **filters))
+
+def list_companies(args, columns=CARD_COLUMNS, default_page_size=DEFAULT_PAGE_SIZE):
+    """One page of the filtered companies listing, served from query_cache when fresh"""
+    listing = parse_listing_args(args, default_page_size)
+    return query_cache.get_or_load('companies', columns, listing,
+                                   lambda: repos.companies.page(listing, columns))
+
+def load_company_students(company_id):
+    """A company's students in priority order, ordered by the database on the indexed priority_rank"""
+    def load():
+        try:
+            return ensure_priority_order(repos.students.for_company(company_id, ordered=True))
+        except Exception as e:
+            logger.warning('priority_rank unavailable, sorting students in Python: %s', e)
+            return sort_students_by_priority(repos.students.for_company(company_id))
+    return query_cache.get_or_load('selected_students', '*', {'company_id': company_id}, load)
+
+def load_company_rounds(company_id):
+    """Company name and hiring round names used by the student forms"""
+    company_rows = cached_select('companies', 'name, hiring_rounds', id=company_id)
+    if company_rows:
+        return company_rows[0]['name'], parse_hiring_rounds(company_rows[0])
+    return 'Unknown', []
 
 def allowed_file(filename):
     return '.' in filename and \
@@ -85,7 +228,7 @@ def test_supabase_storage():
 @app.route('/')
 def index():
     """Home page"""
-    return render_template('home.html')
+    return conditional_response(lambda: render_template('home.html'), shared_max_age=EDGE_CACHE_TTL)
 
 @app.route('/companies')
 def companies():
@@ -95,71 +238,50 @@ def companies():
         flash('Please login to view placement companies.', 'warning')
         return redirect(url_for('index'))
     
-    if not supabase:
+    if not repos:
         return render_template('index.html', companies=[])
     
     try:
-        # Fetch all companies from Supabase
-        response = supabase.table('companies').select('*').execute()
-        companies_list = response.data
-        return render_template('index.html', companies=companies_list)
+        # Fetch one page of companies, filtered and projected on the server
+        page = list_companies(request.args)
+        return render_template('index.html', companies=page['rows'], next_cursor=page['next_cursor'], total_companies=page['total'])
     except Exception as e:
         flash(f'Error loading companies: {str(e)}', 'error')
         return render_template('index.html', companies=[])
 
-def sort_students_by_priority(students):
-    """Sort students by priority: Got Offer first, then by rounds descending, then Others last"""
-    def get_sort_key(student):
-        max_round = student['max_round_reached']
-        
-        # Priority 1: Students with "Got Offer" (highest priority = 0)
-        if max_round == 'Got Offer':
-            return (0, 0, student['name'])  # Sort by name as tiebreaker
-        
-        # Priority 3: Students with "Others" (lowest priority = 2)
-        elif max_round == 'Others':
-            return (2, 0, student['name'])  # Sort by name as tiebreaker
-        
-        # Priority 2: Students with rounds (middle priority = 1)
-        elif max_round.startswith('Round '):
-            try:
-                # Extract round number for descending sort
-                round_num = int(max_round.split(' ')[1])
-                return (1, -round_num, student['name'])  # Negative for descending order
-            except (ValueError, IndexError):
-                # If round parsing fails, treat as Others
-                return (2, 0, student['name'])
-        
-        # Default case: treat as Others
-        else:
-            return (2, 0, student['name'])
+@app.route('/api/companies')
+def api_companies():
+    """Paginated companies listing as JSON (same filters as /companies)"""
+    if 'user_id' not in session and 'student_id' not in session and not session.get('admin_logged_in'):
+        return jsonify({'error': 'Login required'}), 401
     
-    return sorted(students, key=get_sort_key)
+    try:
+        page = list_companies(request.args)
+        return jsonify({'companies': page['rows'], 'next_cursor': page['next_cursor'], 'total': page['total']})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
 @app.route('/company/<company_id>')
 def company_details(company_id):
     """Display detailed view of a specific company"""
     try:
-        # Fetch company details
-        company_response = supabase.table('companies').select('*').eq('id', company_id).execute()
-        if not company_response.data:
+        # Fetch company details, its selected students and model papers concurrently
+        company_rows, students, model_papers = fetch_all(
+            lambda: cached_select('companies', id=company_id),
+            lambda: load_company_students(company_id),
+            lambda: cached_select('model_papers', company_id=company_id)
+        )
+        if not company_rows:
             flash('Company not found', 'error')
             return redirect(url_for('index'))
         
-        company = company_response.data[0]
-        
-        # Fetch selected students for this company
-        students_response = supabase.table('selected_students').select('*').eq('company_id', company_id).execute()
-        students = students_response.data
-        
-        # Sort students by priority: Got Offer first, then by rounds descending, then Others last
-        students = sort_students_by_priority(students)
-        
-        # Fetch model papers for this company
-        model_papers_response = supabase.table('model_papers').select('*').eq('company_id', company_id).execute()
-        model_papers = model_papers_response.data
+        company = company_rows[0]
         
-        return render_template('company_details.html', company=company, students=students, model_papers=model_papers)
+        # Students and browsers revalidate with the ETag and get a 304 instead of a re-render
+        etag, last_modified = row_validators(company_rows, students, model_papers)
+        return conditional_response(
+            lambda: render_template('company_details.html', company=company, students=students, model_papers=model_papers),
+            etag, last_modified, shared_max_age=EDGE_CACHE_TTL, stale_while_revalidate=60)
     except Exception as e:
         flash(f'Error loading company details: {str(e)}', 'error')
         return redirect(url_for('index'))
@@ -179,44 +301,36 @@ def admin_authenticate():
     ADMIN_EMAIL = 'bhargavtheadmin@gmail.com'
     ADMIN_PASSWORD = 'Bhargav@123'
     
-    print(f"\n=== Authentication Attempt ===")
-    print(f"Email: {email}")
-    print(f"Expected email: {ADMIN_EMAIL}")
-    print(f"Password: {password}")
-    print(f"Expected password: {ADMIN_PASSWORD}")
-    
     try:
         # Bypass database check temporarily for testing
         if email == ADMIN_EMAIL and password == ADMIN_PASSWORD:
             session['admin_logged_in'] = True
             session['admin_email'] = email
             flash('Login successful! (Using hardcoded credentials)', 'success')
-            print("Authentication successful with hardcoded credentials!")
+            logger.info('Admin login for %s with hardcoded credentials', email)
             return redirect(url_for('admin_dashboard'))
         else:
-            print("Invalid credentials provided or You are an invalid user")
+            logger.debug('Hardcoded admin credentials did not match for %s', email)
             
         # Original database check (kept for reference)
         try:
-            print("\nAttempting database authentication...")
-            response = supabase.table('admins').select('*').eq('email', email).execute()
-            print(f"Database response: {response}")
+            admin = repos.admins.get_by_email(email)
             
-            if response.data and response.data[0]['password_hash'] == password:
+            if admin and admin['password_hash'] == password:
                 session['admin_logged_in'] = True
                 session['admin_email'] = email
+                logger.info('Admin login for %s via database', email)
                 flash('Login successful! (Via database)', 'success')
                 return redirect(url_for('admin_dashboard'))
         except Exception as db_error:
-            print(f"Database error: {str(db_error)}")
+            logger.warning('Admin database authentication failed: %s', db_error)
         
+        logger.warning('Failed admin login for %s', email)
         flash('Invalid email or password', 'error')
         return redirect(url_for('admin_login'))
         
     except Exception as e:
-        print(f"\nAuthentication error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception('Admin authentication error')
         flash('An error occurred during authentication', 'error')
         return redirect(url_for('admin_login'))
 
@@ -228,11 +342,10 @@ def admin_dashboard():
         return redirect(url_for('admin_login'))
     
     try:
-        # Fetch all companies for admin view
-        companies_response = supabase.table('companies').select('*').execute()
-        companies = companies_response.data
+        # Fetch one page of companies for admin view
+        page = list_companies(request.args, ADMIN_COLUMNS, ADMIN_PAGE_SIZE)
         
-        return render_template('admin_dashboard.html', companies=companies)
+        return render_template('admin_dashboard.html', companies=page['rows'], next_cursor=page['next_cursor'], total_companies=page['total'])
     except Exception as e:
         flash(f'Error loading dashboard: {str(e)}', 'error')
         return render_template('admin_dashboard.html', companies=[])
@@ -258,7 +371,8 @@ def add_company():
                 'created_at': datetime.now().isoformat()
             }
             
-            response = supabase.table('companies').insert(company_data).execute()
+            rows = repos.companies.create(company_data)
+            query_cache.invalidate_rows('companies', rows)
             flash('Company added successfully!', 'success')
             return redirect(url_for('admin_dashboard'))
         except Exception as e:
@@ -286,7 +400,8 @@ def edit_company(company_id):
                 'updated_at': datetime.now().isoformat()
             }
             
-            response = supabase.table('companies').update(company_data).eq('id', company_id).execute()
+            repos.companies.update(company_id, company_data)
+            query_cache.invalidate('companies', id=company_id)
             flash('Company updated successfully!', 'success')
             return redirect(url_for('admin_dashboard'))
         except Exception as e:
@@ -294,12 +409,11 @@ def edit_company(company_id):
     
     try:
         # Fetch company details for editing
-        response = supabase.table('companies').select('*').eq('id', company_id).execute()
-        if not response.data:
+        company = repos.companies.get(company_id)
+        if not company:
             flash('Company not found', 'error')
             return redirect(url_for('admin_dashboard'))
         
-        company = response.data[0]
         return render_template('edit_company.html', company=company)
     except Exception as e:
         flash(f'Error loading company: {str(e)}', 'error')
@@ -313,9 +427,12 @@ def delete_company(company_id):
     
     try:
         # Delete associated students first
-        supabase.table('selected_students').delete().eq('company_id', company_id).execute()
+        repos.students.delete_for_company(company_id)
         # Delete company
-        supabase.table('companies').delete().eq('id', company_id).execute()
+        repos.companies.delete(company_id)
+        query_cache.invalidate('companies', id=company_id)
+        query_cache.invalidate('selected_students', company_id=company_id)
+        query_cache.invalidate('model_papers', company_id=company_id)  # Removed by ON DELETE CASCADE
         flash('Company deleted successfully!', 'success')
     except Exception as e:
         flash(f'Error deleting company: {str(e)}', 'error')
@@ -330,21 +447,16 @@ def add_student(company_id):
     
     if request.method == 'POST':
         try:
-            student_number = request.form.get('student_number')
+            student_number = normalize_student_number(request.form.get('student_number'))
             
-            # Check for duplicate student by roll number within the same company
-            existing_student = supabase.table('selected_students').select('*').eq('student_number', student_number).eq('company_id', company_id).execute()
-            if existing_student.data:
+            # Check for duplicate student by roll number within the same company,
+            # loading the company info for a form reload at the same time
+            number_taken, (company_name, company_rounds) = fetch_all(
+                lambda: repos.students.number_taken(company_id, student_number),
+                lambda: load_company_rounds(company_id)
+            )
+            if number_taken:
                 flash(f'Student with roll number {student_number} already exists in this company!', 'error')
-                # Get company info for form reload
-                company_response = supabase.table('companies').select('name, hiring_rounds').eq('id', company_id).execute()
-                if company_response.data:
-                    company_name = company_response.data[0]['name']
-                    hiring_rounds_str = company_response.data[0].get('hiring_rounds', '')
-                    company_rounds = [r.strip() for r in hiring_rounds_str.split(',') if r.strip()]
-                else:
-                    company_name = 'Unknown'
-                    company_rounds = []
                 return render_template('add_student.html', company_id=company_id, company_name=company_name, company_rounds=company_rounds)
             
             student_data = {
@@ -357,7 +469,8 @@ def add_student(company_id):
                 'created_at': datetime.now().isoformat()
             }
             
-            response = supabase.table('selected_students').insert(student_data).execute()
+            rows = repos.students.create(student_data)
+            query_cache.invalidate_rows('selected_students', rows, company_id=company_id)
             flash('Student added successfully!', 'success')
             return redirect(url_for('company_details', company_id=company_id))
         except Exception as e:
@@ -365,19 +478,138 @@ def add_student(company_id):
     
     try:
         # Get company name and rounds for context
-        company_response = supabase.table('companies').select('name, hiring_rounds').eq('id', company_id).execute()
-        if company_response.data:
-            company_name = company_response.data[0]['name']
-            hiring_rounds_str = company_response.data[0].get('hiring_rounds', '')
-            company_rounds = [r.strip() for r in hiring_rounds_str.split(',') if r.strip()]
-        else:
-            company_name = 'Unknown'
-            company_rounds = []
+        company_name, company_rounds = load_company_rounds(company_id)
         return render_template('add_student.html', company_id=company_id, company_name=company_name, company_rounds=company_rounds)
     except Exception as e:
         flash(f'Error loading form: {str(e)}', 'error')
         return redirect(url_for('admin_dashboard'))
 
+@app.route('/admin/import_students/<company_id>', methods=['GET', 'POST'])
+def import_students(company_id):
+    """Add or update a company's students from a CSV/XLSX result sheet"""
+    if not session.get('admin_logged_in'):
+        return redirect(url_for('admin_login'))
+    
+    try:
+        company_name, company_rounds = load_company_rounds(company_id)
+    except Exception as e:
+        flash(f'Error loading company: {str(e)}', 'error')
+        return redirect(url_for('admin_dashboard'))
+    
+    result = None
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            flash('Please choose a CSV or Excel file to import', 'error')
+        else:
+            try:
+                records, errors = parse_students(read_sheet(upload.stream, upload.filename), company_id, company_rounds, validate_student_number)
+                rows, added, updated = run_student_import(repos.students, company_id, records, errors)
+                query_cache.invalidate('selected_students', company_id=company_id)
+                result = {'added': added, 'updated': updated, 'errors': errors}
+                if added or updated:
+                    flash(f'Imported {added + updated} students ({added} added, {updated} updated)', 'success')
+                if errors:
+                    flash(f'{len(errors)} rows were not imported, see the list below', 'error')
+            except Exception as e:
+                flash(f'Error importing students: {str(e)}', 'error')
+    
+    return render_template('import_students.html', company_id=company_id, company_name=company_name,
+                           company_rounds=company_rounds, result=result, max_rows=MAX_IMPORT_ROWS)
+
+def progress_students_round(company_id, company_rounds, student_ids, student_numbers, new_round):
+    """Set max_round_reached for the listed students of a company; returns a result summary"""
+    max_round = round_values(company_rounds).get((new_round or '').strip().lower())
+    if not max_round:
+        raise ValueError(f'Unknown round "{new_round}" for this company')
+    student_ids = list(dict.fromkeys(student_ids))
+    student_numbers = list(dict.fromkeys(filter(None, map(normalize_student_number, student_numbers))))
+    if not student_ids and not student_numbers:
+        raise ValueError('Select at least one student')
+    
+    updated_at = datetime.now().isoformat()
+    rows = []
+    if student_ids:
+        rows += repos.students.set_round(company_id, 'id', student_ids, max_round, updated_at)
+    if student_numbers:
+        rows += repos.students.set_round(company_id, 'student_number', student_numbers, max_round, updated_at)
+    
+    # One invalidation for the whole batch
+    query_cache.invalidate('selected_students', company_id=company_id)
+    matched = {row['id'] for row in rows} | {row['student_number'] for row in rows}
+    return {
+        'max_round_reached': max_round,
+        'updated': len({row['id'] for row in rows}),
+        'not_found': [value for value in student_ids + student_numbers if value not in matched]
+    }
+
+@app.route('/admin/progress_students/<company_id>', methods=['GET', 'POST'])
+def progress_students(company_id):
+    """Move several students of a company to a new round at once.
+    
+    Takes the admin form, or JSON {"student_ids" or "student_numbers": [...], "max_round_reached": ...}
+    which is answered with JSON.
+    """
+    if not session.get('admin_logged_in'):
+        if request.is_json:
+            return jsonify({'error': 'Admin login required'}), 401
+        return redirect(url_for('admin_login'))
+    
+    try:
+        company_rows = cached_select('companies', 'name, hiring_rounds', id=company_id)
+    except Exception as e:
+        if request.is_json:
+            return jsonify({'error': f'Error loading company: {str(e)}'}), 500
+        flash(f'Error loading company: {str(e)}', 'error')
+        return redirect(url_for('admin_dashboard'))
+    if not company_rows:
+        if request.is_json:
+            return jsonify({'error': 'Company not found'}), 404
+        flash('Company not found', 'error')
+        return redirect(url_for('admin_dashboard'))
+    company_name, company_rounds = company_rows[0]['name'], parse_hiring_rounds(company_rows[0])
+    
+    if request.method == 'POST':
+        if request.is_json:
+            payload = request.get_json(silent=True)
+            if not isinstance(payload, dict):
+                return jsonify({'error': 'Expected a JSON object'}), 400
+            student_ids = payload.get('student_ids') or []
+            student_numbers = payload.get('student_numbers') or []
+            new_round = payload.get('max_round_reached')
+            if not all(isinstance(values, list) and all(isinstance(value, str) for value in values)
+                       for values in (student_ids, student_numbers)):
+                return jsonify({'error': 'student_ids and student_numbers must be lists of strings'}), 400
+            if new_round is not None and not isinstance(new_round, str):
+                return jsonify({'error': 'max_round_reached must be a string'}), 400
+            try:
+                result = progress_students_round(company_id, company_rounds, student_ids, student_numbers, new_round)
+                return jsonify(result)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            except Exception as e:
+                return jsonify({'error': f'Error updating students: {str(e)}'}), 500
+        
+        try:
+            result = progress_students_round(company_id, company_rounds, request.form.getlist('student_ids'),
+                                             re.split(r'[\s,;]+', request.form.get('student_numbers', '')),
+                                             request.form.get('max_round_reached'))
+            flash(f'Moved {result["updated"]} students to {result["max_round_reached"]}', 'success')
+            if result['not_found']:
+                flash(f'Not found in this company: {", ".join(result["not_found"])}', 'error')
+            return redirect(url_for('progress_students', company_id=company_id))
+        except Exception as e:
+            flash(f'Error updating students: {str(e)}', 'error')
+    
+    try:
+        students = load_company_students(company_id)
+    except Exception as e:
+        flash(f'Error loading students: {str(e)}', 'error')
+        return redirect(url_for('company_details', company_id=company_id))
+    
+    return render_template('progress_students.html', company_id=company_id, company_name=company_name,
+                           company_rounds=company_rounds, students=students)
+
 @app.route('/admin/delete_student/<student_id>', methods=['POST'])
 def delete_student(student_id):
     """Delete student"""
@@ -386,11 +618,12 @@ def delete_student(student_id):
     
     try:
         # Get company_id before deleting student
-        student_response = supabase.table('selected_students').select('company_id').eq('id', student_id).execute()
-        if student_response.data:
-            company_id = student_response.data[0]['company_id']
+        student = repos.students.get(student_id, 'company_id')
+        if student:
+            company_id = student['company_id']
             # Delete student
-            supabase.table('selected_students').delete().eq('id', student_id).execute()
+            repos.students.delete(student_id)
+            query_cache.invalidate('selected_students', id=student_id, company_id=company_id)
             flash('Student removed successfully!', 'success')
             return redirect(url_for('company_details', company_id=company_id))
         else:
@@ -410,7 +643,7 @@ def admin_logout():
 @app.route('/developers')
 def developers():
     """Display the developers page."""
-    return render_template('developers.html')
+    return conditional_response(lambda: render_template('developers.html'), shared_max_age=EDGE_CACHE_TTL)
 
 @app.route('/admin/reports')
 def admin_reports():
@@ -419,99 +652,23 @@ def admin_reports():
         return redirect(url_for('admin_login'))
     
     try:
-        # Fetch all companies with student counts
-        companies_response = supabase.table('companies').select('*').execute()
-        companies = companies_response.data
-        
-        # Fetch all students
-        students_response = supabase.table('selected_students').select('*').execute()
-        students = students_response.data
-        
-        # Calculate statistics - count unique students only
-        total_companies = len(companies)
-        unique_students = set()
-        for student in students:
-            unique_students.add(student['student_number'])
-        total_unique_students = len(unique_students)
-        
-        # Count total offers (unique students who got offers)
-        unique_offer_students = set()
-        for student in students:
-            if student['max_round_reached'] == 'Got Offer':
-                unique_offer_students.add(student['student_number'])
-        total_got_offers = len(unique_offer_students)
-        
-        # Group students by company and calculate round-wise statistics
-        company_stats = {}
-        for student in students:
-            company_id = student['company_id']
-            if company_id not in company_stats:
-                company_stats[company_id] = {
-                    'students': [],
-                    'got_offer': 0,
-                    'round_stats': {}
-                }
-            company_stats[company_id]['students'].append(student)
-            
-            # Count by status
-            if student['max_round_reached'] == 'Got Offer':
-                company_stats[company_id]['got_offer'] += 1
-            
-            # Count round-wise statistics
-            round_reached = student['max_round_reached']
-            if round_reached not in ['Got Offer']:
-                if round_reached not in company_stats[company_id]['round_stats']:
-                    company_stats[company_id]['round_stats'][round_reached] = 0
-                company_stats[company_id]['round_stats'][round_reached] += 1
-        
-        # Add company details to stats and calculate hiring round statistics
-        for company in companies:
-            company_id = company['id']
-            if company_id not in company_stats:
-                company_stats[company_id] = {
-                    'company': company,
-                    'students': [],
-                    'got_offer': 0,
-                    'round_stats': {}
-                }
-            else:
-                company_stats[company_id]['company'] = company
-            
-            # Sort students within each company by priority
-            if company_stats[company_id]['students']:
-                company_stats[company_id]['students'] = sort_students_by_priority(company_stats[company_id]['students'])
-            
-            # Parse hiring rounds for this company
-            hiring_rounds_str = company.get('hiring_rounds', '')
-            company_rounds = [r.strip() for r in hiring_rounds_str.split(',') if r.strip()]
-            company_stats[company_id]['hiring_rounds'] = company_rounds
-        
-        # Get list of students with offers for modal display
-        students_with_offers = []
-        unique_students_with_offers = []
-        seen_student_numbers = set()
-        
-        for student in students:
-            if student['max_round_reached'] == 'Got Offer':
-                students_with_offers.append(student)
-                # Add to unique list only if not seen before
-                if student['student_number'] not in seen_student_numbers:
-                    unique_students_with_offers.append(student)
-                    seen_student_numbers.add(student['student_number'])
-        
-        # Sort both lists by student name for consistent display
-        students_with_offers = sorted(students_with_offers, key=lambda x: x['name'])
-        unique_students_with_offers = sorted(unique_students_with_offers, key=lambda x: x['name'])
+        # Counts are aggregated by the database; only offer holders are fetched as rows
+        companies, summary, offer_rows = fetch_all(
+            lambda: cached_select('companies'),
+            load_placement_summary,
+            lambda: cached_select('selected_students', max_round_reached=OFFER_STATUS)
+        )
+        stats = PlacementSummary(companies, summary)
         
         return render_template('admin_reports.html', 
                              companies=companies, 
-                             students=students,
-                             company_stats=company_stats,
-                             total_companies=total_companies,
-                             total_students=total_unique_students,
-                             total_got_offers=total_got_offers,
-                             students_with_offers=students_with_offers,
-                             unique_students_with_offers=unique_students_with_offers)
+                             company_stats=stats.company_stats(),
+                             company_names=stats.company_names,
+                             total_companies=stats.total_companies,
+                             total_students=stats.total_students,
+                             total_got_offers=stats.total_unique_offers,
+                             students_with_offers=sorted(offer_rows, key=lambda x: x['name']),
+                             unique_students_with_offers=sorted(first_offer_per_student(offer_rows), key=lambda x: x['name']))
     except Exception as e:
         flash(f'Error loading reports: {str(e)}', 'error')
         return render_template('admin_reports.html', 
@@ -522,597 +679,138 @@ def admin_reports():
                              total_students=0,
                              total_got_offers=0)
 
+def load_placement_summary():
+    """placement_summary() from the database, aggregated in Python if the function isn't installed"""
+    def load():
+        try:
+            return repos.students.placement_summary()
+        except Exception as e:
+            logger.warning('placement_summary() unavailable, aggregating in Python: %s', e)
+            return summarize_students(repos.students.select('company_id, student_number, max_round_reached'))
+    # Keyed under selected_students so any student write invalidates it
+    return query_cache.get_or_load('selected_students', 'placement_summary()', {}, load)
+
+def load_report_stats():
+    """PlacementStats over the current companies and selected_students.
+    
+    Read from repos, not query_cache: the artifact is kept under the version
+    read before the build, so its rows must be at least that new.
+    """
+    companies, students = fetch_all(
+        repos.companies.select,
+        repos.students.select
+    )
+    return PlacementStats(companies, students)
+
+def report_data_version():
+    """Fingerprint of the report data: row count and newest updated_at per table.
+    
+    Counts catch deletes, which don't move updated_at.
+    """
+    parts = fetch_all(
+        lambda: ['companies'] + repos.companies.latest_change(),
+        lambda: ['selected_students'] + repos.students.latest_change()
+    )
+    return hashlib.sha1(json.dumps(parts).encode()).hexdigest()[:16]
+
+def build_excel_artifact(path):
+    from excel_report import write_excel_report
+    write_excel_report(load_report_stats(), path)
+
+def build_pdf_artifact(path):
+    from pdf_report import write_pdf_report
+    write_pdf_report(load_report_stats(), path)
+
+# Report files are built by a small worker pool and kept per data version
+REPORT_JOB_WAIT = float(os.getenv('REPORT_JOB_WAIT', 20))  # Seconds a download waits before handing out a job to poll
+report_jobs = ReportJobs(
+    ArtifactStore(os.getenv('REPORT_ARTIFACT_DIR', os.path.join(tempfile.gettempdir(), 'placement_reports'))),
+    {'excel': build_excel_artifact, 'pdf': build_pdf_artifact},
+    max_workers=int(os.getenv('REPORT_JOB_WORKERS', 2))
+)
+
+REPORT_MIMETYPES = {
+    'excel': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'pdf': 'application/pdf'
+}
+
+def send_report_artifact(job):
+    """Send a finished job's report file as an attachment"""
+    download_name = f'placement_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{EXTENSIONS[job["format"]]}'
+    return send_file(job['path'], mimetype=REPORT_MIMETYPES[job['format']], as_attachment=True, download_name=download_name)
+
+def report_job_payload(job):
+    payload = {key: job[key] for key in ('id', 'format', 'version', 'status', 'error')}
+    if job['status'] == DONE:
+        payload['download_url'] = url_for('download_report_job', job_id=job['id'])
+    return payload
+
 @app.route('/admin/reports/download/<format>')
 def download_report(format):
     """Download reports in Excel or PDF format"""
     if not session.get('admin_logged_in'):
         return redirect(url_for('admin_login'))
     
+    report_format = format.lower()
+    if report_format not in REPORT_MIMETYPES:
+        flash('Invalid format requested', 'error')
+        return redirect(url_for('admin_reports'))
+    
     try:
-        # Fetch data
-        companies_response = supabase.table('companies').select('*').execute()
-        companies = companies_response.data
-        
-        students_response = supabase.table('selected_students').select('*').execute()
-        students = students_response.data
-        
-        if format.lower() == 'excel':
-            return generate_excel_report(companies, students)
-        elif format.lower() == 'pdf':
-            return generate_pdf_report(companies, students)
-        else:
-            flash('Invalid format requested', 'error')
+        # Reuse the artifact for the current data version, or join/queue a build
+        job = report_jobs.submit(report_format, report_data_version())
+        job = report_jobs.wait(job['id'], REPORT_JOB_WAIT)
+        
+        if job['status'] == DONE:
+            return send_report_artifact(job)
+        if job['status'] == FAILED:
+            flash(f'Error generating report: {job["error"]}', 'error')
             return redirect(url_for('admin_reports'))
+        
+        # Still building - hand out the job to poll
+        return redirect(url_for('report_job_status', job_id=job['id']))
             
     except Exception as e:
         flash(f'Error generating report: {str(e)}', 'error')
         return redirect(url_for('admin_reports'))
 
-def generate_excel_report(companies, students):
-    """Generate Excel report with attractive formatting"""
-    output = BytesIO()
-    
-    # Create workbook and worksheets
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        workbook = writer.book
-        
-        # Define formats
-        header_format = workbook.add_format({
-            'bold': True,
-            'text_wrap': True,
-            'valign': 'top',
-            'fg_color': '#4472C4',
-            'font_color': 'white',
-            'border': 1,
-            'font_size': 12
-        })
-        
-        metric_format = workbook.add_format({
-            'bold': True,
-            'fg_color': '#D9E1F2',
-            'border': 1,
-            'font_size': 11
-        })
-        
-        value_format = workbook.add_format({
-            'border': 1,
-            'font_size': 11,
-            'text_wrap': True
-        })
-        
-        number_format = workbook.add_format({
-            'border': 1,
-            'font_size': 11,
-            'num_format': '#,##0'
-        })
-        
-        success_format = workbook.add_format({
-            'border': 1,
-            'font_size': 11,
-            'fg_color': '#C6EFCE',
-            'num_format': '#,##0'
-        })
-        
-        # Calculate overall statistics
-        unique_students = set(s['student_number'] for s in students)
-        unique_offer_students = set(s['student_number'] for s in students if s['max_round_reached'] == 'Got Offer')
-        total_got_offers = len([s for s in students if s['max_round_reached'] == 'Got Offer'])
-        
-        # 1. Overall Statistics Sheet
-        overall_stats_data = [
-            ['Total No of Companies', len(companies)],
-            ['All Company Names', ', '.join([c['name'] for c in companies])],
-            ['Total No of Students', len(unique_students)],  # Fixed: Use unique student count
-            ['Total Got Offers', total_got_offers],
-            ['Total Unique Students with Offers', len(unique_offer_students)]
-        ]
-        overall_df = pd.DataFrame(overall_stats_data, columns=['Metric', 'Value'])
-        overall_df.to_excel(writer, sheet_name='Overall_Statistics', index=False, startrow=1)
-        
-        # Format Overall Statistics sheet
-        worksheet = writer.sheets['Overall_Statistics']
-        worksheet.write('A1', 'Overall Placement Statistics', header_format)
-        worksheet.merge_range('A1:B1', 'Overall Placement Statistics', header_format)
-        
-        # Apply formatting to data
-        for row in range(len(overall_stats_data)):
-            worksheet.write(row + 2, 0, overall_stats_data[row][0], metric_format)
-            if row == 3 or row == 4:  # Offers data
-                worksheet.write(row + 2, 1, overall_stats_data[row][1], success_format)
-            else:
-                worksheet.write(row + 2, 1, overall_stats_data[row][1], value_format)
-        
-        # Set column widths
-        worksheet.set_column('A:A', 30)
-        worksheet.set_column('B:B', 50)
-        
-        # 2. Company-wise Statistics Sheet
-        company_stats_data = []
-        for company in companies:
-            company_students = [s for s in students if s['company_id'] == company['id']]
-            got_offer_count = len([s for s in company_students if s['max_round_reached'] == 'Got Offer'])
-            
-            # Parse hiring rounds for this company
-            hiring_rounds_str = company.get('hiring_rounds', '')
-            company_rounds = [r.strip() for r in hiring_rounds_str.split(',') if r.strip()]
-            
-            # Count students in each round
-            round_stats = []
-            for i, round_name in enumerate(company_rounds, 1):
-                round_key = f'Round {i}'
-                count = len([s for s in company_students if s['max_round_reached'] == round_key])
-                if count > 0:
-                    round_stats.append(f'{round_name}: {count}')
-            
-            company_stats_data.append({
-                'Company Name': company['name'],
-                'CTC': company['ctc_offer'],
-                'Bond/Agreement (Years)': company['agreement_years'],
-                'Round-wise Student Count': '; '.join(round_stats) if round_stats else 'No round data',
-                'No of Students Got Offers': got_offer_count
-            })
-        
-        company_stats_df = pd.DataFrame(company_stats_data)
-        company_stats_df.to_excel(writer, sheet_name='Company_Statistics', index=False, startrow=1)
-        
-        # Format Company Statistics sheet
-        company_worksheet = writer.sheets['Company_Statistics']
-        company_worksheet.merge_range('A1:E1', 'Company-wise Placement Statistics', header_format)
-        
-        # Write headers with formatting
-        headers = ['Company Name', 'CTC', 'Bond/Agreement (Years)', 'Round-wise Student Count', 'No of Students Got Offers']
-        for col, header in enumerate(headers):
-            company_worksheet.write(1, col, header, header_format)
-        
-        # Apply formatting to data rows
-        for row in range(len(company_stats_data)):
-            company_worksheet.write(row + 2, 0, company_stats_data[row]['Company Name'], value_format)
-            company_worksheet.write(row + 2, 1, company_stats_data[row]['CTC'], value_format)
-            company_worksheet.write(row + 2, 2, company_stats_data[row]['Bond/Agreement (Years)'], number_format)
-            company_worksheet.write(row + 2, 3, company_stats_data[row]['Round-wise Student Count'], value_format)
-            company_worksheet.write(row + 2, 4, company_stats_data[row]['No of Students Got Offers'], success_format)
-        
-        # Set column widths
-        company_worksheet.set_column('A:A', 25)  # Company Name
-        company_worksheet.set_column('B:B', 15)  # CTC
-        company_worksheet.set_column('C:C', 20)  # Bond/Agreement
-        company_worksheet.set_column('D:D', 40)  # Round-wise
-        company_worksheet.set_column('E:E', 20)  # Got Offers
-        
-        # 3. Detailed Student Information (Company-wise)
-        student_header_format = workbook.add_format({
-            'bold': True,
-            'text_wrap': True,
-            'valign': 'top',
-            'fg_color': '#70AD47',
-            'font_color': 'white',
-            'border': 1,
-            'font_size': 11
-        })
-        
-        student_data_format = workbook.add_format({
-            'border': 1,
-            'font_size': 10,
-            'text_wrap': True
-        })
-        
-        offer_format = workbook.add_format({
-            'border': 1,
-            'font_size': 10,
-            'fg_color': '#C6EFCE',
-            'text_wrap': True
-        })
-        
-        for company in companies:
-            company_students = [s for s in students if s['company_id'] == company['id']]
-            if company_students:
-                # Sort students by priority: Got Offer first, then by rounds descending, then Others last
-                company_students = sort_students_by_priority(company_students)
-                student_details = []
-                for student in company_students:
-                    student_details.append({
-                        'Student Name': student['name'],
-                        'Roll No': student['student_number'],
-                        'Email ID': student.get('email', 'N/A'),
-                        'Max Round Reached/Got Offer': student['max_round_reached']
-                    })
-                
-                student_df = pd.DataFrame(student_details)
-                # Clean company name for sheet name (Excel sheet names have character limits)
-                safe_company_name = company['name'].replace('/', '_').replace('\\', '_')[:25]
-                student_df.to_excel(writer, sheet_name=f'{safe_company_name}_Students', index=False, startrow=1)
-                
-                # Format student sheets
-                student_worksheet = writer.sheets[f'{safe_company_name}_Students']
-                student_worksheet.merge_range('A1:D1', f'{company["name"]} - Student Details', header_format)
-                
-                # Write headers with formatting
-                student_headers = ['Student Name', 'Roll No', 'Email ID', 'Max Round Reached/Got Offer']
-                for col, header in enumerate(student_headers):
-                    student_worksheet.write(1, col, header, student_header_format)
-                
-                # Apply formatting to data rows
-                for row in range(len(student_details)):
-                    student_worksheet.write(row + 2, 0, student_details[row]['Student Name'], student_data_format)
-                    student_worksheet.write(row + 2, 1, student_details[row]['Roll No'], student_data_format)
-                    student_worksheet.write(row + 2, 2, student_details[row]['Email ID'], student_data_format)
-                    
-                    # Highlight "Got Offer" status
-                    if student_details[row]['Max Round Reached/Got Offer'] == 'Got Offer':
-                        student_worksheet.write(row + 2, 3, student_details[row]['Max Round Reached/Got Offer'], offer_format)
-                    else:
-                        student_worksheet.write(row + 2, 3, student_details[row]['Max Round Reached/Got Offer'], student_data_format)
-                
-                # Set column widths
-                student_worksheet.set_column('A:A', 25)  # Student Name
-                student_worksheet.set_column('B:B', 15)  # Roll No
-                student_worksheet.set_column('C:C', 30)  # Email ID
-                student_worksheet.set_column('D:D', 25)  # Max Round
-        
-        # 4. All Students with Offers Sheet
-        students_with_offers = [s for s in students if s['max_round_reached'] == 'Got Offer']
-        if students_with_offers:
-            offers_data = []
-            for student in students_with_offers:
-                # Find company name
-                company_name = 'Unknown'
-                for company in companies:
-                    if company['id'] == student['company_id']:
-                        company_name = company['name']
-                        break
-                
-                offers_data.append({
-                    'Student Name': student['name'],
-                    'Roll No': student['student_number'],
-                    'Email ID': student.get('email', 'N/A'),
-                    'Company': company_name
-                })
-            
-            offers_df = pd.DataFrame(offers_data)
-            offers_df.to_excel(writer, sheet_name='All_Students_With_Offers', index=False, startrow=1)
-            
-            # Format All Students with Offers sheet
-            offers_worksheet = writer.sheets['All_Students_With_Offers']
-            offers_worksheet.merge_range('A1:D1', f'All Students with Offers ({len(students_with_offers)})', header_format)
-            
-            # Write headers
-            offers_headers = ['Student Name', 'Roll No', 'Email ID', 'Company']
-            for col, header in enumerate(offers_headers):
-                offers_worksheet.write(1, col, header, student_header_format)
-            
-            # Apply formatting to data rows
-            for row in range(len(offers_data)):
-                offers_worksheet.write(row + 2, 0, offers_data[row]['Student Name'], offer_format)
-                offers_worksheet.write(row + 2, 1, offers_data[row]['Roll No'], offer_format)
-                offers_worksheet.write(row + 2, 2, offers_data[row]['Email ID'], offer_format)
-                offers_worksheet.write(row + 2, 3, offers_data[row]['Company'], offer_format)
-            
-            # Set column widths
-            offers_worksheet.set_column('A:A', 25)  # Student Name
-            offers_worksheet.set_column('B:B', 15)  # Roll No
-            offers_worksheet.set_column('C:C', 30)  # Email ID
-            offers_worksheet.set_column('D:D', 25)  # Company
-        
-        # 5. Unique Students with Offers Sheet
-        unique_students_with_offers = []
-        seen_student_numbers = set()
-        for student in students:
-            if student['max_round_reached'] == 'Got Offer' and student['student_number'] not in seen_student_numbers:
-                # Find company name
-                company_name = 'Unknown'
-                for company in companies:
-                    if company['id'] == student['company_id']:
-                        company_name = company['name']
-                        break
-                
-                unique_students_with_offers.append({
-                    'Student Name': student['name'],
-                    'Roll No': student['student_number'],
-                    'Email ID': student.get('email', 'N/A'),
-                    'Company': company_name
-                })
-                seen_student_numbers.add(student['student_number'])
-        
-        if unique_students_with_offers:
-            unique_df = pd.DataFrame(unique_students_with_offers)
-            unique_df.to_excel(writer, sheet_name='Unique_Students_With_Offers', index=False, startrow=1)
-            
-            # Format Unique Students with Offers sheet
-            unique_worksheet = writer.sheets['Unique_Students_With_Offers']
-            unique_worksheet.merge_range('A1:D1', f'Unique Students with Offers ({len(unique_students_with_offers)})', header_format)
-            
-            # Write headers
-            unique_headers = ['Student Name', 'Roll No', 'Email ID', 'Company']
-            for col, header in enumerate(unique_headers):
-                unique_worksheet.write(1, col, header, student_header_format)
-            
-            # Apply formatting to data rows
-            for row in range(len(unique_students_with_offers)):
-                unique_worksheet.write(row + 2, 0, unique_students_with_offers[row]['Student Name'], offer_format)
-                unique_worksheet.write(row + 2, 1, unique_students_with_offers[row]['Roll No'], offer_format)
-                unique_worksheet.write(row + 2, 2, unique_students_with_offers[row]['Email ID'], offer_format)
-                unique_worksheet.write(row + 2, 3, unique_students_with_offers[row]['Company'], offer_format)
-            
-            # Set column widths
-            unique_worksheet.set_column('A:A', 25)  # Student Name
-            unique_worksheet.set_column('B:B', 15)  # Roll No
-            unique_worksheet.set_column('C:C', 30)  # Email ID
-            unique_worksheet.set_column('D:D', 25)  # Company
+@app.route('/admin/reports/jobs/<job_id>')
+def report_job_status(job_id):
+    """Report job status: JSON for API clients, an auto-refreshing page for browsers"""
+    if not session.get('admin_logged_in'):
+        return redirect(url_for('admin_login'))
     
-    output.seek(0)
+    job = report_jobs.get(job_id)
+    wants_json = request.accept_mimetypes.best_match(['text/html', 'application/json']) == 'application/json'
     
-    response = make_response(output.read())
-    response.headers['Content-Type'] = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    response.headers['Content-Disposition'] = f'attachment; filename=placement_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
+    if not job:
+        if wants_json:
+            return jsonify({'error': 'Report job not found'}), 404
+        flash('Report job not found. Please start the download again.', 'error')
+        return redirect(url_for('admin_reports'))
     
-    return response
+    payload = report_job_payload(job)
+    if wants_json:
+        return jsonify(payload)
+    if job['status'] == DONE:
+        return redirect(payload['download_url'])
+    if job['status'] == FAILED:
+        flash(f'Error generating report: {job["error"]}', 'error')
+        return redirect(url_for('admin_reports'))
+    return render_template('report_job.html', job=payload)
 
-def generate_pdf_report(companies, students):
-    """Generate PDF report"""
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=0.5*inch, rightMargin=0.5*inch, topMargin=0.5*inch, bottomMargin=0.5*inch)
-    styles = getSampleStyleSheet()
-    story = []
-    
-    # Title
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=20,
-        spaceAfter=20,
-        alignment=1  # Center alignment
-    )
-    story.append(Paragraph("IT Branch 2026 Placements Report", title_style))
-    story.append(Spacer(1, 15))
-    
-    # Calculate overall statistics
-    unique_students = set(s['student_number'] for s in students)
-    unique_offer_students = set(s['student_number'] for s in students if s['max_round_reached'] == 'Got Offer')
-    total_got_offers = len([s for s in students if s['max_round_reached'] == 'Got Offer'])
-    
-    # 1. Overall Statistics
-    story.append(Paragraph("Overall Statistics", styles['Heading2']))
-    
-    # Create proper paragraph for company names without truncation
-    company_names_text = ', '.join([c['name'] for c in companies])
-    
-    # Create style for summary data
-    summary_style = ParagraphStyle(
-        'SummaryStyle',
-        parent=styles['Normal'],
-        fontSize=8,
-        leading=10,
-        wordWrap='LTR'
-    )
-    
-    summary_data = [
-        ['Total No of Companies', str(len(companies))],
-        ['All Company Names', Paragraph(company_names_text, summary_style)],
-        ['Total No of Students', str(len(unique_students))],  # Fixed: Use unique student count
-        ['Total Got Offers', str(total_got_offers)],
-        ['Total Unique Students with Offers', str(len(unique_offer_students))]
-    ]
-    
-    summary_table = Table(summary_data, colWidths=[2.2*inch, 3.3*inch])
-    summary_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 9),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-        ('TOPPADDING', (0, 0), (-1, -1), 10),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONTSIZE', (0, 1), (-1, -1), 8),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-    ]))
-    story.append(summary_table)
-    story.append(Spacer(1, 30))
-    
-    # 2. Company-wise Statistics and Student Details
-    for company in companies:
-        company_students = [s for s in students if s['company_id'] == company['id']]
-        # Sort students by priority: Got Offer first, then by rounds descending, then Others last
-        company_students = sort_students_by_priority(company_students)
-        got_offer_count = len([s for s in company_students if s['max_round_reached'] == 'Got Offer'])
-        
-        # Company header
-        story.append(Paragraph(f"Company: {company['name']}", styles['Heading2']))
-        
-        # Company statistics
-        hiring_rounds_str = company.get('hiring_rounds', '')
-        company_rounds = [r.strip() for r in hiring_rounds_str.split(',') if r.strip()]
-        
-        # Count students in each round
-        round_stats = []
-        for i, round_name in enumerate(company_rounds, 1):
-            round_key = f'Round {i}'
-            count = len([s for s in company_students if s['max_round_reached'] == round_key])
-            if count > 0:
-                round_stats.append(f'{round_name}: {count}')
-        
-        # Create proper paragraph for round statistics without truncation
-        round_stats_text = '; '.join(round_stats) if round_stats else 'No round data'
-        
-        # Create a custom style for better text wrapping
-        wrap_style = ParagraphStyle(
-            'WrapStyle',
-            parent=styles['Normal'],
-            fontSize=8,
-            leading=10,
-            wordWrap='LTR'
-        )
-        
-        company_info = [
-            ['CTC', company['ctc_offer']],
-            ['Bond/Agreement', f"{company['agreement_years']} years"],
-            ['Round-wise Students', Paragraph(round_stats_text, wrap_style)],
-            ['Students Got Offers', str(got_offer_count)]
-        ]
-        
-        company_table = Table(company_info, colWidths=[1.8*inch, 3.7*inch])
-        company_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-        ]))
-        story.append(company_table)
-        story.append(Spacer(1, 15))
-        
-        # Student details for this company
-        if company_students:
-            story.append(Paragraph("Student Details:", styles['Heading3']))
-            
-            student_data = [['Student Name', 'Roll No', 'Email ID', 'Max Round/Offer']]
-            
-            # Create style for student data with proper wrapping
-            student_style = ParagraphStyle(
-                'StudentStyle',
-                parent=styles['Normal'],
-                fontSize=7,
-                leading=9,
-                wordWrap='LTR'
-            )
-            
-            for student in company_students:
-                # Use full data without truncation, let Paragraph handle wrapping
-                student_name = student['name']
-                student_email = student.get('email', 'N/A')
-                max_round = student['max_round_reached']
-                
-                student_data.append([
-                    Paragraph(student_name, student_style),
-                    student['student_number'],
-                    Paragraph(student_email, student_style),
-                    Paragraph(max_round, student_style)
-                ])
-            
-            # Adjust column widths for better data display
-            student_table = Table(student_data, colWidths=[1.6*inch, 0.9*inch, 1.8*inch, 1.2*inch])
-            student_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 7),
-                ('FONTSIZE', (0, 1), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-                ('TOPPADDING', (0, 0), (-1, -1), 8),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightblue])
-            ]))
-            story.append(student_table)
-        
-        story.append(Spacer(1, 30))
-    
-    # Add new sections for student lists
-    story.append(PageBreak())
-    
-    # All Students with Offers Section
-    students_with_offers = [s for s in students if s['max_round_reached'] == 'Got Offer']
-    if students_with_offers:
-        story.append(Paragraph("All Students with Offers", styles['Heading2']))
-        story.append(Spacer(1, 10))
-        
-        offers_data = [['Student Name', 'Roll No', 'Email ID', 'Company']]
-        
-        for student in students_with_offers:
-            # Find company name
-            company_name = 'Unknown'
-            for company in companies:
-                if company['id'] == student['company_id']:
-                    company_name = company['name']
-                    break
-            
-            offers_data.append([
-                Paragraph(student['name'], student_style),
-                student['student_number'],
-                Paragraph(student.get('email', 'N/A'), student_style),
-                Paragraph(company_name, student_style)
-            ])
-        
-        offers_table = Table(offers_data, colWidths=[1.8*inch, 1.0*inch, 1.8*inch, 1.9*inch])
-        offers_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.orange),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 8),
-            ('FONTSIZE', (0, 1), (-1, -1), 7),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.lightyellow),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightyellow])
-        ]))
-        story.append(offers_table)
-        story.append(Spacer(1, 20))
-    
-    # Unique Students with Offers Section
-    unique_students_with_offers = []
-    seen_student_numbers = set()
-    for student in students:
-        if student['max_round_reached'] == 'Got Offer' and student['student_number'] not in seen_student_numbers:
-            unique_students_with_offers.append(student)
-            seen_student_numbers.add(student['student_number'])
-    
-    if unique_students_with_offers:
-        story.append(Paragraph("Unique Students with Offers", styles['Heading2']))
-        story.append(Spacer(1, 10))
-        
-        unique_data = [['Student Name', 'Roll No', 'Email ID', 'Company']]
-        
-        for student in unique_students_with_offers:
-            # Find company name
-            company_name = 'Unknown'
-            for company in companies:
-                if company['id'] == student['company_id']:
-                    company_name = company['name']
-                    break
-            
-            unique_data.append([
-                Paragraph(student['name'], student_style),
-                student['student_number'],
-                Paragraph(student.get('email', 'N/A'), student_style),
-                Paragraph(company_name, student_style)
-            ])
-        
-        unique_table = Table(unique_data, colWidths=[1.8*inch, 1.0*inch, 1.8*inch, 1.9*inch])
-        unique_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.blue),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 8),
-            ('FONTSIZE', (0, 1), (-1, -1), 7),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.lightblue),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightblue])
-        ]))
-        story.append(unique_table)
-    
-    doc.build(story)
-    buffer.seek(0)
+@app.route('/admin/reports/jobs/<job_id>/download')
+def download_report_job(job_id):
+    """Download the artifact produced by a finished report job"""
+    if not session.get('admin_logged_in'):
+        return redirect(url_for('admin_login'))
     
-    response = make_response(buffer.read())
-    response.headers['Content-Type'] = 'application/pdf'
-    response.headers['Content-Disposition'] = f'attachment; filename=placement_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
+    job = report_jobs.get(job_id)
+    if not job or job['status'] != DONE or not os.path.exists(job['path']):
+        flash('Report is no longer available. Please download it again.', 'error')
+        return redirect(url_for('admin_reports'))
     
-    return response
+    return send_report_artifact(job)
 
 @app.route('/admin/test_storage')
 def test_storage():
@@ -1128,6 +826,138 @@ def test_storage():
     
     return redirect(url_for('admin_dashboard'))
 
+@app.route('/admin/cache_stats')
+def cache_stats():
+    """Hit/miss counters for the query cache and the student profile cache"""
+    if not session.get('admin_logged_in'):
+        return redirect(url_for('admin_login'))
+    
+    return jsonify({**query_cache.stats(), 'student_profiles': student_profiles.stats()})
+
+@app.route('/admin/pool_stats')
+def pool_stats():
+    """Connection reuse, waits and retries of the shared Supabase HTTP pool"""
+    if not session.get('admin_logged_in'):
+        return redirect(url_for('admin_login'))
+    
+    return jsonify(supabase_pool.stats())
+
+@app.route('/admin/metrics')
+def request_metrics():
+    """Request/query metrics in the Prometheus text format.
+    
+    Open to a logged-in admin, or to a scraper sending METRICS_TOKEN as a bearer token.
+    """
+    metrics_token = os.getenv('METRICS_TOKEN')
+    authorized = session.get('admin_logged_in') or (
+        metrics_token and request.headers.get('Authorization') == f'Bearer {metrics_token}')
+    if not authorized:
+        return redirect(url_for('admin_login'))
+    
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+def create_paper_bucket():
+    paper_storage.create_bucket(app.config['MAX_CONTENT_LENGTH'], ['application/pdf'])
+
+def paper_upload_error(message, status=400):
+    return jsonify({'error': message}), status
+
+@app.route('/admin/model_papers/<company_id>/upload_url', methods=['POST'])
+def model_paper_upload_url(company_id):
+    """Step 1 of a direct upload: a signed URL the browser PUTs the PDF to, plus a ticket for finalize"""
+    if not session.get('admin_logged_in'):
+        return paper_upload_error('Admin login required', 401)
+    if not paper_storage:
+        return paper_upload_error('Cloud storage is not configured', 503)
+    
+    payload = request.get_json(silent=True) or {}
+    if not isinstance(payload, dict):
+        return paper_upload_error('Expected a JSON object')
+    paper_name = str(payload.get('paper_name') or '').strip()
+    filename = secure_filename(str(payload.get('filename') or ''))
+    try:
+        size = int(payload.get('size') or 0)
+    except (TypeError, ValueError):
+        return paper_upload_error('Invalid file size')
+    if not paper_name:
+        return paper_upload_error('Please provide a name for the model paper')
+    if not filename or not allowed_file(filename):
+        return paper_upload_error('Invalid file type. Only PDF files are allowed.')
+    if size < 0:
+        return paper_upload_error('Invalid file size')
+    if size > app.config['MAX_CONTENT_LENGTH']:
+        return paper_upload_error('File is larger than 16MB')
+    
+    path = f"{uuid.uuid4()}_{filename}"
+    try:
+        try:
+            upload_url = paper_storage.create_signed_upload_url(path)
+        except StorageError as storage_error:
+            if not storage_error.bucket_missing:
+                raise
+            create_paper_bucket()
+            upload_url = paper_storage.create_signed_upload_url(path)
+    except Exception as e:
+        return paper_upload_error(f'Error preparing upload: {str(e)}', 502)
+    
+    ticket = paper_upload_tickets.dumps({
+        'company_id': company_id,
+        'path': path,
+        'paper_name': paper_name,
+        'uploaded_by': session.get('admin_email')
+    })
+    return jsonify({'upload_url': upload_url, 'ticket': ticket, 'expires_in': MODEL_PAPER_UPLOAD_TTL})
+
+@app.route('/admin/model_papers/<company_id>/finalize', methods=['POST'])
+def finalize_model_paper(company_id):
+    """Step 2 of a direct upload: record the paper once its object is in storage"""
+    if not session.get('admin_logged_in'):
+        return paper_upload_error('Admin login required', 401)
+    if not paper_storage:
+        return paper_upload_error('Cloud storage is not configured', 503)
+    
+    payload = request.get_json(silent=True) or {}
+    if not isinstance(payload, dict):
+        return paper_upload_error('Expected a JSON object')
+    try:
+        ticket = paper_upload_tickets.loads(str(payload.get('ticket') or ''), max_age=MODEL_PAPER_UPLOAD_TTL)
+    except BadSignature:
+        return paper_upload_error('Upload expired or invalid. Please upload the paper again.')
+    if not isinstance(ticket, dict) or not all(ticket.get(field) for field in ('company_id', 'path', 'paper_name')):
+        return paper_upload_error('Upload expired or invalid. Please upload the paper again.')
+    if ticket['company_id'] != company_id:
+        return paper_upload_error('Upload does not belong to this company')
+    
+    try:
+        # Trust the stored object, not the browser, for the size
+        file_size = paper_storage.object_size(ticket['path'])
+        if file_size is None:
+            return paper_upload_error('Uploaded file not found in storage', 404)
+        if file_size > app.config['MAX_CONTENT_LENGTH']:
+            paper_storage.delete([ticket['path']])
+            return paper_upload_error('File is larger than 16MB')
+        
+        if repos.model_papers.get_by_storage_key(ticket['path'], 'id'):
+            # Finalize was already called for this upload (double submit)
+            return jsonify({'redirect': url_for('company_details', company_id=company_id)})
+        
+        model_paper_data = {
+            'company_id': company_id,
+            'paper_name': ticket['paper_name'],
+            'file_url': paper_storage.public_url(ticket['path']),
+            'storage_key': ticket['path'],
+            'file_size': file_size,
+            'uploaded_by': ticket.get('uploaded_by'),
+            'created_at': datetime.now().isoformat()
+        }
+        repos.model_papers.create(model_paper_data)
+        query_cache.invalidate('model_papers', company_id=company_id)
+    except Exception as e:
+        return paper_upload_error(f'Error saving model paper: {str(e)}', 500)
+    
+    flash('Model paper uploaded successfully!', 'success')
+    return jsonify({'redirect': url_for('company_details', company_id=company_id)})
+
 @app.route('/admin/upload_model_paper/<company_id>', methods=['POST'])
 def upload_model_paper(company_id):
     """Upload model paper for a company using Supabase Storage"""
@@ -1155,160 +985,48 @@ def upload_model_paper(company_id):
             # Create unique filename to avoid conflicts
             unique_filename = f"{uuid.uuid4()}_{filename}"
             
-            # Read file content into memory
-            file_content = file.read()
-            file_size = len(file_content)
+            # Werkzeug has spooled the upload to a temporary file; stream it from there
+            file.stream.seek(0, os.SEEK_END)
+            file_size = file.stream.tell()
+            file.stream.seek(0)
             
-            # Reset file pointer and create BytesIO object for alternative upload methods
-            file_bytes = BytesIO(file_content)
+            if not paper_storage:
+                flash('Cloud storage is not configured', 'error')
+                return redirect(url_for('company_details', company_id=company_id))
             
-            # Upload to Supabase Storage
             try:
-                # Upload file to Supabase Storage bucket 'model-papers'
-                # Try multiple method signatures for different Supabase client versions
                 try:
-                    # Method 1: Latest Supabase client (using admin client for storage)
-                    storage_client = supabase_admin if supabase_admin else supabase
-                    storage_response = storage_client.storage.from_('model-papers').upload(
-                        file=file_content,
-                        path=unique_filename,
-                        file_options={
-                            'content-type': 'application/pdf',
-                            'cache-control': '3600'
-                        }
-                    )
-                except Exception as method1_error:
-                    print(f"Method 1 failed: {str(method1_error)}")
-                    try:
-                        # Method 2: Alternative signature
-                        storage_response = storage_client.storage.from_('model-papers').upload(
-                            path=unique_filename,
-                            file=file_content,
-                            file_options={
-                                'content-type': 'application/pdf'
-                            }
-                        )
-                    except Exception as method2_error:
-                        print(f"Method 2 failed: {str(method2_error)}")
-                        try:
-                            # Method 3: Simple signature
-                            storage_response = storage_client.storage.from_('model-papers').upload(
-                                unique_filename,
-                                file_content
-                            )
-                        except Exception as method3_error:
-                            print(f"Method 3 failed: {str(method3_error)}")
-                            try:
-                                # Method 4: Using BytesIO object
-                                storage_response = storage_client.storage.from_('model-papers').upload(
-                                    unique_filename,
-                                    file_bytes
-                                )
-                            except Exception as method4_error:
-                                print(f"Method 4 failed: {str(method4_error)}")
-                                # Method 5: Base64 encoded string (last resort)
-                                file_base64 = base64.b64encode(file_content).decode('utf-8')
-                                storage_response = storage_client.storage.from_('model-papers').upload(
-                                    unique_filename,
-                                    file_base64,
-                                    {'content-type': 'application/pdf'}
-                                )
+                    result = paper_storage.upload(file.stream, unique_filename, file_size)
+                except StorageError as storage_error:
+                    if not storage_error.bucket_missing:
+                        raise
+                    # First upload on a new project: create the bucket and retry once
+                    logger.warning('Storage bucket missing, creating it: %s', storage_error)
+                    create_paper_bucket()
+                    file.stream.seek(0)
+                    result = paper_storage.upload(file.stream, unique_filename, file_size)
+                logger.info('Uploaded model paper %s: %s', unique_filename, result)
                 
                 # Get public URL for the uploaded file
-                public_url = storage_client.storage.from_('model-papers').get_public_url(unique_filename)
+                public_url = paper_storage.public_url(unique_filename)
                 
                 # Save to database
                 model_paper_data = {
                     'company_id': company_id,
                     'paper_name': paper_name,
                     'file_url': public_url,
+                    'storage_key': unique_filename,
                     'file_size': file_size,
                     'uploaded_by': session.get('admin_email'),
                     'created_at': datetime.now().isoformat()
                 }
                 
-                supabase.table('model_papers').insert(model_paper_data).execute()
+                repos.model_papers.create(model_paper_data)
+                query_cache.invalidate('model_papers', company_id=company_id)
                 flash('Model paper uploaded successfully!', 'success')
                 
             except Exception as storage_error:
-                print(f"Initial storage upload failed: {str(storage_error)}")
-                # Fallback: try creating bucket if it doesn't exist
-                try:
-                    storage_client.storage.create_bucket('model-papers', {
-                        'public': True,
-                        'file_size_limit': 16777216,  # 16MB
-                        'allowed_mime_types': ['application/pdf']
-                    })
-                    
-                    # Retry upload after creating bucket
-                    # Try multiple method signatures for different Supabase client versions
-                    try:
-                        # Method 1: Latest Supabase client
-                        storage_response = storage_client.storage.from_('model-papers').upload(
-                            file=file_content,
-                            path=unique_filename,
-                            file_options={
-                                'content-type': 'application/pdf',
-                                'cache-control': '3600'
-                            }
-                        )
-                    except Exception as retry_method1_error:
-                        print(f"Retry Method 1 failed: {str(retry_method1_error)}")
-                        try:
-                            # Method 2: Alternative signature
-                            storage_response = storage_client.storage.from_('model-papers').upload(
-                                path=unique_filename,
-                                file=file_content,
-                                file_options={
-                                    'content-type': 'application/pdf'
-                                }
-                            )
-                        except Exception as retry_method2_error:
-                            print(f"Retry Method 2 failed: {str(retry_method2_error)}")
-                            try:
-                                # Method 3: Simple signature
-                                storage_response = storage_client.storage.from_('model-papers').upload(
-                                    unique_filename,
-                                    file_content
-                                )
-                            except Exception as retry_method3_error:
-                                print(f"Retry Method 3 failed: {str(retry_method3_error)}")
-                                try:
-                                    # Method 4: Using BytesIO object
-                                    storage_response = storage_client.storage.from_('model-papers').upload(
-                                        unique_filename,
-                                        file_bytes
-                                    )
-                                except Exception as retry_method4_error:
-                                    print(f"Retry Method 4 failed: {str(retry_method4_error)}")
-                                    try:
-                                        # Method 5: Base64 encoded string (last resort)
-                                        file_base64 = base64.b64encode(file_content).decode('utf-8')
-                                        storage_response = storage_client.storage.from_('model-papers').upload(
-                                            unique_filename,
-                                            file_base64,
-                                            {'content-type': 'application/pdf'}
-                                        )
-                                    except Exception as retry_method5_error:
-                                        print(f"Retry Method 5 failed: {str(retry_method5_error)}")
-                                        
-                    
-                    public_url = storage_client.storage.from_('model-papers').get_public_url(unique_filename)
-                    
-                    model_paper_data = {
-                        'company_id': company_id,
-                        'paper_name': paper_name,
-                        'file_url': public_url,
-                        'file_size': file_size,
-                        'uploaded_by': session.get('admin_email'),
-                        'created_at': datetime.now().isoformat()
-                    }
-                    
-                    supabase.table('model_papers').insert(model_paper_data).execute()
-                    flash('Model paper uploaded successfully!', 'success')
-                    
-                except Exception as retry_error:
-                    flash(f'Error uploading to cloud storage: {str(retry_error)}', 'error')
+                flash(f'Error uploading to cloud storage: {str(storage_error)}', 'error')
                     
         else:
             flash('Invalid file type. Only PDF files are allowed.', 'error')
@@ -1326,25 +1044,22 @@ def delete_model_paper(paper_id):
     
     try:
         # Get paper details first
-        paper_response = supabase.table('model_papers').select('*').eq('id', paper_id).execute()
-        if paper_response.data:
-            paper = paper_response.data[0]
+        paper = repos.model_papers.get(paper_id)
+        if paper:
             company_id = paper['company_id']
+            storage_key = paper.get('storage_key')
             
-            # Extract filename from URL for Supabase Storage deletion
-            file_url = paper['file_url']
-            if 'model-papers' in file_url:
-                # Extract filename from Supabase Storage URL
-                filename = file_url.split('/')[-1]
+            if storage_key and paper_storage:
                 try:
-                    # Delete file from Supabase Storage
-                    supabase.storage.from_('model-papers').remove([filename])
+                    # Delete file from storage by its object key
+                    paper_storage.delete([storage_key])
                 except Exception as storage_error:
-                    print(f"Warning: Could not delete file from storage: {str(storage_error)}")
+                    logger.warning('Could not delete model paper %s from storage: %s', storage_key, storage_error)
                     # Continue with database deletion even if file deletion fails
             
             # Delete from database
-            supabase.table('model_papers').delete().eq('id', paper_id).execute()
+            repos.model_papers.delete(paper_id)
+            query_cache.invalidate('model_papers', id=paper_id, company_id=company_id, storage_key=storage_key)
             flash('Model paper deleted successfully!', 'success')
             return redirect(url_for('company_details', company_id=company_id))
         else:
@@ -1356,14 +1071,15 @@ def delete_model_paper(paper_id):
 
 @app.route('/uploads/model_papers/<filename>')
 def download_model_paper(filename):
-    """Download model paper - redirect to Supabase Storage URL"""
+    """Download model paper - redirect to its public storage URL"""
     try:
-        # For Supabase Storage, we'll redirect to the public URL
-        # The file_url in database already contains the full public URL
-        paper_response = supabase.table('model_papers').select('file_url, paper_name').like('file_url', f'%{filename}%').execute()
-        if paper_response.data:
-            file_url = paper_response.data[0]['file_url']
-            return redirect(file_url)
+        # Exact match on the unique storage_key index; the key -> URL mapping is
+        # served from query_cache, and browsers may reuse the redirect too
+        papers = cached_select('model_papers', 'file_url', storage_key=filename)
+        if papers:
+            response = redirect(papers[0]['file_url'])
+            response.headers['Cache-Control'] = f'public, max-age={MODEL_PAPER_REDIRECT_MAX_AGE}'
+            return response
         else:
             flash('File not found', 'error')
             return redirect(url_for('index'))
@@ -1377,32 +1093,29 @@ def edit_student(student_id):
     if not session.get('admin_logged_in'):
         return redirect(url_for('admin_login'))
 
-    # Fetch student info
-    student_response = supabase.table('selected_students').select('*').eq('id', student_id).execute()
-    if not student_response.data:
+    # Fetch student info together with the company's rounds. The company id is
+    # only known from the student row, so embed it instead of a second round trip.
+    student = repos.students.get_with_company(student_id)
+    if not student:
         flash('Student not found', 'error')
         return redirect(url_for('admin_dashboard'))
-    student = student_response.data[0]
+    company = student.pop('companies', None)
 
-    # Fetch company info for rounds
     company_id = student['company_id']
-    company_response = supabase.table('companies').select('name, hiring_rounds').eq('id', company_id).execute()
-    if company_response.data:
-        company_name = company_response.data[0]['name']
-        hiring_rounds_str = company_response.data[0].get('hiring_rounds', '')
-        company_rounds = [r.strip() for r in hiring_rounds_str.split(',') if r.strip()]
+    if company:
+        company_name = company['name']
+        company_rounds = parse_hiring_rounds(company)
     else:
         company_name = 'Unknown'
         company_rounds = []
 
     if request.method == 'POST':
         try:
-            new_student_number = request.form.get('student_number')
+            new_student_number = normalize_student_number(request.form.get('student_number'))
             
             # Check for duplicate student number within the same company (only if student number is being changed)
             if new_student_number != student['student_number']:
-                existing_student = supabase.table('selected_students').select('*').eq('student_number', new_student_number).eq('company_id', company_id).execute()
-                if existing_student.data:
+                if repos.students.number_taken(company_id, new_student_number):
                     flash(f'Student with roll number {new_student_number} already exists in this company!', 'error')
                     return render_template('edit_student.html', student=student, company_id=company_id, company_name=company_name, company_rounds=company_rounds)
             
@@ -1414,7 +1127,8 @@ def edit_student(student_id):
                 'max_round_reached': request.form.get('max_round_reached'),
                 'updated_at': datetime.now().isoformat()
             }
-            supabase.table('selected_students').update(update_data).eq('id', student_id).execute()
+            repos.students.update(student_id, update_data)
+            query_cache.invalidate('selected_students', id=student_id, company_id=company_id)
             flash('Student updated successfully!', 'success')
             return redirect(url_for('company_details', company_id=company_id))
         except Exception as e:
@@ -1423,73 +1137,49 @@ def edit_student(student_id):
     return render_template('edit_student.html', student=student, company_id=company_id, company_name=company_name, company_rounds=company_rounds)
 
 # SEO Routes
+# Built sitemap documents (plain and gzip), kept until the companies change
+sitemaps = SitemapCache()
+
+def load_sitemaps(base_url):
+    """Sitemap documents for base_url, rebuilt only when a companies write changed the table"""
+    # [row count, newest updated_at]: cached under companies, so any company write invalidates it
+    version = query_cache.get_or_load('companies', 'latest_change()', {}, repos.companies.latest_change)
+    return sitemaps.get(base_url, version, lambda: repos.companies.select('id, updated_at, created_at'))
+
 @app.route('/sitemap.xml')
-def sitemap():
-    """Generate dynamic sitemap for SEO"""
+@app.route('/sitemap-<int:page>.xml')
+def sitemap(page=None):
+    """Serve the cached sitemap (or one file of a split sitemap), gzip-encoded when accepted"""
+    base_url = request.url_root.rstrip('/')
     try:
-        # Get all companies for dynamic URLs
-        companies_response = supabase.table('companies').select('id, name, updated_at').execute()
-        companies = companies_response.data
-        
-        # Base URL (you should replace this with your actual domain)
-        base_url = request.url_root.rstrip('/')
-        
-        # Generate sitemap XML
-        sitemap_xml = '''<?xml version="1.0" encoding="UTF-8"?>
-<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-    <url>
-        <loc>{base_url}/</loc>
-        <lastmod>{lastmod}</lastmod>
-        <changefreq>daily</changefreq>
-        <priority>1.0</priority>
-    </url>
-    <url>
-        <loc>{base_url}/developers</loc>
-        <lastmod>{lastmod}</lastmod>
-        <changefreq>monthly</changefreq>
-        <priority>0.7</priority>
-    </url>'''.format(base_url=base_url, lastmod=datetime.now().strftime('%Y-%m-%d'))
-        
-        # Add company pages
-        for company in companies:
-            company_lastmod = company.get('updated_at', company.get('created_at', datetime.now().isoformat()))
-            try:
-                # Parse the datetime string and format it for sitemap
-                if isinstance(company_lastmod, str):
-                    company_date = datetime.fromisoformat(company_lastmod.replace('Z', '+00:00'))
-                    formatted_date = company_date.strftime('%Y-%m-%d')
-                else:
-                    formatted_date = datetime.now().strftime('%Y-%m-%d')
-            except:
-                formatted_date = datetime.now().strftime('%Y-%m-%d')
-            
-            sitemap_xml += '''
-    <url>
-        <loc>{base_url}/company/{company_id}</loc>
-        <lastmod>{lastmod}</lastmod>
-        <changefreq>weekly</changefreq>
-        <priority>0.8</priority>
-    </url>'''.format(base_url=base_url, company_id=company['id'], lastmod=formatted_date)
-        
-        sitemap_xml += '''
-</urlset>'''
-        
-        response = Response(sitemap_xml, mimetype='application/xml')
-        return response
-        
+        documents = load_sitemaps(base_url)
     except Exception as e:
+        logger.warning('Sitemap unavailable, serving the home page only: %s', e)
         # Return basic sitemap if database error
         basic_sitemap = '''<?xml version="1.0" encoding="UTF-8"?>
 <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
     <url>
         <loc>{base_url}/</loc>
-        <lastmod>{lastmod}</lastmod>
         <changefreq>daily</changefreq>
         <priority>1.0</priority>
     </url>
-</urlset>'''.format(base_url=request.url_root.rstrip('/'), lastmod=datetime.now().strftime('%Y-%m-%d'))
+</urlset>'''.format(base_url=base_url)
         
         return Response(basic_sitemap, mimetype='application/xml')
+    
+    document = documents.get('sitemap.xml' if page is None else f'sitemap-{page}.xml')
+    if document is None:
+        return Response('Not found', status=404, mimetype='text/plain')
+    
+    # Each encoding is its own representation with its own ETag
+    if request.accept_encodings['gzip']:
+        body, etag, headers = document.gzipped, f'{document.etag}-gz', {'Content-Encoding': 'gzip'}
+    else:
+        body, etag, headers = document.body, document.etag, {}
+    response = conditional_response(lambda: Response(body, mimetype='application/xml', headers=headers),
+                                    etag, document.last_modified, max_age=3600, shared_max_age=3600)
+    response.vary.add('Accept-Encoding')
+    return response
 
 @app.route('/robots.txt')
 def robots():
@@ -1509,7 +1199,8 @@ Sitemap: {base_url}/sitemap.xml
 # Crawl delay (optional)
 Crawl-delay: 1'''.format(base_url=base_url)
     
-    return Response(robots_txt, mimetype='text/plain')
+    return conditional_response(lambda: Response(robots_txt, mimetype='text/plain'),
+                                max_age=86400, shared_max_age=86400)
 
 # ============================================
 # STUDENT AUTHENTICATION ROUTES
@@ -1530,17 +1221,9 @@ def generate_otp():
     return str(random.randint(100000, 999999))
 
 def send_otp_email(email, otp):
-    """Send OTP email to student"""
+    """Queue the OTP email (or send it, with inline delivery); returns False if it can't go out"""
     try:
-        print(f"Attempting to send email to: {email}")
-        print(f"Using MAIL_USERNAME: {app.config['MAIL_USERNAME']}")
-        print(f"Using MAIL_SERVER: {app.config['MAIL_SERVER']}")
-        
-        msg = Message(
-            'Password Reset OTP - Placement Tracker',
-            recipients=[email]
-        )
-        msg.body = f'''Hello,
+        body = f'''Hello,
 
 You have requested to reset your password for the Placement Tracker system.
 
@@ -1554,13 +1237,19 @@ Best regards,
 Placement Tracker Team
 GMRIT'''
         
-        mail.send(msg)
-        print(f"Email sent successfully to {email}")
+        # An OTP delivered after it expired is useless, so the outbox drops it instead
+        message_id = email_outbox.enqueue(email, 'Password Reset OTP - Placement Tracker', body,
+                                          expires_at=(datetime.now() + timedelta(minutes=10)).timestamp())
+        if not email_outbox.background:
+            # No worker will run after the response: send now and report a failure to the user
+            status = email_outbox.deliver(message_id)
+            if status != 'sent':
+                logger.warning('OTP email %s to %s not sent: %s', message_id, email, status)
+                return False
+        logger.info('OTP email %s %s for %s', message_id, 'queued' if email_outbox.background else 'sent', email)
         return True
     except Exception as e:
-        print(f"Error sending email: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception('Error queueing OTP email for %s', email)
         return False
 
 @app.route('/student/register', methods=['GET', 'POST'])
@@ -1569,7 +1258,7 @@ def student_register():
     if request.method == 'POST':
         try:
             full_name = request.form.get('full_name', '').strip()
-            student_number = request.form.get('student_number', '').strip().upper()
+            student_number = normalize_student_number(request.form.get('student_number'))
             email = request.form.get('email', '').strip().lower()
             password = request.form.get('password', '')
             confirm_password = request.form.get('confirm_password', '')
@@ -1595,20 +1284,8 @@ def student_register():
                 flash('Password must be at least 8 characters long!', 'error')
                 return render_template('student_register.html')
             
-            # Check if email already exists
-            response = supabase.table('studentdetails').select('*').eq('email', email).execute()
-            if response.data:
-                flash('Email already registered! Please login.', 'error')
-                return render_template('student_register.html')
-            
-            # Check if student number already exists
-            response = supabase.table('studentdetails').select('*').eq('student_number', student_number).execute()
-            if response.data:
-                flash('Student number already registered!', 'error')
-                return render_template('student_register.html')
-            
             # Hash password
-            password_hash = generate_password_hash(password)
+            password_hash = password_hasher.hash(password)
             
             # Insert into database
             data = {
@@ -1619,9 +1296,19 @@ def student_register():
                 'is_verified': False
             }
             
-            response = supabase.table('studentdetails').insert(data).execute()
+            # One round trip: the unique email / student_number constraints reject duplicates
+            try:
+                rows = repos.student_details.create(data)
+            except DuplicateKeyError as e:
+                if 'student_number' in e.columns:
+                    flash('Student number already registered!', 'error')
+                elif 'email' in e.columns:
+                    flash('Email already registered! Please login.', 'error')
+                else:
+                    flash('Email or student number already registered!', 'error')
+                return render_template('student_register.html')
             
-            if response.data:
+            if rows:
                 flash('Registration successful! Please login.', 'success')
                 return redirect(url_for('student_login'))
             else:
@@ -1629,7 +1316,7 @@ def student_register():
                 return render_template('student_register.html')
             
         except Exception as e:
-            print(f"Registration error: {str(e)}")
+            logger.exception('Registration error')
             flash('An error occurred during registration. Please try again.', 'error')
             return render_template('student_register.html')
     
@@ -1652,29 +1339,35 @@ def student_login():
                 return render_template('student_login.html')
             
             # Get student from database
-            response = supabase.table('studentdetails').select('*').eq('email', email).execute()
+            student = repos.student_details.get_by_email(email)
             
-            if not response.data:
+            if not student:
                 flash('Invalid email or password!', 'error')
                 return render_template('student_login.html')
             
-            student = response.data[0]
-            
             # Verify password
-            if not check_password_hash(student['password_hash'], password):
+            if not password_hasher.verify(student['password_hash'], password):
                 flash('Invalid email or password!', 'error')
                 return render_template('student_login.html')
             
+            # Upgrade a hash made with older parameters, off the request path. Only if the
+            # stored hash is unchanged: a password reset in between must not be overwritten.
+            if password_hasher.needs_rehash(student['password_hash']):
+                password_hasher.rehash_later(password, lambda password_hash: repos.student_details.replace_password_hash(
+                    student['id'], student['password_hash'], password_hash))
+            
             # Set session
             session['student_id'] = str(student['id'])
             session['student_email'] = student['email']
             session['student_name'] = student['full_name']
+            # The dashboard this redirects to is served from the row just read
+            student_profiles.put(student)
             
             flash(f'Welcome back, {student["full_name"]}!', 'success')
             return redirect(url_for('student_dashboard'))
             
         except Exception as e:
-            print(f"Login error: {str(e)}")
+            logger.exception('Login error')
             flash('An error occurred during login. Please try again.', 'error')
             return render_template('student_login.html')
     
@@ -1688,19 +1381,17 @@ def student_dashboard():
         return redirect(url_for('student_login'))
     
     try:
-        # Get student details
-        response = supabase.table('studentdetails').select('*').eq('id', session['student_id']).execute()
+        # Get student details (cached profile fields)
+        student = student_profiles.get(session['student_id'])
         
-        if not response.data:
+        if not student:
             session.clear()
             flash('Student not found. Please login again.', 'error')
             return redirect(url_for('student_login'))
-        
-        student = response.data[0]
         return render_template('student_dashboard.html', student=student)
         
     except Exception as e:
-        print(f"Dashboard error: {str(e)}")
+        logger.exception('Dashboard error')
         flash('An error occurred. Please try again.', 'error')
         return redirect(url_for('student_login'))
 
@@ -1729,9 +1420,7 @@ def student_forgot_password():
                 return render_template('student_forgot_password.html')
             
             # Check if email exists
-            response = supabase.table('studentdetails').select('*').eq('email', email).execute()
-            
-            if not response.data:
+            if not repos.student_details.get_by_email(email):
                 flash('Email not found! Please register first.', 'error')
                 return render_template('student_forgot_password.html')
             
@@ -1745,7 +1434,7 @@ def student_forgot_password():
                 'otp_expiry': otp_expiry
             }
             
-            supabase.table('studentdetails').update(update_data).eq('email', email).execute()
+            repos.student_details.update_by_email(email, update_data)
             
             # Send OTP email
             if send_otp_email(email, otp):
@@ -1756,7 +1445,7 @@ def student_forgot_password():
                 return render_template('student_forgot_password.html')
             
         except Exception as e:
-            print(f"Forgot password error: {str(e)}")
+            logger.exception('Forgot password error')
             flash('An error occurred. Please try again.', 'error')
             return render_template('student_forgot_password.html')
     
@@ -1790,14 +1479,12 @@ def student_reset_password():
                 return render_template('student_reset_password.html', email=email)
             
             # Get student details
-            response = supabase.table('studentdetails').select('*').eq('email', email).execute()
+            student = repos.student_details.get_by_email(email)
             
-            if not response.data:
+            if not student:
                 flash('Student not found!', 'error')
                 return redirect(url_for('student_forgot_password'))
             
-            student = response.data[0]
-            
             # Verify OTP
             if not student.get('otp_code') or student['otp_code'] != otp:
                 flash('Invalid OTP!', 'error')
@@ -1821,7 +1508,7 @@ def student_reset_password():
                     return redirect(url_for('student_forgot_password'))
             
             # Hash new password
-            password_hash = generate_password_hash(new_password)
+            password_hash = password_hasher.hash(new_password)
             
             # Update password and clear OTP
             update_data = {
@@ -1830,13 +1517,14 @@ def student_reset_password():
                 'otp_expiry': None
             }
             
-            supabase.table('studentdetails').update(update_data).eq('email', email).execute()
+            repos.student_details.update_by_email(email, update_data)
+            student_profiles.invalidate(student['id'])
             
             flash('Password reset successful! Please login with your new password.', 'success')
             return redirect(url_for('student_login'))
             
         except Exception as e:
-            print(f"Reset password error: {str(e)}")
+            logger.exception('Reset password error')
             flash('An error occurred. Please try again.', 'error')
             return render_template('student_reset_password.html', email=email)
     
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for /company/<id> against a local PostgREST stub.
+
+Compares the three company_details reads run one after another
+(QUERY_BATCH_WORKERS=0) with the concurrent fan-out through fetch_all().
+The query cache is cleared before every request so each one hits the stub.
+
+Usage: python benchmarks/bench_company_details.py [latency_ms]
+"""
+
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supabase import create_client
+
+import app as placement_app
+import query_batch
+from repositories import Repositories, SupabaseBackend
+from sample_data import make_companies, make_students
+from stub_postgrest import STUB_KEY, StubPostgrest
+
+REQUESTS = 20
+
+
+def measure(client, company_id):
+    timings = []
+    for _ in range(REQUESTS):
+        placement_app.query_cache.clear()
+        start = time.perf_counter()
+        response = client.get(f'/company/{company_id}')
+        timings.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.status_code
+    return statistics.median(timings) * 1000
+
+
+def main():
+    latency = float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.05
+    companies = make_companies(50)
+    tables = {
+        'companies': companies,
+        'selected_students': make_students(companies, 60),
+        'model_papers': []
+    }
+    company_id = companies[0]['id']
+
+    with StubPostgrest(tables, latency=latency) as stub:
+        placement_app.repos = Repositories(SupabaseBackend(create_client(stub.url, STUB_KEY)))
+        client = placement_app.app.test_client()
+
+        query_batch.MAX_WORKERS = 0
+        sequential = measure(client, company_id)
+        query_batch.MAX_WORKERS = 8
+        concurrent = measure(client, company_id)
+
+    print(f"Stub latency per query: {latency * 1000:.0f} ms")
+    print(f"Sequential reads:       {sequential:.1f} ms (median of {REQUESTS})")
+    print(f"Concurrent fetch_all(): {concurrent:.1f} ms (median of {REQUESTS})")
+    print(f"Speedup:                {sequential / concurrent:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Peak memory and time of the Excel export for a full-batch report.
+
+Peak Python allocation (tracemalloc) should stay roughly flat as the number
+of students per company grows, since rows are flushed as they are written.
+
+Usage: python benchmarks/bench_excel_export.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from excel_report import write_excel_report
+from placement_stats import PlacementStats
+from sample_data import make_companies, make_students
+
+SIZES = [(20, 250), (20, 1000), (20, 4000)]
+
+
+def main():
+    print(f"{'companies':>10} {'per co.':>8} {'rows':>8} {'time ms':>9} {'peak MB':>8} {'file KB':>8}")
+    for company_count, per_company in SIZES:
+        companies = make_companies(company_count)
+        stats = PlacementStats(companies, make_students(companies, per_company))
+        for company in companies:
+            stats.students_for(company['id'])  # sort up front so only the export is measured
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        path = write_excel_report(stats)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        size = os.path.getsize(path)
+        os.remove(path)
+        print(f"{company_count:>10} {per_company:>8} {len(stats.students):>8} "
+              f"{elapsed * 1000:>9.0f} {peak / 1024 / 1024:>8.2f} {size / 1024:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
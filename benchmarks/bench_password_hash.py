@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Password verification cost per hash method: logins/sec per core.
+
+For each method the benchmark times check_password_hash (what a login does)
+  1 thread     verifies in a row on one thread: ms per login, logins/sec per core
+  pool         the same number of verifies through PasswordHasher with one
+               worker per core: logins/sec for the whole machine
+
+Pass --method to time the value you plan to put in PASSWORD_HASH_METHOD.
+
+Usage: python benchmarks/bench_password_hash.py [--logins 20] [--method scrypt:16384:8:1 ...]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from password_hashing import PasswordHasher, canonical_method
+
+METHODS = ['scrypt:32768:8:1', 'scrypt:16384:8:1', 'pbkdf2:sha256:1000000', 'pbkdf2:sha256:600000']
+PASSWORD = 'Placement@2025'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--logins', type=int, default=20, help='verifies timed per method')
+    parser.add_argument('--method', action='append', help='hash method to time (repeatable)')
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    print(f"{cores} core(s), {args.logins} logins per method\n")
+    print(f"{'method':<24} {'ms/login':>9} {'logins/s/core':>14} {'pool logins/s':>14}")
+    for method in args.method or METHODS:
+        method = canonical_method(method)
+        stored = generate_password_hash(PASSWORD, method)
+
+        start = time.perf_counter()
+        for _ in range(args.logins):
+            assert check_password_hash(stored, PASSWORD)
+        single = (time.perf_counter() - start) / args.logins
+
+        hasher = PasswordHasher(method, workers=cores)
+        with ThreadPoolExecutor(max_workers=cores * 2) as requests:
+            start = time.perf_counter()
+            assert all(requests.map(lambda _: hasher.verify(stored, PASSWORD), range(args.logins)))
+            pooled = time.perf_counter() - start
+
+        print(f"{method:<24} {single * 1000:>9.1f} {1 / single:>14.1f} {args.logins / pooled:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Time of the PDF report for a full batch, laid out in-process and in sections
+across worker processes (PDF_RENDER_WORKERS).
+
+The speedup is bounded by the number of CPU cores; on a single core the
+parallel run only adds process start-up and merge overhead.
+
+Usage: python benchmarks/bench_pdf_report.py [--companies 200] [--students 50] [--workers 4]
+"""
+
+import argparse
+import os
+import sys
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdf_report
+from placement_stats import PlacementStats
+from sample_data import make_companies, make_students
+
+
+def page_count(data):
+    from pypdf import PdfReader
+    return len(PdfReader(BytesIO(data)).pages)
+
+
+def render(stats, workers):
+    output = BytesIO()
+    start = time.perf_counter()
+    pdf_report.write_pdf_report(stats, output, workers=workers)
+    return time.perf_counter() - start, output.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--companies', type=int, default=200)
+    parser.add_argument('--students', type=int, default=50, help='selected students per company')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    companies = make_companies(args.companies)
+    stats = PlacementStats(companies, make_students(companies, args.students))
+    for company in companies:
+        stats.students_for(company['id'])  # sort up front so only the layout is measured
+
+    print(f"{args.companies} companies x {args.students} students, {os.cpu_count()} CPU(s)\n")
+    print(f"{'mode':<16} {'time ms':>9} {'pages':>6} {'file KB':>8}")
+    sequential, data = render(stats, workers=0)
+    print(f"{'in-process':<16} {sequential * 1000:>9.0f} {page_count(data):>6} {len(data) / 1024:>8.0f}")
+
+    if args.workers > 1:
+        # The first run pays for starting the pool; later reports reuse it
+        cold, _ = render(stats, workers=args.workers)
+        warm, data = render(stats, workers=args.workers)
+        label = f'{args.workers} workers'
+        print(f"{label + ' (cold)':<16} {cold * 1000:>9.0f}")
+        print(f"{label:<16} {warm * 1000:>9.0f} {page_count(data):>6} {len(data) / 1024:>8.0f}")
+        print(f"\nSpeedup: {sequential / warm:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the placement report statistics.
+
+Times PlacementStats plus the Excel and PDF exports at growing data sizes.
+Time per student row should stay roughly flat if the reports are linear.
+
+Usage: python benchmarks/bench_reports.py
+"""
+
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from excel_report import write_excel_report
+from pdf_report import write_pdf_report
+from placement_stats import PlacementStats, PlacementSummary, summarize_students
+from sample_data import make_companies, make_students
+
+SIZES = [(25, 20), (50, 40), (100, 80), (200, 160)]
+
+
+def excel_report(stats):
+    os.remove(write_excel_report(stats))
+
+
+def pdf_report(stats):
+    write_pdf_report(stats, io.BytesIO())
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    print(f"{'companies':>10} {'students':>10} {'stats ms':>10} {'excel ms':>10} {'pdf ms':>10} {'us/row':>10}")
+    for company_count, per_company in SIZES:
+        companies = make_companies(company_count)
+        students = make_students(companies, per_company)
+
+        stats, stats_time = timed(PlacementStats, companies, students)
+        # The reports page renders PlacementSummary (here via the Python fallback aggregation)
+        _, company_stats_time = timed(lambda: PlacementSummary(companies, summarize_students(students)).company_stats())
+        _, excel_time = timed(excel_report, PlacementStats(companies, students))
+        _, pdf_time = timed(pdf_report, PlacementStats(companies, students))
+
+        total = stats_time + company_stats_time + excel_time + pdf_time
+        print(f"{company_count:>10} {len(students):>10} "
+              f"{(stats_time + company_stats_time) * 1000:>10.1f} {excel_time * 1000:>10.1f} "
+              f"{pdf_time * 1000:>10.1f} {total / len(students) * 1e6:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
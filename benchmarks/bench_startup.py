@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the WSGI entry points.
+
+Imports each entry point in a fresh interpreter, as a serverless cold start
+would, and reports import time, peak RSS and the number of loaded modules.
+It also times the first request to a page that doesn't touch the database.
+
+Usage: python benchmarks/bench_startup.py [runs]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINTS = ['app', 'api.index']
+
+CHILD = '''
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+module = __import__({entry!r}, fromlist=['app'])
+import_time = time.perf_counter() - start
+start = time.perf_counter()
+module.app.test_client().get('/robots.txt')
+first_request = time.perf_counter() - start
+print(json.dumps({{
+    'import_ms': import_time * 1000,
+    'first_request_ms': first_request * 1000,
+    'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'modules': len(sys.modules)
+}}))
+'''
+
+
+def run_once(entry):
+    env = dict(os.environ)
+    # Credentials must be present so client construction is part of the measurement
+    env.setdefault('SUPABASE_URL', 'http://127.0.0.1:9')
+    env.setdefault('SUPABASE_ANON_KEY', 'eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.c3R1Yg')
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD.format(root=ROOT, entry=entry)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{'entry point':<12} {'import ms':>10} {'1st req ms':>11} {'RSS MB':>8} {'modules':>8}")
+    for entry in ENTRY_POINTS:
+        results = [run_once(entry) for _ in range(runs)]
+        print(f"{entry:<12} "
+              f"{statistics.median(r['import_ms'] for r in results):>10.0f} "
+              f"{statistics.median(r['first_request_ms'] for r in results):>11.1f} "
+              f"{statistics.median(r['rss_mb'] for r in results):>8.1f} "
+              f"{results[0]['modules']:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Priority ordering of a company's students: Python sort vs. stored priority_rank.
+
+For each company size the benchmark times
+  python sort      sort_students_by_priority() on rows without priority_rank
+                   (the fallback, parses max_round_reached per row)
+  ranked sort      the same sort on rows carrying the stored priority_rank
+  select + sort    SQLite select of the company, then the Python fallback sort
+  ordered select   SQLite select ORDER BY priority_rank, name on
+                   idx_selected_students_company_rank (what company_details does)
+
+Usage: python benchmarks/bench_student_order.py [--repeat 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from placement_stats import sort_students_by_priority, ensure_priority_order, priority_rank
+from repositories import Repositories
+from sample_data import make_companies, make_students
+from sqlite_backend import SQLiteBackend
+
+SIZES = [50, 200, 1000]
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'students':>9} {'python sort':>12} {'ranked sort':>12} {'select+sort':>12} {'ordered sel':>12}   (ms per company)")
+    for per_company in SIZES:
+        repos = Repositories(SQLiteBackend())
+        companies = repos.companies.create(make_companies(10))
+        # One row per roll number per company, as the unique index requires
+        rows = {(row['company_id'], row['student_number']): row for row in make_students(companies, per_company)}
+        repos.students.create(list(rows.values()))
+        company_id = companies[0]['id']
+
+        plain = [row for row in rows.values() if row['company_id'] == company_id]
+        ranked = [dict(row, priority_rank=priority_rank(row['max_round_reached'])) for row in plain]
+
+        expected, python_sort = timed(lambda: sort_students_by_priority(plain), args.repeat)
+        _, ranked_sort = timed(lambda: sort_students_by_priority(ranked), args.repeat)
+        _, select_sort = timed(lambda: sort_students_by_priority(repos.students.for_company(company_id)), args.repeat)
+        ordered, ordered_select = timed(lambda: ensure_priority_order(repos.students.for_company(company_id, ordered=True)), args.repeat)
+
+        assert [row['id'] for row in ordered] == [row['id'] for row in expected], 'database order differs from Python order'
+        print(f"{len(plain):>9} {python_sort * 1000:>12.3f} {ranked_sort * 1000:>12.3f} "
+              f"{select_sort * 1000:>12.3f} {ordered_select * 1000:>12.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Locust-style load test for the main routes, run on one machine.
+
+The app is pointed at a SQLite backend (sqlite_backend.py) seeded with
+realistic data sizes, so no Supabase project or network is involved; timings
+cover Flask, the repositories, the query cache and template rendering.
+Virtual users are threads with their own test client and session. Student
+users browse companies, company pages and their dashboard; admin users open
+the dashboard and reports, edit and add students. Each user picks weighted
+tasks back to back (no think time) until the duration is up.
+
+Usage: python benchmarks/load_test.py [--users 8] [--duration 20]
+                                      [--companies 200] [--students 50]
+                                      [--db :memory:] [--no-cache] [--rate-limits]
+"""
+
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import generate_password_hash
+
+import app as placement_app
+from query_cache import QueryCache
+from repositories import Repositories
+from request_metrics import InstrumentedBackend
+from sample_data import make_companies, make_students
+from sqlite_backend import SQLiteBackend
+
+STUDENT_PASSWORD = 'loadtest-password'
+ADMIN_SHARE = 0.2  # Fraction of virtual users that are admins
+
+
+def seed(repos, company_count, per_company, registered_students):
+    companies = repos.companies.create(make_companies(company_count))
+    # Roll numbers are unique within a company (idx_selected_students_company_number)
+    students = {(row['company_id'], row['student_number']): row for row in make_students(companies, per_company)}
+    students = repos.students.create(list(students.values()))
+    repos.model_papers.create([
+        {
+            'company_id': company['id'],
+            'paper_name': f'{company["name"]} paper {i}',
+            'file_url': f'https://example.supabase.co/storage/v1/object/public/model-papers/{company["id"]}_{i}.pdf',
+            'storage_key': f'{company["id"]}_{i}.pdf',
+            'file_size': 250000,
+            'uploaded_by': 'admin@placement.com'
+        }
+        for company in companies for i in range(2)
+    ])
+    # One hash for everyone: hashing thousands of passwords would dominate setup
+    password_hash = generate_password_hash(STUDENT_PASSWORD)
+    details = repos.student_details.create([
+        {
+            'email': f'22341a{i:04d}@gmrit.edu.in',
+            'password_hash': password_hash,
+            'full_name': f'Student {i:04d}',
+            'student_number': f'22341A{i:04d}',
+            'is_verified': True
+        }
+        for i in range(registered_students)
+    ])
+    return companies, students, details
+
+
+class StudentUser:
+    def __init__(self, client, rnd, data):
+        self.client = client
+        self.rnd = rnd
+        self.companies, _, details = data
+        self.student = rnd.choice(details)
+        with client.session_transaction() as session:
+            session['student_id'] = self.student['id']
+            session['student_email'] = self.student['email']
+            session['student_name'] = self.student['full_name']
+
+    def companies_page(self):
+        return self.client.get('/companies')
+
+    def companies_search(self):
+        return self.client.get('/companies', query_string={'q': f'company {self.rnd.randint(0, 19):02d}', 'min_ctc': 10})
+
+    def companies_next_page(self):
+        first = self.client.get('/api/companies').get_json()
+        return self.client.get('/api/companies', query_string={'cursor': first['next_cursor'] or ''})
+
+    def company_details(self):
+        return self.client.get(f'/company/{self.rnd.choice(self.companies)["id"]}')
+
+    def dashboard(self):
+        return self.client.get('/student/dashboard')
+
+    def login(self):
+        return self.client.post('/student/login', data={'email': self.student['email'], 'password': STUDENT_PASSWORD})
+
+    def sitemap(self):
+        return self.client.get('/sitemap.xml')
+
+    def download_paper(self):
+        return self.client.get(f'/uploads/model_papers/{self.rnd.choice(self.companies)["id"]}_{self.rnd.randint(0, 1)}.pdf')
+
+    tasks = {
+        companies_page: 10,
+        companies_search: 3,
+        companies_next_page: 2,
+        company_details: 10,
+        dashboard: 3,
+        login: 1,
+        sitemap: 1,
+        download_paper: 2
+    }
+
+
+class AdminUser:
+    def __init__(self, client, rnd, data):
+        self.client = client
+        self.rnd = rnd
+        self.companies, self.students, _ = data
+        with client.session_transaction() as session:
+            session['admin_logged_in'] = True
+            session['admin_email'] = 'admin@placement.com'
+
+    def dashboard(self):
+        return self.client.get('/admin/dashboard')
+
+    def company_details(self):
+        return self.client.get(f'/company/{self.rnd.choice(self.companies)["id"]}')
+
+    def reports(self):
+        return self.client.get('/admin/reports')
+
+    def edit_student_form(self):
+        return self.client.get(f'/admin/edit_student/{self.rnd.choice(self.students)["id"]}')
+
+    def add_student(self):
+        company_id = self.rnd.choice(self.companies)['id']
+        return self.client.post(f'/admin/add_student/{company_id}', data={
+            'name': 'Load Test Student',
+            'student_number': f'25341A{self.rnd.randint(0, 9999):04d}',
+            'email': 'loadtest@gmrit.edu.in',
+            'max_round_reached': 'Round 1'
+        })
+
+    tasks = {
+        dashboard: 5,
+        company_details: 5,
+        reports: 1,
+        edit_student_form: 2,
+        add_student: 1
+    }
+
+
+def run_user(user_class, seed_value, data, deadline, results, lock):
+    rnd = random.Random(seed_value)
+    user = user_class(placement_app.app.test_client(), rnd, data)
+    tasks, weights = zip(*user_class.tasks.items())
+    local = defaultdict(lambda: [[], 0])
+    while time.perf_counter() < deadline:
+        task = rnd.choices(tasks, weights)[0]
+        start = time.perf_counter()
+        response = task(user)
+        elapsed = time.perf_counter() - start
+        stats = local[f'{user_class.__name__}.{task.__name__}']
+        stats[0].append(elapsed)
+        # Redirects are normal for form posts; errors flash and redirect to / or the login page
+        if response.status_code >= 400 or response.headers.get('Location', '').endswith(('/', '/admin', '/student/login')):
+            stats[1] += 1
+    with lock:
+        for name, (timings, failures) in local.items():
+            results[name][0].extend(timings)
+            results[name][1] += failures
+
+
+def percentile(timings, fraction):
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--users', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=20, help='seconds')
+    parser.add_argument('--companies', type=int, default=200)
+    parser.add_argument('--students', type=int, default=50, help='selected students per company')
+    parser.add_argument('--registered', type=int, default=2000, help='rows in studentdetails')
+    parser.add_argument('--db', default=':memory:', help='SQLite file (default: in memory)')
+    parser.add_argument('--no-cache', action='store_true', help='disable the query cache')
+    parser.add_argument('--rate-limits', action='store_true', help='keep the login rate limits on')
+    args = parser.parse_args()
+
+    repos = Repositories(InstrumentedBackend(SQLiteBackend(args.db), placement_app.metrics))
+    start = time.perf_counter()
+    data = seed(repos, args.companies, args.students, args.registered)
+    print(f"Seeded {len(data[0])} companies, {len(data[1])} selected students, "
+          f"{len(data[2])} registered students in {time.perf_counter() - start:.1f} s")
+
+    placement_app.repos = repos
+    # Per-request JSON log lines would swamp the summary; /admin/metrics still counts them
+    logging.getLogger('placement_tracker.requests').setLevel(logging.WARNING)
+    if args.no_cache:
+        placement_app.query_cache = QueryCache(max_entries=0)
+    # Every virtual user logs in from one address, back to back: measure the login, not the 429
+    if not args.rate_limits:
+        placement_app.rate_limiter.enabled = False
+
+    results = defaultdict(lambda: [[], 0])
+    lock = threading.Lock()
+    admin_users = max(1, round(args.users * ADMIN_SHARE)) if args.users > 1 else 0
+    deadline = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target=run_user, args=(AdminUser if i < admin_users else StudentUser, i, data, deadline, results, lock))
+        for i in range(args.users)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(f"\n{args.users} users ({admin_users} admin) for {args.duration:.0f} s, query cache {'off' if args.no_cache else 'on'}\n")
+    print(f"{'task':<36} {'reqs':>7} {'fails':>6} {'req/s':>8} {'median ms':>10} {'p95 ms':>9} {'max ms':>9}")
+    all_timings, all_failures = [], 0
+    for name in sorted(results):
+        timings, failures = results[name]
+        all_timings.extend(timings)
+        all_failures += failures
+        print(f"{name:<36} {len(timings):>7} {failures:>6} {len(timings) / args.duration:>8.1f} "
+              f"{statistics.median(timings) * 1000:>10.1f} {percentile(timings, 0.95) * 1000:>9.1f} {max(timings) * 1000:>9.1f}")
+    if all_timings:
+        print(f"{'total':<36} {len(all_timings):>7} {all_failures:>6} {len(all_timings) / args.duration:>8.1f} "
+              f"{statistics.median(all_timings) * 1000:>10.1f} {percentile(all_timings, 0.95) * 1000:>9.1f} {max(all_timings) * 1000:>9.1f}")
+    print(f"\nQuery cache: {placement_app.query_cache.stats()}")
+
+
+if __name__ == '__main__':
+    main()
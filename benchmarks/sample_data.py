@@ -0,0 +1,50 @@
+"""
+Synthetic companies / selected_students rows shaped like the Supabase tables.
+Shared by the benchmark scripts in this folder.
+"""
+
+import random
+import uuid
+from datetime import datetime, timedelta
+
+STATUSES = ['Got Offer', 'Others', 'Round 1', 'Round 2', 'Round 3', 'Round 4']
+
+
+def make_companies(count, seed=2026):
+    rnd = random.Random(seed)
+    base_time = datetime(2025, 7, 1)
+    companies = []
+    for i in range(count):
+        created_at = base_time + timedelta(hours=i)
+        companies.append({
+            'id': str(uuid.UUID(int=rnd.getrandbits(128))),
+            'name': f'Company {i:04d}',
+            'hiring_rounds': ','.join(f'Round Name {r}' for r in range(1, rnd.randint(2, 5) + 1)),
+            'ctc_offer': f'₹{rnd.randint(4, 30)}.0 LPA',
+            'agreement_years': float(rnd.randint(0, 3)),
+            'logo_url': None,
+            'created_at': created_at.isoformat(),
+            'updated_at': created_at.isoformat()
+        })
+    return companies
+
+
+def make_students(companies, per_company, seed=2026):
+    rnd = random.Random(seed)
+    students = []
+    for company in companies:
+        for i in range(per_company):
+            roll = f'2{rnd.randint(0, 9)}341A12{rnd.choice("0123456789AB")}{rnd.randint(0, 9)}'
+            students.append({
+                'id': str(uuid.UUID(int=rnd.getrandbits(128))),
+                'company_id': company['id'],
+                'name': f'Student {rnd.randint(0, 99999):05d}',
+                'student_number': roll,
+                'email': f'{roll.lower()}@gmrit.edu.in',
+                'linkedin_id': None,
+                'max_round_reached': rnd.choice(STATUSES),
+                'created_at': company['created_at'],
+                'updated_at': company['updated_at']
+            })
+    rnd.shuffle(students)
+    return students
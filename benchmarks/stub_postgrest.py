@@ -0,0 +1,62 @@
+"""
+Minimal local stand-in for the Supabase REST endpoint (PostgREST) used by the
+benchmarks. Serves `eq.` filtered GETs over in-memory tables with a fixed
+artificial latency per request, so round-trip counts show up as wall time.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+# Any JWT-shaped string satisfies create_client's key check
+STUB_KEY = 'eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.c3R1Yg'
+
+
+class StubPostgrest:
+    def __init__(self, tables, latency=0.05):
+        self.tables = tables
+        self.latency = latency
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                stub.requests += 1
+                time.sleep(stub.latency)
+                parsed = urlparse(self.path)
+                table = parsed.path.rsplit('/', 1)[-1]
+                rows = stub.tables.get(table, [])
+                columns = None
+                for key, value in parse_qsl(parsed.query):
+                    if key == 'select':
+                        if value != '*' and '(' not in value:
+                            columns = [c.strip() for c in value.split(',')]
+                    elif value.startswith('eq.'):
+                        rows = [r for r in rows if str(r.get(key)) == value[3:]]
+                if columns:
+                    rows = [{c: r.get(c) for c in columns} for r in rows]
+                body = json.dumps(rows).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,108 @@
+"""
+Paginated, filterable companies listing.
+
+Newest companies come first. Pages are fetched with keyset pagination on
+(created_at DESC, id DESC), so every page is an index range scan no matter
+how deep the user pages. Filters map onto the indexed columns from
+database_schema.sql:
+  q          name prefix, matched on the lowercased `name_search` column
+  min_ctc    minimum CTC in LPA, on the numeric `ctc_lpa` column
+  max_years  maximum bond/agreement years
+"""
+
+import base64
+import json
+import re
+
+# Columns each view actually renders (created_at is also the cursor key)
+CARD_COLUMNS = 'id, name, logo_url, created_at'
+ADMIN_COLUMNS = 'id, name, logo_url, ctc_offer, agreement_years, created_at'
+
+DEFAULT_PAGE_SIZE = 24
+ADMIN_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+# Cursor values are spliced into a PostgREST filter, so only accept these shapes
+_TIMESTAMP_RE = re.compile(r'^\d{4}-\d{2}-\d{2}[T ][0-9:.]+(Z|[+-]\d{2}:?\d{2})?$')
+_UUID_RE = re.compile(r'^[0-9a-fA-F-]{36}$')
+
+
+def encode_cursor(row):
+    """Opaque cursor pointing just after `row`"""
+    raw = json.dumps([row['created_at'], str(row['id'])])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor(); returns None for a missing or malformed cursor"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, company_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        return None
+    if not _TIMESTAMP_RE.match(str(created_at)) or not _UUID_RE.match(str(company_id)):
+        return None
+    return str(created_at), str(company_id)
+
+
+def _to_float(value):
+    try:
+        return float(value) if value not in (None, '') else None
+    except ValueError:
+        return None
+
+
+def parse_listing_args(args, default_page_size=DEFAULT_PAGE_SIZE):
+    """Read listing filters and paging from request.args"""
+    try:
+        page_size = int(args.get('per_page', default_page_size))
+    except ValueError:
+        page_size = default_page_size
+    return {
+        'q': args.get('q', '').strip(),
+        'min_ctc': _to_float(args.get('min_ctc')),
+        'max_years': _to_float(args.get('max_years')),
+        'cursor': args.get('cursor', ''),
+        'per_page': max(1, min(page_size, MAX_PAGE_SIZE))
+    }
+
+
+def escape_like(value):
+    """Keep user input from acting as a LIKE wildcard"""
+    value = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return value.replace('*', '')
+
+
+def fetch_companies_page(client, listing, columns=CARD_COLUMNS):
+    """Fetch one page of companies.
+
+    Returns {'rows': [...], 'next_cursor': str or None, 'total': int or None}.
+    total counts every company matching the filters and is only requested for
+    the first page; later pages return None.
+    """
+    after = decode_cursor(listing['cursor'])
+    query = client.table('companies').select(columns, count=None if after else 'exact')
+
+    if listing['q']:
+        query = query.like('name_search', f"{escape_like(listing['q'].lower())}%")
+    if listing['min_ctc'] is not None:
+        query = query.gte('ctc_lpa', listing['min_ctc'])
+    if listing['max_years'] is not None:
+        query = query.lte('agreement_years', listing['max_years'])
+
+    if after:
+        created_at, company_id = after
+        query = query.or_(f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{company_id})')
+
+    # Fetch one extra row to know whether another page exists
+    page_size = listing['per_page']
+    response = query.order('created_at', desc=True).order('id', desc=True).limit(page_size + 1).execute()
+    return page_result(response.data, page_size, response.count)
+
+
+def page_result(rows, page_size, total):
+    """Listing page from up to page_size + 1 rows fetched in cursor order"""
+    next_cursor = encode_cursor(rows[page_size - 1]) if len(rows) > page_size else None
+    return {'rows': rows[:page_size], 'next_cursor': next_cursor, 'total': total}
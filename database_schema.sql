@@ -16,6 +16,49 @@ ALTER TABLE selected_students ALTER COLUMN max_round_reached TYPE VARCHAR(50);
 
 -- Add logo_url column to companies table if it doesn't exist
 ALTER TABLE companies ADD COLUMN IF NOT EXISTS logo_url VARCHAR(500);
+
+-- Searchable/filterable columns for the paginated companies listing
+ALTER TABLE companies ADD COLUMN IF NOT EXISTS name_search VARCHAR(255) GENERATED ALWAYS AS (lower(name)) STORED;
+-- ctc_lpa is unbounded: a NUMERIC(6,2) from an earlier run rejects offers like '1200000 per annum', so recreate it
+ALTER TABLE companies DROP COLUMN IF EXISTS ctc_lpa;
+ALTER TABLE companies ADD COLUMN ctc_lpa NUMERIC GENERATED ALWAYS AS (substring(ctc_offer from '[0-9]+(?:\.[0-9]+)?')::numeric) STORED;
+CREATE INDEX IF NOT EXISTS idx_companies_name_search ON companies(name_search varchar_pattern_ops);
+DROP INDEX IF EXISTS idx_companies_created_at_id;
+CREATE INDEX IF NOT EXISTS idx_companies_created_at_id ON companies(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_companies_ctc_lpa ON companies(ctc_lpa);
+
+-- Aggregates for the admin reports page: also run the placement_summary()
+-- function at the end of this file
+CREATE INDEX IF NOT EXISTS idx_selected_students_company_round ON selected_students(company_id, max_round_reached);
+CREATE INDEX IF NOT EXISTS idx_selected_students_offers ON selected_students(student_number) WHERE max_round_reached = 'Got Offer';
+
+-- One row per roll number per company (conflict target for the bulk student import).
+-- Roll numbers are stored trimmed and upper-cased (placement_stats.normalize_student_number).
+-- Remove any existing duplicates first, including ones differing only in case, keeping the newest row:
+-- DELETE FROM selected_students a USING selected_students b
+--     WHERE a.company_id = b.company_id AND upper(trim(a.student_number)) = upper(trim(b.student_number))
+--     AND a.created_at < b.created_at;
+UPDATE selected_students SET student_number = upper(trim(student_number)) WHERE student_number <> upper(trim(student_number));
+CREATE UNIQUE INDEX IF NOT EXISTS idx_selected_students_company_number ON selected_students(company_id, student_number);
+
+-- Stored priority order for student lists (placement_stats.priority_rank): 0 = Got Offer,
+-- 999 - n = Round n (999 for Round 0 and below), 1000 = Others. The app sets it on every
+-- write; backfill existing rows (re-run after an earlier backfill with 1000 - n):
+ALTER TABLE selected_students ADD COLUMN IF NOT EXISTS priority_rank INTEGER;
+UPDATE selected_students SET priority_rank = CASE
+    WHEN max_round_reached = 'Got Offer' THEN 0
+    WHEN max_round_reached LIKE 'Round %' AND split_part(max_round_reached, ' ', 2) ~ '^-?[0-9]+$'
+        THEN 999 - LEAST(GREATEST(split_part(max_round_reached, ' ', 2)::numeric, 0), 998)::int
+    ELSE 1000
+END;
+CREATE INDEX IF NOT EXISTS idx_selected_students_company_rank ON selected_students(company_id, priority_rank, name);
+
+-- Storage object key of each model paper, used for downloads and deletes
+-- instead of matching file_url with LIKE '%name%'. Backfill from the public URL:
+ALTER TABLE model_papers ADD COLUMN IF NOT EXISTS storage_key VARCHAR(255);
+UPDATE model_papers SET storage_key = split_part(split_part(file_url, '/model-papers/', 2), '?', 1)
+    WHERE storage_key IS NULL AND file_url LIKE '%/model-papers/%';
+CREATE UNIQUE INDEX IF NOT EXISTS idx_model_papers_storage_key ON model_papers(storage_key);
 */
 
 -- Create companies table
@@ -26,6 +69,9 @@ CREATE TABLE companies (
     ctc_offer VARCHAR(100) NOT NULL,
     agreement_years DECIMAL(3,1) NOT NULL,
     logo_url VARCHAR(500),
+    -- Derived columns used by the companies listing filters
+    name_search VARCHAR(255) GENERATED ALWAYS AS (lower(name)) STORED,
+    ctc_lpa NUMERIC GENERATED ALWAYS AS (substring(ctc_offer from '[0-9]+(?:\.[0-9]+)?')::numeric) STORED,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -39,6 +85,8 @@ CREATE TABLE selected_students (
     email VARCHAR(255),
     linkedin_id VARCHAR(255),
     max_round_reached VARCHAR(50) NOT NULL,
+    -- Sort key for student lists, set by the app from max_round_reached (see placement_stats.priority_rank)
+    priority_rank INTEGER,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -58,7 +106,19 @@ INSERT INTO admins (email, password_hash) VALUES
 
 -- Create indexes for better performance
 CREATE INDEX idx_selected_students_company_id ON selected_students(company_id);
+-- Duplicate checks and upserts (ON CONFLICT) on (company_id, student_number)
+CREATE UNIQUE INDEX idx_selected_students_company_number ON selected_students(company_id, student_number);
+-- Company student lists already in priority order (ORDER BY priority_rank, name)
+CREATE INDEX idx_selected_students_company_rank ON selected_students(company_id, priority_rank, name);
+-- Grouping for placement_summary() and the offer-holder lists on the reports page
+CREATE INDEX idx_selected_students_company_round ON selected_students(company_id, max_round_reached);
+CREATE INDEX idx_selected_students_offers ON selected_students(student_number) WHERE max_round_reached = 'Got Offer';
 CREATE INDEX idx_companies_name ON companies(name);
+-- Case-insensitive name prefix search (LIKE 'abc%') for the companies listing
+CREATE INDEX idx_companies_name_search ON companies(name_search varchar_pattern_ops);
+-- Keyset pagination on (created_at, id)
+CREATE INDEX idx_companies_created_at_id ON companies(created_at DESC, id DESC);
+CREATE INDEX idx_companies_ctc_lpa ON companies(ctc_lpa);
 CREATE INDEX idx_admins_email ON admins(email);
 
 -- Enable Row Level Security (RLS)
@@ -83,6 +143,7 @@ CREATE TABLE model_papers (
     company_id UUID REFERENCES companies(id) ON DELETE CASCADE,
     paper_name VARCHAR(255) NOT NULL,
     file_url VARCHAR(500) NOT NULL,
+    storage_key VARCHAR(255),  -- Object path in the model-papers bucket
     file_size INTEGER,
     uploaded_by VARCHAR(255),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
@@ -91,6 +152,8 @@ CREATE TABLE model_papers (
 
 -- Create indexes for better performance
 CREATE INDEX idx_model_papers_company_id ON model_papers(company_id);
+-- Exact-match lookup for /uploads/model_papers/<key> and deletes
+CREATE UNIQUE INDEX idx_model_papers_storage_key ON model_papers(storage_key);
 
 -- Enable Row Level Security (RLS)
 ALTER TABLE model_papers ENABLE ROW LEVEL SECURITY;
@@ -102,3 +165,31 @@ CREATE POLICY "Allow public read access to model_papers" ON model_papers
 -- Create policies for admin access to model papers
 CREATE POLICY "Allow admin full access to model_papers" ON model_papers
     FOR ALL USING (auth.role() = 'authenticated');
+
+-- Placement counts for the admin reports page, computed next to the data so
+-- only summary rows are sent to the app (called as supabase.rpc('placement_summary')).
+-- placement_stats.summarize_students() is the Python equivalent.
+CREATE OR REPLACE FUNCTION placement_summary()
+RETURNS JSON AS $$
+    WITH per_round AS (
+        SELECT company_id, max_round_reached, COUNT(*)::int AS n
+        FROM selected_students
+        GROUP BY company_id, max_round_reached
+    )
+    SELECT json_build_object(
+        'total_students', (SELECT COUNT(DISTINCT student_number) FROM selected_students),
+        'total_got_offers', (SELECT COUNT(*) FROM selected_students WHERE max_round_reached = 'Got Offer'),
+        'total_unique_offers', (SELECT COUNT(DISTINCT student_number) FROM selected_students WHERE max_round_reached = 'Got Offer'),
+        'companies', COALESCE((
+            SELECT json_agg(company_counts)
+            FROM (
+                SELECT company_id,
+                       SUM(n)::int AS student_count,
+                       COALESCE(SUM(n) FILTER (WHERE max_round_reached = 'Got Offer'), 0)::int AS got_offer,
+                       COALESCE(json_object_agg(max_round_reached, n) FILTER (WHERE max_round_reached <> 'Got Offer'), '{}'::json) AS round_stats
+                FROM per_round
+                GROUP BY company_id
+            ) company_counts
+        ), '[]'::json)
+    );
+$$ LANGUAGE sql STABLE;
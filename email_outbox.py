@@ -0,0 +1,336 @@
+"""
+Durable outbox for outgoing email, delivered by a background worker.
+
+Requests used to open an SMTP session to Gmail inside the request (a few
+seconds per OTP, and a blocked worker for every concurrent reset). Now
+enqueue() writes the message to a local SQLite file and returns at once; a
+daemon thread delivers it over one persistent SMTP connection:
+
+  - the connection is opened on the first message and reused for the next
+    ones; it is reopened if the server drops it and closed after sitting idle
+  - sends are spaced to at most `rate_per_minute` per process; the worker
+    and inline deliveries share the SMTP session and the spacing under locks
+  - transient failures are retried with exponential backoff up to
+    `max_attempts`; permanent ones (5xx replies, refused recipients) fail at once
+  - a message with an expires_at (an OTP) that can't go out in time is
+    dropped as expired instead of being delivered late
+
+Messages are claimed with a token before sending, so several processes can
+share the outbox file, and a claim left behind by a crashed process is
+retried after CLAIM_TIMEOUT seconds.
+
+Serverless deployments (Vercel) can't run this worker: an instance is frozen
+once the response is sent, so the thread stops, and /tmp goes away with the
+instance, taking queued messages with it. There the outbox is created with
+background=False and the app calls deliver(message_id) inside the request:
+the message is sent (or fails) before the response, the row is only a record
+of the attempt, and a failure is reported to the user instead of "OTP sent".
+A request waits at most INLINE_MAX_WAIT seconds for its turn under the rate
+limit; past that the message fails rather than holding the request.
+
+For local development and tests point MAIL_SERVER/MAIL_PORT at a debugging
+SMTP server (e.g. `python -m aiosmtpd -n -l localhost:1025`) with
+MAIL_USE_TLS=False and no MAIL_PASSWORD; login is skipped without one.
+"""
+
+import logging
+import os
+import smtplib
+import sqlite3
+import ssl
+import threading
+import time
+import uuid
+from email.message import EmailMessage
+
+logger = logging.getLogger('placement_tracker.email_outbox')
+
+PENDING = 'pending'
+SENDING = 'sending'
+SENT = 'sent'
+FAILED = 'failed'
+EXPIRED = 'expired'
+
+CLAIM_TIMEOUT = 300
+MAX_RETRY_DELAY = 900
+KEEP_FINISHED = 24 * 60 * 60  # Seconds sent/failed/expired rows are kept
+BATCH_SIZE = 20
+INLINE_MAX_WAIT = 1.0  # Seconds deliver() may wait for a send slot inside a request
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recipient TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    expires_at REAL,
+    claim TEXT,
+    claimed_at REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox(status, next_attempt_at);
+'''
+
+
+class SMTPConnection:
+    """One persistent SMTP session, reopened when the server drops it or it sits idle"""
+
+    def __init__(self, host, port, use_tls=True, username=None, password=None, timeout=10, idle_timeout=60):
+        self.host = host
+        self.port = port
+        self.use_tls = use_tls
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self._smtp = None
+        self._last_used = 0.0
+        self.connects = 0
+
+    def _open(self):
+        if self._smtp is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            # Servers drop idle sessions; don't find out halfway through a send
+            self.close()
+        if self._smtp is None:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            try:
+                if self.use_tls:
+                    smtp.starttls(context=ssl.create_default_context())
+                if self.username and self.password:
+                    smtp.login(self.username, self.password)
+            except Exception:
+                smtp.close()
+                raise
+            self._smtp = smtp
+            self.connects += 1
+        return self._smtp
+
+    def send(self, message):
+        # A kept-alive session may have been closed by the server: reconnect once
+        for attempt in (1, 2):
+            smtp = self._open()
+            try:
+                smtp.send_message(message)
+                self._last_used = time.monotonic()
+                return
+            except smtplib.SMTPServerDisconnected:
+                self.close()
+                if attempt == 2:
+                    raise
+
+    def close_if_idle(self):
+        if self._smtp is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            self.close()
+
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                self._smtp.close()
+            self._smtp = None
+
+
+def _permanent(error):
+    """True for failures a retry can't fix (5xx replies, refused sender/recipients)"""
+    if isinstance(error, (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused)):
+        return True
+    code = getattr(error, 'smtp_code', None)
+    return isinstance(code, int) and 500 <= code < 600 and not isinstance(error, smtplib.SMTPAuthenticationError)
+
+
+class EmailOutbox:
+    """Queue of outgoing messages in a SQLite file, drained by a daemon thread"""
+
+    def __init__(self, path, connection, sender, metrics=None, rate_per_minute=30, max_attempts=5, retry_delay=30,
+                 background=True):
+        self.path = path
+        self.background = background
+        self.connection = connection
+        self.sender = sender
+        self.metrics = metrics
+        self.send_interval = 60.0 / rate_per_minute if rate_per_minute else 0.0
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._send_lock = threading.Lock()  # One SMTP session, one command stream
+        self._rate_lock = threading.Lock()
+        self._last_send = 0.0
+
+    def _conn(self):
+        # Caller must hold _db_lock. Opened on first use, keeping cold starts free of it.
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=10)
+            db.row_factory = sqlite3.Row
+            db.execute('PRAGMA journal_mode=WAL')
+            db.executescript(_SCHEMA)
+            self._db = db
+        return self._db
+
+    def _execute(self, sql, params=()):
+        with self._db_lock:
+            cursor = self._conn().execute(sql, params)
+            return cursor.fetchall(), cursor.lastrowid
+
+    def enqueue(self, recipient, subject, body, expires_at=None):
+        """Store a message for delivery and wake the worker; returns the message id"""
+        now = time.time()
+        _, message_id = self._execute(
+            'INSERT INTO outbox (recipient, subject, body, next_attempt_at, expires_at, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+            (recipient, subject, body, now, expires_at, now))
+        if self.background:
+            self.start()
+            self._wakeup.set()
+        return message_id
+
+    def deliver(self, message_id):
+        """Send one pending message now, in the caller's thread; returns its final status.
+
+        For deployments without a background worker: a failure is final (FAILED)
+        rather than retried later, since nothing would pick the retry up.
+        """
+        claim = uuid.uuid4().hex
+        with self._db_lock:
+            db = self._conn()
+            db.execute('UPDATE outbox SET status = ?, claim = ?, claimed_at = ? WHERE id = ? AND status = ?',
+                       (SENDING, claim, time.time(), message_id, PENDING))
+            row = db.execute('SELECT * FROM outbox WHERE id = ? AND claim = ?', (message_id, claim)).fetchone()
+        if row is None:
+            return None
+        self._deliver(row, retry=False)
+        rows, _ = self._execute('SELECT status FROM outbox WHERE id = ?', (message_id,))
+        return rows[0]['status']
+
+    def start(self):
+        """Start the delivery thread if it isn't running (messages left by another process are picked up too)"""
+        if self._thread is None or not self._thread.is_alive():
+            with self._start_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='email-outbox', daemon=True)
+                    self._thread.start()
+
+    def _claim(self, limit=BATCH_SIZE):
+        now = time.time()
+        claim = uuid.uuid4().hex
+        with self._db_lock:
+            db = self._conn()
+            db.execute(
+                'UPDATE outbox SET status = ?, claim = ?, claimed_at = ? WHERE id IN ('
+                ' SELECT id FROM outbox WHERE (status = ? AND next_attempt_at <= ?) OR (status = ? AND claimed_at < ?)'
+                ' ORDER BY next_attempt_at LIMIT ?)',
+                (SENDING, claim, now, PENDING, now, SENDING, now - CLAIM_TIMEOUT, limit))
+            return db.execute('SELECT * FROM outbox WHERE claim = ? ORDER BY id', (claim,)).fetchall()
+
+    def _finish(self, message_id, status, error=None):
+        self._execute('UPDATE outbox SET status = ?, claim = NULL, last_error = ?, finished_at = ? WHERE id = ?',
+                      (status, error, time.time(), message_id))
+        if self.metrics is not None:
+            self.metrics.record_email(status)
+
+    def _retry_later(self, row, error):
+        attempts = row['attempts'] + 1
+        if attempts >= self.max_attempts:
+            self._finish(row['id'], FAILED, error)
+            return
+        delay = min(self.retry_delay * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+        self._execute('UPDATE outbox SET status = ?, claim = NULL, attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?',
+                      (PENDING, attempts, time.time() + delay, error, row['id']))
+        if self.metrics is not None:
+            self.metrics.record_email('retried')
+
+    def _build(self, row):
+        message = EmailMessage()
+        message['From'] = self.sender
+        message['To'] = row['recipient']
+        message['Subject'] = row['subject']
+        message.set_content(row['body'])
+        return message
+
+    def _reserve_send(self, max_wait=None):
+        """Seconds until this send's slot under the rate limit, or None if that is over max_wait"""
+        with self._rate_lock:
+            now = time.monotonic()
+            slot = max(now, self._last_send + self.send_interval)
+            if max_wait is not None and slot - now > max_wait:
+                return None
+            self._last_send = slot
+            return slot - now
+
+    def _deliver(self, row, retry=True):
+        if row['expires_at'] and row['expires_at'] < time.time():
+            self._finish(row['id'], EXPIRED, 'Expired before it could be sent')
+            return
+        # Inline deliveries run on a request thread: wait briefly, never a full backlog
+        wait = self._reserve_send(None if retry else INLINE_MAX_WAIT)
+        if wait is None:
+            logger.warning('Email %s to %s not sent: send rate exceeded', row['id'], row['recipient'])
+            self._finish(row['id'], FAILED, 'Send rate exceeded')
+            return
+        if wait > 0:
+            time.sleep(wait)
+        try:
+            with self._send_lock:
+                self.connection.send(self._build(row))
+        except Exception as e:
+            logger.warning('Email %s to %s failed: %s', row['id'], row['recipient'], e)
+            if _permanent(e):
+                self._finish(row['id'], FAILED, str(e))
+                return
+            # Drop a possibly broken session before the next send
+            with self._send_lock:
+                self.connection.close()
+            if retry:
+                self._retry_later(row, str(e))
+            else:
+                self._finish(row['id'], FAILED, str(e))
+            return
+        self._finish(row['id'], SENT)
+
+    def deliver_due(self):
+        """Send every message that is due now; returns how many were attempted"""
+        attempted = 0
+        while True:
+            rows = self._claim()
+            if not rows:
+                return attempted
+            for row in rows:
+                self._deliver(row)
+                attempted += 1
+
+    def _next_due_in(self):
+        rows, _ = self._execute('SELECT MIN(next_attempt_at) FROM outbox WHERE status = ?', (PENDING,))
+        next_at = rows[0][0]
+        return None if next_at is None else max(0.0, next_at - time.time())
+
+    def _run(self):
+        while True:
+            # Cleared before looking for work, so a message enqueued from here on still wakes the wait below
+            self._wakeup.clear()
+            try:
+                self.deliver_due()
+                self._execute('DELETE FROM outbox WHERE status IN (?, ?, ?) AND finished_at < ?',
+                              (SENT, FAILED, EXPIRED, time.time() - KEEP_FINISHED))
+                wait = self._next_due_in()
+            except Exception as e:
+                logger.exception('Email outbox worker error')
+                wait = self.retry_delay
+            # Sleep until the next retry is due, a new message arrives or the session goes idle
+            self._wakeup.wait(min(wait, self.connection.idle_timeout) if wait is not None else self.connection.idle_timeout)
+            with self._send_lock:
+                self.connection.close_if_idle()
+
+    def stats(self):
+        rows, _ = self._execute('SELECT status, COUNT(*) FROM outbox GROUP BY status')
+        return {status: count for status, count in rows}
@@ -0,0 +1,189 @@
+"""
+Excel placement report written directly with xlsxwriter.
+
+The workbook runs in constant_memory mode: each row is flushed to a temporary
+file as soon as the next one starts, so memory stays flat no matter how many
+students a company has. Every cell is written exactly once with its final
+format. write_excel_report() writes the workbook to the path it is given, or
+to a new temporary file; report downloads build it as a report_jobs artifact.
+"""
+
+import os
+import re
+import tempfile
+
+import xlsxwriter
+
+# Excel limits sheet names to 31 characters and forbids []:*?/\
+_INVALID_SHEET_CHARS = re.compile(r'[\[\]:*?/\\]')
+
+FORMATS = {
+    'header': {
+        'bold': True,
+        'text_wrap': True,
+        'valign': 'top',
+        'fg_color': '#4472C4',
+        'font_color': 'white',
+        'border': 1,
+        'font_size': 12
+    },
+    'metric': {
+        'bold': True,
+        'fg_color': '#D9E1F2',
+        'border': 1,
+        'font_size': 11
+    },
+    'value': {
+        'border': 1,
+        'font_size': 11,
+        'text_wrap': True
+    },
+    'number': {
+        'border': 1,
+        'font_size': 11,
+        'num_format': '#,##0'
+    },
+    'success': {
+        'border': 1,
+        'font_size': 11,
+        'fg_color': '#C6EFCE',
+        'num_format': '#,##0'
+    },
+    'student_header': {
+        'bold': True,
+        'text_wrap': True,
+        'valign': 'top',
+        'fg_color': '#70AD47',
+        'font_color': 'white',
+        'border': 1,
+        'font_size': 11
+    },
+    'student_data': {
+        'border': 1,
+        'font_size': 10,
+        'text_wrap': True
+    },
+    'offer': {
+        'border': 1,
+        'font_size': 10,
+        'fg_color': '#C6EFCE',
+        'text_wrap': True
+    }
+}
+
+
+def _student_sheet_name(company_name, used_names):
+    base = _INVALID_SHEET_CHARS.sub('_', company_name)[:22]
+    name = f'{base}_Students'
+    suffix = 2
+    while name.lower() in used_names:
+        name = f'{base[:19]}_{suffix}_Students'
+        suffix += 1
+    used_names.add(name.lower())
+    return name
+
+
+def _write_rows(worksheet, first_row, rows, row_format):
+    for row_num, values in enumerate(rows, first_row):
+        for col, value in enumerate(values):
+            worksheet.write(row_num, col, value, row_format)
+
+
+def _write_overall_sheet(workbook, formats, stats):
+    worksheet = workbook.add_worksheet('Overall_Statistics')
+    worksheet.set_column('A:A', 30)
+    worksheet.set_column('B:B', 50)
+    worksheet.merge_range('A1:B1', 'Overall Placement Statistics', formats['header'])
+    worksheet.write_row(1, 0, ['Metric', 'Value'], formats['header'])
+
+    overall_stats_data = [
+        ('Total No of Companies', stats.total_companies, 'value'),
+        ('All Company Names', ', '.join([c['name'] for c in stats.companies]), 'value'),
+        ('Total No of Students', stats.total_students, 'value'),  # Unique student count
+        ('Total Got Offers', stats.total_got_offers, 'success'),
+        ('Total Unique Students with Offers', stats.total_unique_offers, 'success')
+    ]
+    for row_num, (metric, value, value_format) in enumerate(overall_stats_data, 2):
+        worksheet.write(row_num, 0, metric, formats['metric'])
+        worksheet.write(row_num, 1, value, formats[value_format])
+
+
+def _write_company_sheet(workbook, formats, stats):
+    worksheet = workbook.add_worksheet('Company_Statistics')
+    for column, width in (('A:A', 25), ('B:B', 15), ('C:C', 20), ('D:D', 40), ('E:E', 20)):
+        worksheet.set_column(column, width)
+    worksheet.merge_range('A1:E1', 'Company-wise Placement Statistics', formats['header'])
+    worksheet.write_row(1, 0, ['Company Name', 'CTC', 'Bond/Agreement (Years)', 'Round-wise Student Count', 'No of Students Got Offers'], formats['header'])
+
+    for row_num, company in enumerate(stats.companies, 2):
+        round_stats = stats.round_summary(company)
+        worksheet.write(row_num, 0, company['name'], formats['value'])
+        worksheet.write(row_num, 1, company['ctc_offer'], formats['value'])
+        worksheet.write(row_num, 2, company['agreement_years'], formats['number'])
+        worksheet.write(row_num, 3, '; '.join(round_stats) if round_stats else 'No round data', formats['value'])
+        worksheet.write(row_num, 4, stats.got_offer_count(company['id']), formats['success'])
+
+
+def _write_student_sheets(workbook, formats, stats):
+    used_names = {'overall_statistics', 'company_statistics', 'all_students_with_offers', 'unique_students_with_offers'}
+    for company in stats.companies:
+        # Sorted by priority: Got Offer first, then by rounds descending, then Others last
+        company_students = stats.students_for(company['id'])
+        if not company_students:
+            continue
+
+        worksheet = workbook.add_worksheet(_student_sheet_name(company['name'], used_names))
+        for column, width in (('A:A', 25), ('B:B', 15), ('C:C', 30), ('D:D', 25)):
+            worksheet.set_column(column, width)
+        worksheet.merge_range('A1:D1', f'{company["name"]} - Student Details', formats['header'])
+        worksheet.write_row(1, 0, ['Student Name', 'Roll No', 'Email ID', 'Max Round Reached/Got Offer'], formats['student_header'])
+
+        for row_num, student in enumerate(company_students, 2):
+            worksheet.write(row_num, 0, student['name'], formats['student_data'])
+            worksheet.write(row_num, 1, student['student_number'], formats['student_data'])
+            worksheet.write(row_num, 2, student.get('email', 'N/A'), formats['student_data'])
+            # Highlight "Got Offer" status
+            status_format = formats['offer'] if student['max_round_reached'] == 'Got Offer' else formats['student_data']
+            worksheet.write(row_num, 3, student['max_round_reached'], status_format)
+
+
+def _write_offers_sheet(workbook, formats, stats, sheet_name, title, students):
+    if not students:
+        return
+    worksheet = workbook.add_worksheet(sheet_name)
+    for column, width in (('A:A', 25), ('B:B', 15), ('C:C', 30), ('D:D', 25)):
+        worksheet.set_column(column, width)
+    worksheet.merge_range('A1:D1', f'{title} ({len(students)})', formats['header'])
+    worksheet.write_row(1, 0, ['Student Name', 'Roll No', 'Email ID', 'Company'], formats['student_header'])
+    _write_rows(worksheet, 2, (
+        (student['name'], student['student_number'], student.get('email', 'N/A'), stats.company_name(student['company_id']))
+        for student in students
+    ), formats['offer'])
+
+
+def write_excel_report(stats, path=None):
+    """Write the placement report workbook and return its file path"""
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix='placement_report_', suffix='.xlsx')
+        os.close(fd)
+
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    try:
+        formats = {name: workbook.add_format(spec) for name, spec in FORMATS.items()}
+        _write_overall_sheet(workbook, formats, stats)
+        _write_company_sheet(workbook, formats, stats)
+        _write_student_sheets(workbook, formats, stats)
+        _write_offers_sheet(workbook, formats, stats, 'All_Students_With_Offers',
+                            'All Students with Offers', stats.students_with_offers)
+        _write_offers_sheet(workbook, formats, stats, 'Unique_Students_With_Offers',
+                            'Unique Students with Offers', stats.unique_students_with_offers)
+        workbook.close()
+    except Exception:
+        # Don't leave a half-written workbook behind in the temp directory
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        raise
+    return path
+
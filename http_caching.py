@@ -0,0 +1,148 @@
+"""
+Conditional GET and Cache-Control policies for the public pages.
+
+Pages built from database rows get an ETag hashed from the id and updated_at
+of every row they show (plus the release and the login state the page was
+rendered for) and a Last-Modified from the newest updated_at. A request whose
+If-None-Match / If-Modified-Since still matches gets a bodiless 304 and the
+template is never rendered.
+
+Cache-Control depends on who is asking:
+  - anonymous visitors (empty session) get a `public` response the Vercel edge
+    may keep for `shared_max_age` seconds (s-maxage), while browsers revalidate
+  - logged-in students and admins see session-dependent markup (nav links,
+    admin controls), so their copy is `private, no-cache`: only the browser
+    stores it, and it revalidates with the ETag on every visit
+Every response carries `Vary: Cookie` so a shared cache never hands one
+session's page to another.
+
+Static files get a content hash in their URL (?v=...) through url_for and are
+then cacheable for a year; unversioned static URLs fall back to an hour.
+"""
+
+import hashlib
+import os
+import time
+from datetime import datetime, timezone
+
+from flask import request, session, make_response
+from werkzeug.http import is_resource_modified
+
+STATIC_MAX_AGE = 365 * 24 * 60 * 60
+UNVERSIONED_STATIC_MAX_AGE = 60 * 60
+
+# Changes on every deploy so new templates get new ETags; falls back to the
+# process start time when not running on Vercel
+RELEASE = os.getenv('VERCEL_GIT_COMMIT_SHA') or str(int(time.time()))
+
+
+def page_variant():
+    """Which version of the session-dependent markup the current request sees"""
+    if session.get('admin_logged_in'):
+        return 'admin'
+    if session.get('student_id') or session.get('user_id'):
+        return 'student'
+    return 'public'
+
+
+def parse_timestamp(value):
+    """ISO timestamp string as an aware datetime, or None"""
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    # The app writes naive datetime.now() values; the servers run on UTC
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def row_validators(*row_sets):
+    """(ETag, Last-Modified) for a page showing these row sets.
+
+    The ETag covers the id and updated_at of each row, so edits, inserts and
+    deletes all change it; Last-Modified is the newest updated_at (or None).
+    """
+    digest = hashlib.sha1(f'{RELEASE}|{page_variant()}'.encode())
+    last_modified = None
+    for rows in row_sets:
+        digest.update(b';')
+        for row in rows:
+            updated_at = row.get('updated_at') or row.get('created_at')
+            digest.update(f"{row.get('id')}@{updated_at},".encode())
+            timestamp = parse_timestamp(updated_at)
+            if timestamp and (last_modified is None or timestamp > last_modified):
+                last_modified = timestamp
+    return digest.hexdigest()[:32], last_modified
+
+
+def cache_control(private, max_age=0, shared_max_age=None, stale_while_revalidate=None):
+    """Cache-Control value: public (and edge-cacheable) unless the response shows session content"""
+    if private:
+        # Session content (login state, flashed messages) stays in the browser
+        return f'private, max-age={max_age}' if max_age else 'private, no-cache'
+    value = f'public, max-age={max_age}'
+    if shared_max_age is not None:
+        value += f', s-maxage={shared_max_age}'
+    if stale_while_revalidate:
+        value += f', stale-while-revalidate={stale_while_revalidate}'
+    return value
+
+
+def conditional_response(build, etag=None, last_modified=None, max_age=0, shared_max_age=None,
+                         stale_while_revalidate=None):
+    """304 if the client's copy is current, else make_response(build()), with validators and Cache-Control.
+
+    Without an etag the response body is hashed instead, which saves the
+    transfer but not the work of building it.
+    """
+    # Decided before rendering, which pops flashed messages off the session
+    private = bool(session)
+    # A page with pending flashed messages must be rendered to show them
+    flashes_pending = '_flashes' in session
+    if etag and not flashes_pending and not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = make_response('', 304)
+    else:
+        response = make_response(build())
+        if response.status_code != 200:
+            return response
+    if etag:
+        response.set_etag(etag)
+    elif not flashes_pending:
+        response.add_etag()
+        response.make_conditional(request)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = cache_control(private, max_age, shared_max_age, stale_while_revalidate)
+    response.vary.add('Cookie')
+    return response
+
+
+def init_static_caching(app):
+    """Version static URLs by content hash and give versioned files a long max-age"""
+    versions = {}
+
+    def static_version(filename):
+        if filename not in versions:
+            try:
+                with open(os.path.join(app.static_folder, filename), 'rb') as f:
+                    versions[filename] = hashlib.sha1(f.read()).hexdigest()[:12]
+            except OSError:
+                versions[filename] = None
+        return versions[filename]
+
+    @app.url_defaults
+    def add_static_version(endpoint, values):
+        if endpoint == 'static' and 'filename' in values and 'v' not in values:
+            version = static_version(values['filename'])
+            if version:
+                values['v'] = version
+
+    @app.after_request
+    def static_cache_control(response):
+        if request.endpoint == 'static' and response.status_code in (200, 206, 304):
+            if request.args.get('v'):
+                response.headers['Cache-Control'] = f'public, max-age={STATIC_MAX_AGE}, immutable'
+            else:
+                response.headers['Cache-Control'] = f'public, max-age={UNVERSIONED_STATIC_MAX_AGE}'
+        return response
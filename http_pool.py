@@ -0,0 +1,149 @@
+"""
+httpx transport shared by every Supabase client, with retries and pool statistics.
+
+One PooledTransport (one httpcore connection pool) carries the PostgREST,
+Storage and Auth traffic of both the anon and the service-key clients, so a
+TLS session set up by one request is reused by the next one, whichever
+client sends it. Each call is traced through httpx's `trace` extension to
+tell a reused connection from a new one and to time how long it waited for a
+free connection.
+
+Retries with exponential backoff (and jitter):
+  - connection failures and pool timeouts, for any method: nothing was sent
+  - read/protocol errors and 502/503/504 replies, for GET/HEAD/OPTIONS only,
+    and only when the body can be replayed (not a streamed upload)
+
+This module imports httpx; supabase_clients.SharedPool imports it on first
+use to keep it off the cold start path.
+"""
+
+import random
+import threading
+import time
+
+import httpx
+
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+RETRY_STATUSES = {502, 503, 504}
+# Waiting this long for a connection counts as a pool wait
+WAIT_THRESHOLD = 0.001
+
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+_MAYBE_SENT_ERRORS = (httpx.ReadError, httpx.ReadTimeout, httpx.WriteError, httpx.RemoteProtocolError)
+
+
+class PoolStats:
+    """Counters for the calls made through a PooledTransport"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+        self.tls_handshakes = 0
+        self.http2_requests = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.retries = 0
+        self.failures = 0
+
+    def record(self, events, waited, http2):
+        with self._lock:
+            self.requests += 1
+            if 'connection.connect_tcp.started' in events:
+                self.new_connections += 1
+            else:
+                self.reused_connections += 1
+            if 'connection.start_tls.complete' in events:
+                self.tls_handshakes += 1
+            if http2:
+                self.http2_requests += 1
+            if waited >= WAIT_THRESHOLD:
+                self.waits += 1
+                self.wait_seconds += waited
+
+    def add(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'new_connections': self.new_connections,
+                'reused_connections': self.reused_connections,
+                'reuse_ratio': round(self.reused_connections / self.requests, 4) if self.requests else 0.0,
+                'tls_handshakes': self.tls_handshakes,
+                'http2_requests': self.http2_requests,
+                'waits': self.waits,
+                'wait_seconds': round(self.wait_seconds, 6),
+                'retries': self.retries,
+                'failures': self.failures
+            }
+
+
+class PooledTransport(httpx.HTTPTransport):
+    """HTTPTransport that retries failed calls and records connection reuse"""
+
+    def __init__(self, retries=2, backoff=0.2, **kwargs):
+        super().__init__(**kwargs)
+        self.max_retries = retries
+        self.backoff = backoff
+        self.stats = PoolStats()
+
+    def _should_retry(self, request, attempt, error=None, status=None):
+        if attempt >= self.max_retries:
+            return False
+        if isinstance(error, _NOT_SENT_ERRORS):
+            return True
+        # Anything else may have reached the server: only repeat safe, replayable requests
+        return request.method in IDEMPOTENT_METHODS and isinstance(request.stream, httpx.ByteStream) and (
+            isinstance(error, _MAYBE_SENT_ERRORS) or status in RETRY_STATUSES)
+
+    def _sleep(self, attempt):
+        time.sleep(self.backoff * 2 ** attempt * (0.5 + random.random()))
+
+    def handle_request(self, request):
+        outer_trace = request.extensions.get('trace')
+        attempt = 0
+        while True:
+            events = []
+            started = time.perf_counter()
+            acquired = []
+
+            def trace(name, info):
+                events.append(name)
+                # The first TCP connect or header write marks when a connection was handed out
+                if not acquired and (name == 'connection.connect_tcp.started' or name.endswith('send_request_headers.started')):
+                    acquired.append(time.perf_counter())
+                if outer_trace is not None:
+                    outer_trace(name, info)
+
+            request.extensions = {**request.extensions, 'trace': trace}
+            try:
+                response = super().handle_request(request)
+            except Exception as e:
+                if self._should_retry(request, attempt, error=e):
+                    self.stats.add('retries')
+                    self._sleep(attempt)
+                    attempt += 1
+                    continue
+                self.stats.add('failures')
+                raise
+            self.stats.record(set(events), (acquired[0] if acquired else started) - started,
+                              response.extensions.get('http_version') == b'HTTP/2')
+            if response.status_code in RETRY_STATUSES and self._should_retry(request, attempt, status=response.status_code):
+                # Drain the error body so the connection goes back to the pool
+                response.read()
+                response.close()
+                self.stats.add('retries')
+                self._sleep(attempt)
+                attempt += 1
+                continue
+            return response
+
+    def connection_counts(self):
+        """(open, idle, queued requests) of the underlying httpcore pool"""
+        connections = list(getattr(self._pool, 'connections', []))
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return len(connections), idle, len(getattr(self._pool, '_requests', []))
@@ -0,0 +1,130 @@
+"""
+Local stand-in for Supabase Storage, for offline development and tests.
+
+LocalStorage keeps one bucket in a directory and has the same methods as
+storage_uploads.SupabaseStorage. Its blueprint serves the HTTP side of the
+signed upload contract under the same paths as Storage, so the browser code
+doesn't know the difference:
+
+  PUT /object/upload/sign/<bucket>/<path>?token=...   signed upload (raw body)
+  GET /object/public/<bucket>/<path>                  public download
+
+Signed upload tokens are itsdangerous signatures of the object path and
+expire like Storage's (2 hours). Enabled with LOCAL_STORAGE_DIR.
+"""
+
+import os
+import time
+import uuid
+
+from flask import Blueprint, request, jsonify, send_from_directory, abort
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+
+from storage_uploads import StorageError, UploadResult, CHUNK_SIZE
+
+SIGNED_URL_TTL = 2 * 60 * 60
+
+
+class LocalStorage:
+    """One bucket on the local disk, served by `blueprint` mounted at `base_url`"""
+
+    def __init__(self, root, bucket, secret_key, base_url, metrics=None, signed_url_ttl=SIGNED_URL_TTL):
+        self.root = os.path.abspath(os.path.join(root, bucket))
+        self.bucket = bucket
+        self.base_url = base_url.rstrip('/')
+        self.metrics = metrics
+        self.signed_url_ttl = signed_url_ttl
+        self._signer = URLSafeTimedSerializer(secret_key, salt='local-storage-upload')
+        self.blueprint = self._build_blueprint()
+
+    def _file_path(self, path):
+        target = os.path.abspath(os.path.join(self.root, path))
+        if not target.startswith(self.root + os.sep):
+            raise StorageError('Invalid object path', 400)
+        return target
+
+    def _write(self, path, stream, size=None):
+        """Copy a stream into the bucket in chunks; refuses to overwrite like x-upsert: false"""
+        target = self._file_path(path)
+        if os.path.exists(target):
+            raise StorageError('The resource already exists', 409)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        temp_path = f'{target}.{uuid.uuid4().hex}.part'
+        written = 0
+        try:
+            with open(temp_path, 'wb') as f:
+                while size is None or written < size:
+                    chunk = stream.read(CHUNK_SIZE if size is None else min(CHUNK_SIZE, size - written))
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    written += len(chunk)
+            os.replace(temp_path, target)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return written
+
+    def upload(self, stream, path, size, content_type='application/pdf', cache_control='3600'):
+        start = time.perf_counter()
+        failed = True
+        try:
+            self._write(path, stream, size)
+            failed = False
+        finally:
+            elapsed = time.perf_counter() - start
+            if self.metrics is not None:
+                self.metrics.record_upload('local', size, elapsed, failed)
+        return UploadResult(path, size, elapsed, False)
+
+    def public_url(self, path):
+        return f'{self.base_url}/object/public/{self.bucket}/{path}'
+
+    def create_bucket(self, file_size_limit, allowed_mime_types):
+        os.makedirs(self.root, exist_ok=True)
+
+    def create_signed_upload_url(self, path):
+        self._file_path(path)
+        return f'{self.base_url}/object/upload/sign/{self.bucket}/{path}?token={self._signer.dumps(path)}'
+
+    def object_size(self, path):
+        try:
+            return os.path.getsize(self._file_path(path))
+        except OSError:
+            return None
+
+    def delete(self, paths):
+        for path in paths:
+            try:
+                os.remove(self._file_path(path))
+            except FileNotFoundError:
+                pass
+
+    def _build_blueprint(self):
+        blueprint = Blueprint('local_storage', __name__)
+
+        @blueprint.route('/object/upload/sign/<bucket>/<path:path>', methods=['PUT'])
+        def signed_upload(bucket, path):
+            if bucket != self.bucket:
+                return jsonify({'error': 'Bucket not found', 'message': 'Bucket not found'}), 400
+            try:
+                signed_path = self._signer.loads(request.args.get('token', ''), max_age=self.signed_url_ttl)
+            except SignatureExpired:
+                return jsonify({'error': 'InvalidJWT', 'message': 'jwt expired'}), 400
+            except BadSignature:
+                return jsonify({'error': 'InvalidJWT', 'message': 'invalid signature'}), 400
+            if signed_path != path:
+                return jsonify({'error': 'InvalidSignature', 'message': 'The url does not match the signed path'}), 400
+            try:
+                self._write(path, request.stream)
+            except StorageError as e:
+                return jsonify({'error': 'StorageError', 'message': str(e)}), e.status
+            return jsonify({'Key': f'{self.bucket}/{path}'})
+
+        @blueprint.route('/object/public/<bucket>/<path:path>')
+        def public_object(bucket, path):
+            if bucket != self.bucket:
+                abort(404)
+            return send_from_directory(self.root, path)
+
+        return blueprint
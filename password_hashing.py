@@ -0,0 +1,88 @@
+"""
+Password hashing with a configurable method, run on a bounded thread pool.
+
+PasswordHasher wraps werkzeug's generate_password_hash / check_password_hash
+with a method string from PASSWORD_HASH_METHOD:
+
+  scrypt:N:r:p           e.g. scrypt:32768:8:1 (werkzeug's default, ~32MB per hash)
+  pbkdf2:hash:iterations e.g. pbkdf2:sha256:600000
+
+Stored hashes carry the method they were made with, so a login whose hash
+was made with other parameters is verified as stored and then rehashed with
+the current ones (needs_rehash()), upgrading accounts as students log in.
+
+hashlib.scrypt and pbkdf2_hmac release the GIL, so hashes run in parallel on
+a pool of `workers` threads (one per core by default). The pool also caps
+how many hashes run at once: a login burst queues there instead of taking
+every core and request thread, and pages that don't hash keep being served.
+benchmarks/bench_password_hash.py reports logins/sec per core for a method.
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+
+logger = logging.getLogger('placement_tracker.password_hashing')
+
+DEFAULT_METHOD = 'scrypt'
+
+
+def canonical_method(method):
+    """The full method string werkzeug stores for `method`, with its defaults filled in.
+
+    Parsed rather than taken from a test hash, which would cost a full hash at startup.
+    """
+    name, *args = method.split(':')
+    if name == 'scrypt' and not args:
+        return 'scrypt:32768:8:1'
+    if name == 'scrypt' and len(args) == 3 and all(arg.isdigit() for arg in args):
+        return method
+    if name == 'pbkdf2' and len(args) <= 1:
+        return f"pbkdf2:{args[0] if args else 'sha256'}:{DEFAULT_PBKDF2_ITERATIONS}"
+    if name == 'pbkdf2' and len(args) == 2 and args[1].isdigit():
+        return method
+    raise ValueError(f"Invalid password hash method '{method}'")
+
+
+class PasswordHasher:
+    """Hash/verify passwords on a thread pool; timings go to MetricsRegistry.record_password_hash"""
+
+    def __init__(self, method=DEFAULT_METHOD, salt_length=16, workers=None, metrics=None):
+        # Validates the method up front: a typo fails at startup, not at the first login.
+        # The thread pool starts its threads on the first submit.
+        self.method = canonical_method(method)
+        self.salt_length = salt_length
+        self.workers = workers or os.cpu_count() or 1
+        self.metrics = metrics
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+
+    def _timed(self, operation, func, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_password_hash(operation, time.perf_counter() - start)
+
+    def hash(self, password):
+        return self._executor.submit(self._timed, 'hash', generate_password_hash, password, self.method, self.salt_length).result()
+
+    def verify(self, stored_hash, password):
+        if not stored_hash:
+            return False
+        return self._executor.submit(self._timed, 'verify', check_password_hash, stored_hash, password).result()
+
+    def needs_rehash(self, stored_hash):
+        return stored_hash.split('$', 1)[0] != self.method
+
+    def rehash_later(self, password, save):
+        """Hash password with the current method in the background and pass the hash to save()"""
+        def rehash():
+            try:
+                save(self._timed('rehash', generate_password_hash, password, self.method, self.salt_length))
+            except Exception as e:
+                logger.exception('Password rehash failed')
+        return self._executor.submit(rehash)
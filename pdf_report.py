@@ -0,0 +1,331 @@
+"""
+PDF placement report built with reportlab platypus.
+
+Paragraph and table styles are created once when this module is first
+imported (app.py imports it lazily, so cold starts don't pay for reportlab).
+
+The report is a list of blocks - the title/overall statistics, one block per
+company and the offer lists - holding plain data only. With PDF_RENDER_WORKERS
+above 1 the blocks are split into contiguous sections of similar size, each
+section is laid out in its own process and the resulting PDFs are appended in
+order with pypdf. Every section after the first starts on a new page; that is
+the only difference from the single-process layout. Sections are laid out in
+parallel but the merged document is still assembled in memory before it is
+written: a PDF's cross-reference table covers every page, so pypdf can't emit
+pages as they arrive. Without workers, without pypdf, or where process pools
+aren't available (some serverless runtimes) the whole report is laid out in
+one document exactly as before.
+"""
+
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+
+logger = logging.getLogger('placement_tracker.pdf_report')
+
+# 0 or 1 lays out the report in this process
+RENDER_WORKERS = int(os.getenv('PDF_RENDER_WORKERS', 0))
+# Below this many student rows a process pool costs more than it saves
+MIN_PARALLEL_ROWS = int(os.getenv('PDF_PARALLEL_MIN_ROWS', 2000))
+
+STYLES = getSampleStyleSheet()
+
+TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=STYLES['Heading1'],
+    fontSize=20,
+    spaceAfter=20,
+    alignment=1  # Center alignment
+)
+SUMMARY_STYLE = ParagraphStyle('SummaryStyle', parent=STYLES['Normal'], fontSize=8, leading=10, wordWrap='LTR')
+WRAP_STYLE = ParagraphStyle('WrapStyle', parent=STYLES['Normal'], fontSize=8, leading=10, wordWrap='LTR')
+STUDENT_STYLE = ParagraphStyle('StudentStyle', parent=STYLES['Normal'], fontSize=7, leading=9, wordWrap='LTR')
+
+SUMMARY_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 9),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+    ('TOPPADDING', (0, 0), (-1, -1), 10),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+])
+COMPANY_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+])
+STUDENT_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 7),
+    ('FONTSIZE', (0, 1), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightblue])
+])
+
+
+def _offers_table_style(header_color, body_color):
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), header_color),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 8),
+        ('FONTSIZE', (0, 1), (-1, -1), 7),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ('BACKGROUND', (0, 1), (-1, -1), body_color),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, body_color])
+    ])
+
+
+ALL_OFFERS_TABLE_STYLE = _offers_table_style(colors.orange, colors.lightyellow)
+UNIQUE_OFFERS_TABLE_STYLE = _offers_table_style(colors.blue, colors.lightblue)
+
+_executor = None
+_executor_workers = None
+
+
+def report_blocks(stats):
+    """The report as a list of (kind, data) blocks holding only picklable data"""
+    def offer_rows(students):
+        return [
+            (student['name'], student['student_number'], student.get('email', 'N/A'), stats.company_name(student['company_id']))
+            for student in students
+        ]
+
+    blocks = [('overview', {
+        'company_names': [c['name'] for c in stats.companies],
+        'total_students': stats.total_students,
+        'total_got_offers': stats.total_got_offers,
+        'total_unique_offers': stats.total_unique_offers
+    })]
+    for company in stats.companies:
+        round_stats = stats.round_summary(company)
+        blocks.append(('company', {
+            'name': company['name'],
+            'ctc_offer': company['ctc_offer'],
+            'agreement_years': company['agreement_years'],
+            'round_stats_text': '; '.join(round_stats) if round_stats else 'No round data',
+            'got_offer': stats.got_offer_count(company['id']),
+            # Sorted by priority: Got Offer first, then by rounds descending, then Others last
+            'students': [
+                (student['name'], student['student_number'], student.get('email', 'N/A'), student['max_round_reached'])
+                for student in stats.students_for(company['id'])
+            ]
+        }))
+    blocks.append(('offers', {
+        'all': offer_rows(stats.students_with_offers),
+        'unique': offer_rows(stats.unique_students_with_offers)
+    }))
+    return blocks
+
+
+def _overview_flowables(data):
+    company_names = data['company_names']
+    summary_data = [
+        ['Total No of Companies', str(len(company_names))],
+        ['All Company Names', Paragraph(', '.join(company_names), SUMMARY_STYLE)],
+        ['Total No of Students', str(data['total_students'])],  # Unique student count
+        ['Total Got Offers', str(data['total_got_offers'])],
+        ['Total Unique Students with Offers', str(data['total_unique_offers'])]
+    ]
+    summary_table = Table(summary_data, colWidths=[2.2*inch, 3.3*inch])
+    summary_table.setStyle(SUMMARY_TABLE_STYLE)
+    return [
+        Paragraph("IT Branch 2026 Placements Report", TITLE_STYLE),
+        Spacer(1, 15),
+        Paragraph("Overall Statistics", STYLES['Heading2']),
+        summary_table,
+        Spacer(1, 30)
+    ]
+
+
+def _company_flowables(data):
+    company_info = [
+        ['CTC', data['ctc_offer']],
+        ['Bond/Agreement', f"{data['agreement_years']} years"],
+        ['Round-wise Students', Paragraph(data['round_stats_text'], WRAP_STYLE)],
+        ['Students Got Offers', str(data['got_offer'])]
+    ]
+    company_table = Table(company_info, colWidths=[1.8*inch, 3.7*inch])
+    company_table.setStyle(COMPANY_TABLE_STYLE)
+    flowables = [Paragraph(f"Company: {data['name']}", STYLES['Heading2']), company_table, Spacer(1, 15)]
+
+    if data['students']:
+        student_data = [['Student Name', 'Roll No', 'Email ID', 'Max Round/Offer']]
+        for name, student_number, email, max_round in data['students']:
+            student_data.append([
+                Paragraph(name, STUDENT_STYLE),
+                student_number,
+                Paragraph(email, STUDENT_STYLE),
+                Paragraph(max_round, STUDENT_STYLE)
+            ])
+        student_table = Table(student_data, colWidths=[1.6*inch, 0.9*inch, 1.8*inch, 1.2*inch])
+        student_table.setStyle(STUDENT_TABLE_STYLE)
+        flowables += [Paragraph("Student Details:", STYLES['Heading3']), student_table]
+
+    flowables.append(Spacer(1, 30))
+    return flowables
+
+
+def _offers_table(rows, table_style):
+    table_data = [['Student Name', 'Roll No', 'Email ID', 'Company']]
+    for name, student_number, email, company_name in rows:
+        table_data.append([
+            Paragraph(name, STUDENT_STYLE),
+            student_number,
+            Paragraph(email, STUDENT_STYLE),
+            Paragraph(company_name, STUDENT_STYLE)
+        ])
+    table = Table(table_data, colWidths=[1.8*inch, 1.0*inch, 1.8*inch, 1.9*inch])
+    table.setStyle(table_style)
+    return table
+
+
+def _offers_flowables(data):
+    flowables = [PageBreak()]
+    if data['all']:
+        flowables += [
+            Paragraph("All Students with Offers", STYLES['Heading2']),
+            Spacer(1, 10),
+            _offers_table(data['all'], ALL_OFFERS_TABLE_STYLE),
+            Spacer(1, 20)
+        ]
+    if data['unique']:
+        flowables += [
+            Paragraph("Unique Students with Offers", STYLES['Heading2']),
+            Spacer(1, 10),
+            _offers_table(data['unique'], UNIQUE_OFFERS_TABLE_STYLE)
+        ]
+    return flowables
+
+
+_FLOWABLES = {
+    'overview': _overview_flowables,
+    'company': _company_flowables,
+    'offers': _offers_flowables
+}
+
+
+def render_blocks(blocks, output=None):
+    """Lay out blocks as one PDF document; returns the bytes when no output is given"""
+    target = output if output is not None else BytesIO()
+    doc = SimpleDocTemplate(target, pagesize=A4, leftMargin=0.5*inch, rightMargin=0.5*inch, topMargin=0.5*inch, bottomMargin=0.5*inch)
+    story = []
+    for kind, data in blocks:
+        story.extend(_FLOWABLES[kind](data))
+    doc.build(story)
+    return target.getvalue() if output is None else None
+
+
+def _block_rows(block):
+    kind, data = block
+    if kind == 'company':
+        return 1 + len(data['students'])
+    if kind == 'offers':
+        return 1 + len(data['all']) + len(data['unique'])
+    return 1
+
+
+def split_sections(blocks, count):
+    """Split blocks into at most `count` contiguous sections with similar row totals"""
+    total = sum(_block_rows(block) for block in blocks)
+    target = total / count
+    sections, current, current_rows = [], [], 0
+    for block in blocks:
+        current.append(block)
+        current_rows += _block_rows(block)
+        if current_rows >= target and len(sections) < count - 1:
+            sections.append(current)
+            current, current_rows = [], 0
+    if current:
+        sections.append(current)
+    return sections
+
+
+def _get_executor(workers):
+    """The process pool, (re)created when the worker count changes or the last one broke.
+
+    Workers are started with forkserver (spawn where unavailable): forking the
+    app process, which runs report job and HTTP pool threads, could copy a lock
+    held by one of them into the child and deadlock it.
+    """
+    global _executor, _executor_workers
+    if _executor is None or _executor_workers != workers:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        _executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        _executor_workers = workers
+    return _executor
+
+
+def _discard_executor():
+    global _executor, _executor_workers
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+    _executor, _executor_workers = None, None
+
+
+def _render_parallel(blocks, output, workers):
+    from pypdf import PdfWriter
+
+    sections = split_sections(blocks, workers)
+    writer = PdfWriter()
+    # map() yields in submission order, so sections are appended as they arrive in sequence
+    for section_pdf in _get_executor(workers).map(render_blocks, sections):
+        writer.append(BytesIO(section_pdf))
+    writer.write(output)
+
+
+def write_pdf_report(stats, output, workers=None):
+    """Write the PDF report to `output` (a file path or binary file object)"""
+    workers = RENDER_WORKERS if workers is None else workers
+    blocks = report_blocks(stats)
+    rows = sum(_block_rows(block) for block in blocks)
+
+    if workers > 1 and rows >= MIN_PARALLEL_ROWS:
+        try:
+            _render_parallel(blocks, output, workers)
+            return
+        except (ImportError, OSError, NotImplementedError, BrokenProcessPool) as e:
+            # No pypdf, no process support (e.g. missing /dev/shm on serverless) or a worker died
+            if isinstance(e, BrokenProcessPool):
+                _discard_executor()
+            logger.warning('Parallel PDF rendering unavailable, rendering in-process: %s', e)
+            if hasattr(output, 'seek'):
+                output.seek(0)
+                output.truncate()
+
+    render_blocks(blocks, output)
@@ -0,0 +1,239 @@
+"""
+Placement statistics for the admin reports page and the Excel/PDF exports.
+
+PlacementStats groups the selected_students rows once into per-company and
+per-round counts, offer sets and unique-student sets, so every export is linear
+in the number of rows instead of companies x students x rounds.
+
+The reports page only needs counts. Those come from the placement_summary()
+database function (database_schema.sql), so only summary rows cross the wire;
+summarize_students() computes the same result in Python when the function is
+not installed. PlacementSummary turns either into what admin_reports.html shows.
+
+Student lists are shown in priority order (offers, then later rounds first,
+then others). The order is stored as selected_students.priority_rank, kept up
+to date by StudentRepo on every write, so the database returns rows already
+sorted; sort_students_by_priority() is the fallback for rows without a rank.
+"""
+
+OFFER_STATUS = 'Got Offer'
+OTHERS_STATUS = 'Others'
+OTHERS_RANK = 1000
+
+# ORDER BY for selected_students in priority order, served by idx_selected_students_company_rank
+PRIORITY_ORDER = ('priority_rank', 'name')
+
+
+def normalize_student_number(student_number):
+    """Roll number as stored: trimmed and upper-cased, so '22341a1201 ' and '22341A1201' are one student"""
+    return (student_number or '').strip().upper()
+
+
+def parse_hiring_rounds(company):
+    """Split a company's comma-separated hiring_rounds string into round names"""
+    hiring_rounds_str = company.get('hiring_rounds') or ''
+    return [r.strip() for r in hiring_rounds_str.split(',') if r.strip()]
+
+
+def priority_rank(max_round_reached):
+    """Numeric sort key stored in selected_students.priority_rank.
+
+    Got Offer is 0, Round n is 999 - n (later rounds first, Round 0 and
+    below at 999, still ahead of Others), Others and anything unparseable
+    is 1000.
+    """
+    if max_round_reached == OFFER_STATUS:
+        return 0
+    if max_round_reached and max_round_reached.startswith('Round '):
+        try:
+            round_num = int(max_round_reached.split(' ')[1])
+        except (ValueError, IndexError):
+            return OTHERS_RANK
+        return OTHERS_RANK - 1 - min(max(round_num, 0), OTHERS_RANK - 2)
+    return OTHERS_RANK
+
+
+def _priority_key(student):
+    rank = student.get('priority_rank')
+    return (priority_rank(student['max_round_reached']) if rank is None else rank, student['name'])
+
+
+def sort_students_by_priority(students):
+    """Sort students by priority: Got Offer first, then by rounds descending, then Others last"""
+    return sorted(students, key=_priority_key)
+
+
+def ensure_priority_order(students):
+    """Rows selected with order=PRIORITY_ORDER as they are; sort in Python only if
+    some row has no stored priority_rank (written before the column existed)"""
+    if all(student.get('priority_rank') is not None for student in students):
+        return students
+    return sort_students_by_priority(students)
+
+
+class PlacementStats:
+    """Aggregated view over companies and selected_students built in one pass"""
+
+    def __init__(self, companies, students):
+        self.companies = companies
+        self.students = students
+        self.company_names = {company['id']: company['name'] for company in companies}
+
+        self.students_by_company = {}
+        self.round_counts = {}
+        self.got_offer_counts = {}
+        self.unique_students = set()
+        self.unique_offer_students = set()
+        self.students_with_offers = []
+        self.unique_students_with_offers = []
+
+        for student in students:
+            company_id = student['company_id']
+            student_number = student['student_number']
+            round_reached = student['max_round_reached']
+
+            self.students_by_company.setdefault(company_id, []).append(student)
+            self.unique_students.add(student_number)
+
+            company_rounds = self.round_counts.setdefault(company_id, {})
+            if round_reached == OFFER_STATUS:
+                self.got_offer_counts[company_id] = self.got_offer_counts.get(company_id, 0) + 1
+                self.students_with_offers.append(student)
+                # Keep only the first offer row seen for each roll number
+                if student_number not in self.unique_offer_students:
+                    self.unique_offer_students.add(student_number)
+                    self.unique_students_with_offers.append(student)
+            else:
+                company_rounds[round_reached] = company_rounds.get(round_reached, 0) + 1
+
+        self._sorted_students = {}
+
+    @property
+    def total_companies(self):
+        return len(self.companies)
+
+    @property
+    def total_students(self):
+        """Number of unique roll numbers across all companies"""
+        return len(self.unique_students)
+
+    @property
+    def total_got_offers(self):
+        """Number of offer rows (a student with two offers counts twice)"""
+        return len(self.students_with_offers)
+
+    @property
+    def total_unique_offers(self):
+        """Number of unique roll numbers holding at least one offer"""
+        return len(self.unique_offer_students)
+
+    def company_name(self, company_id, default='Unknown'):
+        return self.company_names.get(company_id, default)
+
+    def students_for(self, company_id):
+        """Students of a company sorted by priority (sorted once, then reused)"""
+        if company_id not in self._sorted_students:
+            self._sorted_students[company_id] = sort_students_by_priority(
+                self.students_by_company.get(company_id, [])
+            )
+        return self._sorted_students[company_id]
+
+    def got_offer_count(self, company_id):
+        return self.got_offer_counts.get(company_id, 0)
+
+    def round_summary(self, company):
+        """List of '<round name>: <count>' for each hiring round that has students"""
+        counts = self.round_counts.get(company['id'], {})
+        round_stats = []
+        for i, round_name in enumerate(parse_hiring_rounds(company), 1):
+            count = counts.get(f'Round {i}', 0)
+            if count > 0:
+                round_stats.append(f'{round_name}: {count}')
+        return round_stats
+
+
+def build_summary(round_rows, total_students, total_unique_offers):
+    """Summary in the shape placement_summary() returns, from (company_id, max_round_reached, count) rows"""
+    companies = {}
+    total_got_offers = 0
+    for company_id, round_reached, count in round_rows:
+        company = companies.setdefault(company_id, {
+            'company_id': company_id,
+            'student_count': 0,
+            'got_offer': 0,
+            'round_stats': {}
+        })
+        company['student_count'] += count
+        if round_reached == OFFER_STATUS:
+            company['got_offer'] += count
+            total_got_offers += count
+        else:
+            company['round_stats'][round_reached] = count
+
+    return {
+        'total_students': total_students,
+        'total_got_offers': total_got_offers,
+        'total_unique_offers': total_unique_offers,
+        'companies': list(companies.values())
+    }
+
+
+def summarize_students(students):
+    """Python fallback for placement_summary(); needs company_id, student_number and max_round_reached"""
+    round_counts = {}
+    unique_students = set()
+    unique_offer_students = set()
+    for student in students:
+        key = (student['company_id'], student['max_round_reached'])
+        round_counts[key] = round_counts.get(key, 0) + 1
+        unique_students.add(student['student_number'])
+        if student['max_round_reached'] == OFFER_STATUS:
+            unique_offer_students.add(student['student_number'])
+
+    round_rows = ((company_id, round_reached, count) for (company_id, round_reached), count in round_counts.items())
+    return build_summary(round_rows, len(unique_students), len(unique_offer_students))
+
+
+def first_offer_per_student(offer_rows):
+    """Keep only the first offer row seen for each roll number"""
+    seen = set()
+    unique_rows = []
+    for student in offer_rows:
+        if student['student_number'] not in seen:
+            seen.add(student['student_number'])
+            unique_rows.append(student)
+    return unique_rows
+
+
+class PlacementSummary:
+    """Reports page figures from a placement_summary() result"""
+
+    def __init__(self, companies, summary):
+        self.companies = companies
+        self.company_names = {company['id']: company['name'] for company in companies}
+        self.total_students = summary['total_students']
+        self.total_got_offers = summary['total_got_offers']
+        self.total_unique_offers = summary['total_unique_offers']
+        self.by_company = {row['company_id']: row for row in summary['companies'] or []}
+
+    @property
+    def total_companies(self):
+        return len(self.companies)
+
+    def company_stats(self):
+        """Per-company stats in the shape admin_reports.html expects, companies with students first"""
+        with_students = {}
+        without_students = {}
+        for company in self.companies:
+            row = self.by_company.get(company['id'])
+            stats = {
+                'student_count': row['student_count'] if row else 0,
+                'got_offer': row['got_offer'] if row else 0,
+                'round_stats': row['round_stats'] if row else {},
+                'company': company,
+                'hiring_rounds': parse_hiring_rounds(company)
+            }
+            (with_students if row else without_students)[company['id']] = stats
+
+        with_students.update(without_students)
+        return with_students
@@ -0,0 +1,43 @@
+"""
+Run independent Supabase reads concurrently.
+
+The sync Supabase client blocks on each HTTP round trip, so a page that needs
+three unrelated queries waits for three round trips in a row. fetch_all()
+submits them to a shared thread pool and returns once the slowest finishes.
+Each loader runs in a copy of the caller's context, so ContextVars such as the
+current request's metrics record follow it onto the pool thread.
+"""
+
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# QUERY_BATCH_WORKERS=0 disables the pool and runs loaders one after another
+MAX_WORKERS = int(os.getenv('QUERY_BATCH_WORKERS', 8))
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='query-batch')
+    return _executor
+
+
+def fetch_all(*loaders):
+    """Call each zero-argument loader concurrently and return their results in order.
+
+    If a loader raises, the first exception (in argument order) is re-raised
+    after the others have finished.
+    """
+    if MAX_WORKERS <= 0 or len(loaders) < 2:
+        return [loader() for loader in loaders]
+
+    executor = _get_executor()
+    futures = [executor.submit(contextvars.copy_context().run, loader) for loader in loaders]
+    errors = [future.exception() for future in futures]
+    for error in errors:
+        if error is not None:
+            raise error
+    return [future.result() for future in futures]
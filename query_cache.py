@@ -0,0 +1,150 @@
+"""
+In-process read-through cache for Supabase select queries.
+
+Entries are keyed by (table, columns, equality filters), expire after a TTL and
+are evicted least-recently-used once the entry or row limits are reached.
+Admin write routes call invalidate() with the columns of the rows they touched,
+which drops only the cached queries that could contain those rows.
+
+Each table has a generation counter that invalidate() bumps. A read-through
+load remembers the generation it started under and doesn't store its result
+if the table was invalidated meanwhile: the rows it read may predate the write.
+
+The cache lives in one process, so on multi-instance deployments another
+instance can serve stale data for at most `ttl` seconds after a write.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class QueryCache:
+    """TTL + LRU cache of query results with hit/miss counters"""
+
+    def __init__(self, max_entries=256, max_rows=50000, ttl=300):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, data)
+        self._generations = {}  # table -> invalidations so far
+        self._rows = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(table, columns='*', filters=None):
+        filters = filters or {}
+        return (table, columns, tuple(sorted((column, str(value)) for column, value in filters.items())))
+
+    def get(self, key):
+        """Return cached data for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, data = entry
+            if expires_at < time.monotonic():
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    @staticmethod
+    def _size(data):
+        """Rows held by a cached value: a list of rows or a page dict with 'rows'"""
+        if isinstance(data, dict):
+            data = data.get('rows', ())
+        return len(data) if isinstance(data, (list, tuple)) else 1
+
+    def generation(self, table):
+        with self._lock:
+            return self._generations.get(table, 0)
+
+    def set(self, key, data, generation=None):
+        """Cache data for key; skipped if `generation` is given and the table was invalidated since"""
+        rows = self._size(data)
+        # A single result bigger than the whole budget is never cached
+        if rows > self.max_rows:
+            return
+        with self._lock:
+            if generation is not None and self._generations.get(key[0], 0) != generation:
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, data)
+            self._rows += rows
+            while len(self._entries) > self.max_entries or self._rows > self.max_rows:
+                oldest_key = next(iter(self._entries))
+                self._drop(oldest_key)
+                self.evictions += 1
+
+    def get_or_load(self, table, columns, filters, loader):
+        """Return cached rows for the query, calling loader() on a miss"""
+        key = self.make_key(table, columns, filters)
+        data = self.get(key)
+        if data is None:
+            generation = self.generation(table)
+            data = loader()
+            self.set(key, data, generation)
+        # Shallow copy so callers can't reorder the cached list
+        return dict(data) if isinstance(data, dict) else list(data)
+
+    def invalidate(self, table, **row):
+        """Drop cached queries on `table` that could include a row with these column values.
+
+        An entry survives only if it filters on one of the given columns with a
+        different value, e.g. invalidate('selected_students', company_id=X)
+        keeps the student lists of every other company.
+        """
+        row = {column: str(value) for column, value in row.items()}
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+            for key in list(self._entries):
+                key_table, _, filters = key
+                if key_table != table:
+                    continue
+                if any(column in row and row[column] != value for column, value in filters):
+                    continue
+                self._drop(key)
+                self.invalidations += 1
+
+    def invalidate_rows(self, table, rows, **fallback):
+        """invalidate() for every row returned by an insert/update.
+
+        If the write returned no rows, fall back to the given column values.
+        """
+        for row in rows or [fallback]:
+            self.invalidate(table, **row)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._rows = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'rows': self._rows,
+                'max_entries': self.max_entries,
+                'max_rows': self.max_rows,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+    def _drop(self, key):
+        # Caller must hold the lock
+        _, data = self._entries.pop(key)
+        self._rows -= self._size(data)
@@ -0,0 +1,211 @@
+"""
+Token bucket rate limits for the login, OTP and registration forms.
+
+Each limited endpoint has one or more Limits; a POST to it takes a token from
+one bucket per limit, keyed by endpoint, scope and value:
+
+  ip      the client address (the X-Forwarded-For entry added by the nearest
+          of `trusted_proxies` proxies; Vercel sets it, so the default is 1)
+  email   the email in the form (or the query string, for the reset page)
+
+A bucket holds `capacity` tokens (the burst) and refills at capacity per
+`period` seconds. The tokens are taken from every bucket at once or from none,
+so a throttled request doesn't drain the buckets it wasn't throttled by.
+Emails and addresses are hashed before they are used as keys.
+
+The check is a before_request hook that answers with a small plain-text 429
+and a Retry-After header, before the view reads the database, hashes a
+password or queues an email. Throttled requests are counted per endpoint and
+scope in placement_rate_limited_total.
+
+Stores:
+  MemoryBucketStore  per process; a worker only sees its own traffic
+  SQLiteBucketStore  a local file shared by every worker on the machine
+                     (RATE_LIMIT_BACKEND=sqlite), updated in one transaction
+"""
+
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask import request, Response
+
+BACKENDS = ('memory', 'sqlite')
+
+PURGE_INTERVAL = 60  # Seconds between sweeps of refilled SQLite buckets
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    full_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rate_limit_buckets_full ON rate_limit_buckets(full_at);
+'''
+
+
+class Limit:
+    """`capacity` requests per `period` seconds per value of `scope` ('ip' or 'email')"""
+
+    def __init__(self, scope, capacity, period):
+        self.scope = scope
+        self.capacity = capacity
+        self.period = period
+        self.rate = capacity / period
+
+
+def _refill(state, capacity, rate, now):
+    """Tokens in a bucket at `now`, from its (tokens, updated_at) or None for a new bucket"""
+    if state is None:
+        return float(capacity)
+    tokens, updated_at = state
+    return min(float(capacity), tokens + max(0.0, now - updated_at) * rate)
+
+
+def _take(states, buckets, now):
+    """(seconds until every bucket has a token, new (tokens, updated_at, full_at) per bucket, index of the slowest)"""
+    levels = [_refill(state, capacity, rate, now) for state, (_, capacity, rate) in zip(states, buckets)]
+    waits = [0.0 if tokens >= 1 else (1 - tokens) / rate for tokens, (_, _, rate) in zip(levels, buckets)]
+    slowest = max(range(len(waits)), key=waits.__getitem__)
+    if waits[slowest] > 0:
+        return waits[slowest], None, slowest
+    updated = [(tokens - 1, now, now + (capacity - tokens + 1) / rate) for tokens, (_, capacity, rate) in zip(levels, buckets)]
+    return 0.0, updated, slowest
+
+
+class MemoryBucketStore:
+    """Buckets in a dict in this process; full buckets are dropped first past max_keys"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at, full_at)
+        self._lock = threading.Lock()
+
+    def take(self, buckets):
+        """Take a token from each (key, capacity, rate) bucket, or from none; returns (wait, index of the slowest)"""
+        now = time.time()
+        with self._lock:
+            states = [self._buckets.get(key) for key, _, _ in buckets]
+            wait, updated, slowest = _take([state[:2] if state else None for state in states], buckets, now)
+            if updated is None:
+                return wait, slowest
+            for (key, _, _), state in zip(buckets, updated):
+                self._buckets.pop(key, None)
+                self._buckets[key] = state
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+            return 0.0, slowest
+
+    def _prune(self, now):
+        # A refilled bucket is the same as no bucket
+        for key in [key for key, state in self._buckets.items() if state[2] <= now]:
+            del self._buckets[key]
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+
+class SQLiteBucketStore:
+    """Buckets in a SQLite file, shared by the worker processes on one machine"""
+
+    def __init__(self, path):
+        self.path = path
+        self._db = None
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+
+    def _conn(self):
+        # Caller must hold _lock. Opened on first use, keeping cold starts free of it.
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=10)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.executescript(_SCHEMA)
+            self._db = db
+        return self._db
+
+    def take(self, buckets):
+        """Take a token from each (key, capacity, rate) bucket, or from none; returns (wait, index of the slowest)"""
+        with self._lock:
+            db = self._conn()
+            # IMMEDIATE: other processes wait here instead of reading the same tokens
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                now = time.time()
+                keys = [key for key, _, _ in buckets]
+                rows = db.execute(f'SELECT key, tokens, updated_at FROM rate_limit_buckets WHERE key IN ({",".join("?" * len(keys))})',
+                                  keys).fetchall()
+                found = {key: (tokens, updated_at) for key, tokens, updated_at in rows}
+                wait, updated, slowest = _take([found.get(key) for key in keys], buckets, now)
+                if updated is not None:
+                    db.executemany('INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated_at, full_at) VALUES (?, ?, ?, ?)',
+                                   [(key, *state) for key, state in zip(keys, updated)])
+                if now - self._last_purge > PURGE_INTERVAL:
+                    self._last_purge = now
+                    db.execute('DELETE FROM rate_limit_buckets WHERE full_at < ?', (now,))
+                db.execute('COMMIT')
+            except Exception:
+                db.execute('ROLLBACK')
+                raise
+            return wait, slowest
+
+
+def create_store(backend, path=None):
+    if backend not in BACKENDS:
+        raise ValueError(f"Invalid RATE_LIMIT_BACKEND '{backend}', expected one of {', '.join(BACKENDS)}")
+    return SQLiteBucketStore(path) if backend == 'sqlite' else MemoryBucketStore()
+
+
+class RateLimiter:
+    """Throttles POSTs to the endpoints in `limits` ({endpoint: [Limit, ...]}) from a before_request hook"""
+
+    def __init__(self, store, limits, metrics=None, trusted_proxies=1, enabled=True):
+        self.store = store
+        self.limits = limits
+        self.metrics = metrics
+        self.trusted_proxies = trusted_proxies
+        self.enabled = enabled
+
+    def init_app(self, app):
+        app.before_request(self.check)
+
+    def client_ip(self):
+        forwarded = request.access_route if request.headers.get('X-Forwarded-For') else []
+        if self.trusted_proxies and len(forwarded) >= self.trusted_proxies:
+            return forwarded[-self.trusted_proxies]
+        return request.remote_addr or ''
+
+    def _value(self, scope):
+        if scope == 'ip':
+            return self.client_ip()
+        return (request.form.get('email') or request.args.get('email') or '').strip().lower()
+
+    def check(self):
+        """A 429 response if the request is over one of its endpoint's limits, else None"""
+        limits = self.limits.get(request.endpoint)
+        if not self.enabled or not limits or request.method != 'POST':
+            return None
+        buckets, scopes = [], []
+        for limit in limits:
+            value = self._value(limit.scope)
+            if not value:
+                continue
+            digest = hashlib.sha256(value.encode('utf-8')).hexdigest()[:32]
+            buckets.append((f'{request.endpoint}:{limit.scope}:{digest}', limit.capacity, limit.rate))
+            scopes.append(limit.scope)
+        if not buckets:
+            return None
+        wait, slowest = self.store.take(buckets)
+        if not wait:
+            return None
+        if self.metrics is not None:
+            self.metrics.record_rate_limited(request.endpoint, scopes[slowest])
+        retry_after = max(1, math.ceil(wait))
+        return Response(f'Too many attempts. Please try again in {retry_after} seconds.\n', 429,
+                        {'Retry-After': str(retry_after), 'Cache-Control': 'no-store'}, mimetype='text/plain')
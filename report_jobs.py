@@ -0,0 +1,157 @@
+"""
+Background report generation with cached artifacts.
+
+A download request computes the current data version and asks ReportJobs for
+the report. If an artifact for that version is already on disk it is served
+as-is. Otherwise a job is queued on a small worker pool. Concurrent requests
+for the same format and version share one job, so two admins clicking at the
+same moment do the work once.
+
+Artifacts live on the local filesystem (REPORT_ARTIFACT_DIR) and are replaced
+atomically, so a half-written file is never served.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger('placement_tracker.report_jobs')
+
+EXTENSIONS = {'excel': 'xlsx', 'pdf': 'pdf'}
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class ArtifactStore:
+    """Report files on disk, one per (format, data version)"""
+
+    def __init__(self, root, keep=4):
+        self.root = root
+        self.keep = keep  # Older versions kept per format
+
+    def path(self, report_format, version):
+        return os.path.join(self.root, f'placement_report_{version}.{EXTENSIONS[report_format]}')
+
+    def get(self, report_format, version):
+        path = self.path(report_format, version)
+        return path if os.path.exists(path) else None
+
+    def put(self, report_format, version, writer):
+        """Call writer(tmp_path) and move the result into place atomically"""
+        os.makedirs(self.root, exist_ok=True)
+        final_path = self.path(report_format, version)
+        tmp_path = f'{final_path}.{uuid.uuid4().hex}.tmp'
+        try:
+            writer(tmp_path)
+            os.replace(tmp_path, final_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._prune(report_format)
+        return final_path
+
+    def _prune(self, report_format):
+        suffix = f'.{EXTENSIONS[report_format]}'
+        artifacts = [
+            os.path.join(self.root, name) for name in os.listdir(self.root)
+            if name.startswith('placement_report_') and name.endswith(suffix)
+        ]
+        artifacts.sort(key=os.path.getmtime, reverse=True)
+        for stale_path in artifacts[self.keep:]:
+            try:
+                os.remove(stale_path)
+            except OSError:
+                pass
+
+
+class ReportJobs:
+    """Queue of report builds backed by an ArtifactStore.
+
+    builders maps a format to a callable(path) that writes the report for the
+    current data to `path`.
+    """
+
+    def __init__(self, store, builders, max_workers=2, max_jobs=100):
+        self.store = store
+        self.builders = builders
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='report-job')
+        self._jobs = OrderedDict()  # job id -> job dict
+        self._active = {}  # (format, version) -> job id while queued/running
+        self._lock = threading.Lock()
+
+    def submit(self, report_format, version):
+        """Return the job for this format/version, queueing one if needed"""
+        with self._lock:
+            job_id = self._active.get((report_format, version))
+            if job_id:
+                return dict(self._jobs[job_id])
+
+            job = {
+                'id': uuid.uuid4().hex,
+                'format': report_format,
+                'version': version,
+                'status': QUEUED,
+                'path': self.store.get(report_format, version),
+                'error': None,
+                'created_at': time.time(),
+                'finished_at': None
+            }
+            if job['path']:
+                # Artifact already built for this data version
+                job['status'] = DONE
+                job['finished_at'] = job['created_at']
+            else:
+                self._active[(report_format, version)] = job['id']
+            self._remember(job)
+
+        if job['status'] == QUEUED:
+            self._executor.submit(self._run, job['id'])
+        return dict(job)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def wait(self, job_id, timeout):
+        """Poll until the job finishes or timeout seconds pass; return the job"""
+        deadline = time.monotonic() + timeout
+        job = self.get(job_id)
+        while job and job['status'] in (QUEUED, RUNNING) and time.monotonic() < deadline:
+            time.sleep(0.1)
+            job = self.get(job_id)
+        return job
+
+    def _run(self, job_id):
+        job = self._update(job_id, status=RUNNING)
+        try:
+            path = self.store.put(job['format'], job['version'], self.builders[job['format']])
+            self._update(job_id, status=DONE, path=path, finished_at=time.time())
+        except Exception as e:
+            logger.exception('Report job %s failed', job_id)
+            self._update(job_id, status=FAILED, error=str(e), finished_at=time.time())
+        finally:
+            with self._lock:
+                self._active.pop((job['format'], job['version']), None)
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields)
+            return dict(self._jobs[job_id])
+
+    def _remember(self, job):
+        # Caller must hold the lock. Forget the oldest finished jobs past max_jobs.
+        self._jobs[job['id']] = job
+        while len(self._jobs) > self.max_jobs:
+            oldest_id = next(iter(self._jobs))
+            if self._jobs[oldest_id]['status'] in (QUEUED, RUNNING):
+                break
+            self._jobs.pop(oldest_id)
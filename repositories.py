@@ -0,0 +1,259 @@
+"""
+Repository layer over the placement tracker tables.
+
+Routes go through CompanyRepo, StudentRepo, ModelPaperRepo, StudentDetailsRepo
+and AdminRepo instead of chaining query builders on the global client. Each
+repository runs on a backend that provides a few table-level primitives:
+
+  SupabaseBackend  the Supabase (PostgREST) client used in production
+  SQLiteBackend    a local database built from the schema files, see
+                   sqlite_backend.py; used by benchmarks/load_test.py to drive
+                   the app without a Supabase project
+
+Every select returns a list of row dicts shaped like the Supabase response,
+and an insert that violates a unique constraint raises DuplicateKeyError on
+either backend.
+"""
+
+import re
+
+from company_listing import fetch_companies_page
+from placement_stats import PRIORITY_ORDER, priority_rank
+
+# Postgres unique_violation details: 'Key (email)=(x@y) already exists.'
+_CONFLICT_KEY_RE = re.compile(r'Key \(([^)]*)\)=')
+
+
+class DuplicateKeyError(Exception):
+    """An insert hit a unique constraint; `columns` names the constrained columns when known"""
+
+    def __init__(self, message, columns=()):
+        super().__init__(message)
+        self.columns = tuple(columns)
+
+
+class SupabaseBackend:
+    """Backend primitives on a supabase-py client (or a LazyClient proxy)"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def __bool__(self):
+        return bool(self.client)
+
+    def _filtered(self, query, filters):
+        for column, value in (filters or {}).items():
+            query = query.eq(column, value)
+        return query
+
+    def select(self, table, columns='*', filters=None, order=None):
+        query = self._filtered(self.client.table(table).select(columns), filters)
+        for column in order or ():
+            query = query.order(column)
+        return query.execute().data
+
+    def select_embedded(self, table, columns, filters, parent, parent_columns):
+        """Rows with the referenced `parent` row embedded under its table name"""
+        query = self.client.table(table).select(f'{columns}, {parent}({parent_columns})')
+        return self._filtered(query, filters).execute().data
+
+    def select_in(self, table, columns, column, values, filters=None):
+        query = self.client.table(table).select(columns).in_(column, list(values))
+        return self._filtered(query, filters).execute().data
+
+    def insert(self, table, data):
+        try:
+            return self.client.table(table).insert(data).execute().data
+        except Exception as e:
+            # postgrest APIError with the Postgres unique_violation code
+            if getattr(e, 'code', None) == '23505':
+                match = _CONFLICT_KEY_RE.search(getattr(e, 'details', None) or '')
+                columns = [column.strip() for column in match.group(1).split(',')] if match else ()
+                raise DuplicateKeyError(str(e), columns) from e
+            raise
+
+    def upsert(self, table, rows, on_conflict):
+        """Insert rows, updating the existing row where the `on_conflict` columns match"""
+        return self.client.table(table).upsert(rows, on_conflict=on_conflict).execute().data
+
+    def update(self, table, data, filters):
+        return self._filtered(self.client.table(table).update(data), filters).execute().data
+
+    def update_in(self, table, data, column, values, filters=None):
+        """One UPDATE for every row whose `column` is in `values`"""
+        query = self.client.table(table).update(data).in_(column, list(values))
+        return self._filtered(query, filters).execute().data
+
+    def delete(self, table, filters):
+        return self._filtered(self.client.table(table).delete(), filters).execute().data
+
+    def placement_summary(self):
+        """Reports page counts from the placement_summary() database function"""
+        return self.client.rpc('placement_summary').execute().data
+
+    def latest_change(self, table):
+        """[row count, newest updated_at] for a table"""
+        response = self.client.table(table).select('updated_at', count='exact').order('updated_at', desc=True, nullsfirst=False).limit(1).execute()
+        return [response.count, response.data[0]['updated_at'] if response.data else None]
+
+    def companies_page(self, listing, columns):
+        return fetch_companies_page(self.client, listing, columns)
+
+
+class Repo:
+    """Queries shared by every table; subclasses add the table-specific ones"""
+
+    table = None
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def select(self, columns='*', order=None, **filters):
+        return self.backend.select(self.table, columns, filters, order)
+
+    def get(self, row_id, columns='*'):
+        rows = self.select(columns, id=row_id)
+        return rows[0] if rows else None
+
+    def create(self, data):
+        return self.backend.insert(self.table, data)
+
+    def update(self, row_id, data):
+        return self.backend.update(self.table, data, {'id': row_id})
+
+    def delete(self, row_id):
+        return self.backend.delete(self.table, {'id': row_id})
+
+    def latest_change(self):
+        return self.backend.latest_change(self.table)
+
+
+class CompanyRepo(Repo):
+    table = 'companies'
+
+    def page(self, listing, columns):
+        """One page of the filtered listing, see company_listing.fetch_companies_page()"""
+        return self.backend.companies_page(listing, columns)
+
+
+class StudentRepo(Repo):
+    """selected_students; every write that sets max_round_reached also sets priority_rank"""
+
+    table = 'selected_students'
+
+    @staticmethod
+    def _ranked(data):
+        rows = data if isinstance(data, list) else [data]
+        ranked = [
+            dict(row, priority_rank=priority_rank(row['max_round_reached'])) if 'max_round_reached' in row else row
+            for row in rows
+        ]
+        return ranked if isinstance(data, list) else ranked[0]
+
+    def create(self, data):
+        return super().create(self._ranked(data))
+
+    def update(self, row_id, data):
+        return super().update(row_id, self._ranked(data))
+
+    def for_company(self, company_id, columns='*', ordered=False):
+        """A company's students, in priority order (see placement_stats.PRIORITY_ORDER) if `ordered`"""
+        return self.select(columns, PRIORITY_ORDER if ordered else None, company_id=company_id)
+
+    def get_with_company(self, student_id, company_columns='name, hiring_rounds'):
+        """Student row plus its company under 'companies', in one query"""
+        rows = self.backend.select_embedded(self.table, '*', {'id': student_id}, 'companies', company_columns)
+        return rows[0] if rows else None
+
+    def number_taken(self, company_id, student_number):
+        """Whether a roll number is already listed for the company"""
+        return bool(self.select('id', company_id=company_id, student_number=student_number))
+
+    def numbers_taken(self, company_id, student_numbers, chunk_size=200):
+        """The subset of roll numbers already listed for the company, one query per chunk"""
+        student_numbers = list(student_numbers)
+        taken = set()
+        for start in range(0, len(student_numbers), chunk_size):
+            rows = self.backend.select_in(self.table, 'student_number', 'student_number',
+                                          student_numbers[start:start + chunk_size], {'company_id': company_id})
+            taken.update(row['student_number'] for row in rows)
+        return taken
+
+    def upsert_many(self, rows):
+        """Insert rows or update the existing (company_id, student_number) rows in one request"""
+        return self.backend.upsert(self.table, self._ranked(rows), 'company_id,student_number')
+
+    def set_round(self, company_id, column, values, max_round_reached, updated_at, chunk_size=200):
+        """Move the company's students matched on `column` ('id' or 'student_number') to a new round.
+
+        One bulk update per chunk of values; returns the updated rows.
+        """
+        values = list(values)
+        data = self._ranked({'max_round_reached': max_round_reached, 'updated_at': updated_at})
+        rows = []
+        for start in range(0, len(values), chunk_size):
+            rows += self.backend.update_in(self.table, data, column, values[start:start + chunk_size], {'company_id': company_id})
+        return rows
+
+    def delete_for_company(self, company_id):
+        return self.backend.delete(self.table, {'company_id': company_id})
+
+    def placement_summary(self):
+        """Unique student/offer totals and per-company round counts, aggregated by the database"""
+        return self.backend.placement_summary()
+
+
+class ModelPaperRepo(Repo):
+    table = 'model_papers'
+
+    def for_company(self, company_id, columns='*'):
+        return self.select(columns, company_id=company_id)
+
+    def get_by_storage_key(self, storage_key, columns='*'):
+        """Exact match on the uniquely indexed storage object key"""
+        rows = self.select(columns, storage_key=storage_key)
+        return rows[0] if rows else None
+
+
+class StudentDetailsRepo(Repo):
+    table = 'studentdetails'
+
+    def get_by_email(self, email):
+        rows = self.select(email=email)
+        return rows[0] if rows else None
+
+    def update_by_email(self, email, data):
+        return self.backend.update(self.table, data, {'email': email})
+
+    def replace_password_hash(self, student_id, old_hash, new_hash):
+        """Compare-and-set: only replaces the hash if it is still old_hash; returns the updated rows"""
+        return self.backend.update(self.table, {'password_hash': new_hash}, {'id': student_id, 'password_hash': old_hash})
+
+
+class AdminRepo(Repo):
+    table = 'admins'
+
+    def get_by_email(self, email):
+        rows = self.select(email=email)
+        return rows[0] if rows else None
+
+
+class Repositories:
+    """All repositories on one backend. Falsy when the backend isn't configured."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.companies = CompanyRepo(backend)
+        self.students = StudentRepo(backend)
+        self.model_papers = ModelPaperRepo(backend)
+        self.student_details = StudentDetailsRepo(backend)
+        self.admins = AdminRepo(backend)
+        self._by_table = {repo.table: repo for repo in (
+            self.companies, self.students, self.model_papers, self.student_details, self.admins
+        )}
+
+    def __bool__(self):
+        return bool(self.backend)
+
+    def for_table(self, table):
+        return self._by_table[table]
@@ -0,0 +1,291 @@
+"""
+Per-request latency and query instrumentation.
+
+init_app() hooks a Flask app so every request records:
+  - wall time, status and response size per route (the URL rule, not the path)
+  - each repository/database call with its latency (via InstrumentedBackend)
+  - template render time
+  - storage uploads with their size and duration (via storage_uploads)
+  - outbox email deliveries by outcome (via email_outbox)
+  - password hash / verify time (via password_hashing)
+  - requests throttled by the rate limiter (via rate_limiting)
+
+Totals are exposed in the Prometheus text format by MetricsRegistry.render()
+and every request is logged as one JSON line on the 'placement_tracker.requests'
+logger, listing its queries in order, which makes N+1 patterns easy to spot.
+
+The current request is tracked in a ContextVar. query_batch.fetch_all() runs
+loaders in a copy of the caller's context, so queries fanned out to the thread
+pool are still attributed to the request that issued them.
+"""
+
+import json
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from flask import g, request, template_rendered, before_render_template
+
+logger = logging.getLogger('placement_tracker.requests')
+
+_current = ContextVar('request_metrics_current', default=None)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (1024, 10240, 102400, 1048576, 10485760)
+
+
+class Histogram:
+    """Cumulative histogram per label set, Prometheus style"""
+
+    def __init__(self, name, help_text, labels, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}  # label values -> [bucket counts, sum, count]
+
+    def observe(self, label_values, value):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][i] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for label_values, (bucket_counts, total, count) in sorted(self._series.items()):
+            labels = _format_labels(self.labels, label_values)
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {bucket_count}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{labels}}} {total:.6f}')
+            lines.append(f'{self.name}_count{{{labels}}} {count}')
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values = {}
+
+    def inc(self, label_values, amount=1):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        for label_values, value in sorted(self._values.items()):
+            lines.append(f'{self.name}{{{_format_labels(self.labels, label_values)}}} {value:g}')
+        return lines
+
+
+def _format_labels(names, values):
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in values)
+    return ','.join(f'{name}="{value}"' for name, value in zip(names, escaped))
+
+
+class MetricsRegistry:
+    """Process-wide request and query metrics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = Counter('placement_requests_total', 'Requests handled', ('route', 'method', 'status'))
+        self.request_duration = Histogram('placement_request_duration_seconds', 'Request wall time',
+                                          ('route', 'method'), DURATION_BUCKETS)
+        self.request_queries = Histogram('placement_request_queries', 'Database calls made per request',
+                                         ('route', 'method'), QUERY_COUNT_BUCKETS)
+        self.request_query_time = Counter('placement_request_query_seconds_total',
+                                          'Time spent in database calls (summed across concurrent calls)', ('route', 'method'))
+        self.template_time = Counter('placement_template_render_seconds_total', 'Time spent rendering templates',
+                                     ('route', 'template'))
+        self.response_size = Histogram('placement_response_size_bytes', 'Response body size',
+                                       ('route', 'method'), SIZE_BUCKETS)
+        self.query_duration = Histogram('placement_query_duration_seconds', 'Latency of individual database calls',
+                                        ('query',), DURATION_BUCKETS)
+        self.query_errors = Counter('placement_query_errors_total', 'Database calls that raised', ('query',))
+        self.upload_duration = Histogram('placement_storage_upload_duration_seconds', 'Storage upload wall time',
+                                         ('mode',), DURATION_BUCKETS)
+        self.upload_bytes = Counter('placement_storage_upload_bytes_total',
+                                    'Bytes uploaded to storage (divide by the duration sum for throughput)', ('mode',))
+        self.upload_errors = Counter('placement_storage_upload_errors_total', 'Storage uploads that failed', ('mode',))
+        self.password_hash_duration = Histogram('placement_password_hash_seconds', 'Password hash and verify time',
+                                                ('operation',), DURATION_BUCKETS)
+        self._collectors = []  # Callables returning extra Prometheus lines (e.g. HTTP pool stats)
+        self.emails = Counter('placement_emails_total', 'Outbox deliveries by outcome (sent, retried, failed, expired)', ('status',))
+        self.rate_limited = Counter('placement_rate_limited_total', 'Requests answered 429 by the rate limiter, by the limit hit',
+                                    ('endpoint', 'scope'))
+
+    def record_query(self, label, elapsed, failed=False):
+        with self._lock:
+            self.query_duration.observe((label,), elapsed)
+            if failed:
+                self.query_errors.inc((label,))
+
+    def record_upload(self, mode, size, elapsed, failed=False):
+        with self._lock:
+            self.upload_duration.observe((mode,), elapsed)
+            if failed:
+                self.upload_errors.inc((mode,))
+            else:
+                self.upload_bytes.inc((mode,), size)
+
+    def add_collector(self, collector):
+        """Append collector()'s lines to every render()"""
+        self._collectors.append(collector)
+
+    def record_password_hash(self, operation, elapsed):
+        with self._lock:
+            self.password_hash_duration.observe((operation,), elapsed)
+
+    def record_email(self, status):
+        with self._lock:
+            self.emails.inc((status,))
+
+    def record_rate_limited(self, endpoint, scope):
+        with self._lock:
+            self.rate_limited.inc((endpoint, scope))
+
+    def record_request(self, record):
+        key = (record.route, record.method)
+        with self._lock:
+            self.requests.inc((record.route, record.method, str(record.status)))
+            self.request_duration.observe(key, record.duration)
+            self.request_queries.observe(key, len(record.queries))
+            self.request_query_time.inc(key, sum(elapsed for _, elapsed in record.queries))
+            for template, elapsed in record.templates:
+                self.template_time.inc((record.route, template), elapsed)
+            if record.size is not None:
+                self.response_size.observe(key, record.size)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            lines = []
+            for metric in (self.requests, self.request_duration, self.request_queries, self.request_query_time,
+                           self.template_time, self.response_size, self.query_duration, self.query_errors,
+                           self.upload_duration, self.upload_bytes, self.upload_errors, self.emails,
+                           self.password_hash_duration, self.rate_limited):
+                lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return '\n'.join(lines) + '\n'
+
+
+class RequestRecord:
+    """What one request did; filled in from request hooks and the backend wrapper"""
+
+    def __init__(self, method):
+        self.method = method
+        self.route = 'unmatched'
+        self.status = None
+        self.size = None
+        self.duration = None
+        self.queries = []  # (label, seconds) in completion order
+        self.templates = []  # (template name, seconds)
+        self.render_starts = []  # Stack of start times for templates being rendered
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add_query(self, label, elapsed):
+        with self._lock:
+            self.queries.append((label, elapsed))
+
+
+class InstrumentedBackend:
+    """Wrap a repository backend so each call is timed and attributed to the current request"""
+
+    def __init__(self, backend, registry):
+        self._backend = backend
+        self._registry = registry
+
+    def __bool__(self):
+        return bool(self._backend)
+
+    def __getattr__(self, name):
+        method = getattr(self._backend, name)
+        if not callable(method):
+            return method
+
+        def timed(*args, **kwargs):
+            label = f'{args[0]}.{name}' if args and isinstance(args[0], str) else name
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = method(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                elapsed = time.perf_counter() - start
+                self._registry.record_query(label, elapsed, failed)
+                record = _current.get()
+                if record is not None:
+                    record.add_query(label, elapsed)
+        return timed
+
+
+def init_app(app, registry, log_requests=True):
+    """Register the request hooks and template signals on a Flask app"""
+    if log_requests and not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+    @app.before_request
+    def start_request_record():
+        record = RequestRecord(request.method)
+        g.request_metrics_token = _current.set(record)
+        g.request_metrics = record
+
+    @app.after_request
+    def finish_request_record(response):
+        record = g.pop('request_metrics', None)
+        if record is None:
+            return response
+        record.route = request.url_rule.rule if request.url_rule else 'unmatched'
+        record.status = response.status_code
+        # Streamed responses (report downloads) don't know their size up front
+        record.size = response.content_length if response.content_length is not None else (
+            None if response.is_streamed else len(response.get_data()))
+        record.duration = time.perf_counter() - record.started
+        registry.record_request(record)
+        if log_requests:
+            logger.info(json.dumps({
+                'route': record.route,
+                'path': request.path,
+                'method': record.method,
+                'status': record.status,
+                'duration_ms': round(record.duration * 1000, 2),
+                'query_count': len(record.queries),
+                'query_ms': round(sum(elapsed for _, elapsed in record.queries) * 1000, 2),
+                'queries': [[label, round(elapsed * 1000, 2)] for label, elapsed in record.queries],
+                'template_ms': round(sum(elapsed for _, elapsed in record.templates) * 1000, 2),
+                'size': record.size
+            }))
+        return response
+
+    @app.teardown_request
+    def reset_request_record(exc):
+        token = g.pop('request_metrics_token', None)
+        if token is not None:
+            _current.reset(token)
+
+    def template_started(sender, template, context, **extra):
+        record = _current.get()
+        if record is not None:
+            record.render_starts.append(time.perf_counter())
+
+    def template_finished(sender, template, context, **extra):
+        record = _current.get()
+        if record is not None and record.render_starts:
+            record.templates.append((template.name, time.perf_counter() - record.render_starts.pop()))
+
+    before_render_template.connect(template_started, app, weak=False)
+    template_rendered.connect(template_finished, app, weak=False)
@@ -0,0 +1,284 @@
+"""
+Server-side sessions and a cache of student profiles, on a pluggable store.
+
+With SESSION_BACKEND=memory|sqlite|redis the session data stays on the
+server and the cookie only carries a signed, random session id:
+
+  memory   a dict in this process; for a single long-running process
+  sqlite   a local SQLite file (WAL) shared by the processes on one machine
+  redis    any Redis-compatible server (Redis, Valkey, a local stand-in);
+           needs the `redis` package, imported only for this backend
+
+The default, `cookie`, keeps Flask's signed cookie sessions: serverless
+instances (Vercel) share no memory, so a per-process store would log users
+out whenever a request lands on another instance.
+
+A login or logout (a change in the keys of AUTH_KEYS) moves the session to a
+new id, so an id planted in a browser before login is worth nothing after it.
+Entries expire PERMANENT_SESSION_LIFETIME after their last write.
+
+ProfileCache keeps the projected studentdetails fields the student pages
+render, by student id, in the same store (an in-process MemoryStore with the
+cookie backend). Login fills it from the row it already read and password
+resets drop it, so the dashboard reads no database row on a hit.
+"""
+
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SecureCookieSession
+from itsdangerous import Signer, BadSignature
+
+BACKENDS = ('cookie', 'memory', 'sqlite', 'redis')
+
+# Session keys that mark a login; a change in which are set rotates the session id
+AUTH_KEYS = ('student_id', 'admin_logged_in', 'user_id')
+
+SESSION_PREFIX = 'session:'
+PROFILE_PREFIX = 'profile:'
+
+# Fields of studentdetails the dashboard and templates use (never the password hash or OTP)
+PROFILE_COLUMNS = 'id, email, full_name, student_number, is_verified, created_at'
+PROFILE_TTL = 300
+
+PURGE_INTERVAL = 60  # Seconds between sweeps of expired SQLite rows
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS session_store (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_session_store_expires ON session_store(expires_at);
+'''
+
+_serializer = TaggedJSONSerializer()
+
+
+class MemoryStore:
+    """Serialized values with expiry in a dict; the oldest entry is dropped past max_entries"""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, serialized value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self._entries[key]
+                return None
+            value = entry[1]
+        return _serializer.loads(value)
+
+    def set(self, key, value, ttl):
+        # Stored serialized, so callers never share (and mutate) a cached object
+        value = _serializer.dumps(value)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.time() + ttl, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class SQLiteStore:
+    """Values with expiry in a SQLite file, shared by the processes on one machine"""
+
+    def __init__(self, path):
+        self.path = path
+        self._db = None
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+
+    def _conn(self):
+        # Caller must hold _lock. Opened on first use, keeping cold starts free of it.
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=10)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.executescript(_SCHEMA)
+            self._db = db
+        return self._db
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn().execute('SELECT value FROM session_store WHERE key = ? AND expires_at >= ?',
+                                       (key, time.time())).fetchone()
+        return _serializer.loads(row[0]) if row else None
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            db.execute('INSERT OR REPLACE INTO session_store (key, value, expires_at) VALUES (?, ?, ?)',
+                       (key, _serializer.dumps(value), now + ttl))
+            if now - self._last_purge > PURGE_INTERVAL:
+                self._last_purge = now
+                db.execute('DELETE FROM session_store WHERE expires_at < ?', (now,))
+
+    def delete(self, key):
+        with self._lock:
+            self._conn().execute('DELETE FROM session_store WHERE key = ?', (key,))
+
+
+class RedisStore:
+    """Values with expiry on a Redis-compatible server, under a key prefix"""
+
+    def __init__(self, url, prefix='placement:'):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError('SESSION_BACKEND=redis needs the redis package (pip install redis)') from e
+        # Connects on the first command
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self._client.get(self.prefix + key)
+        return _serializer.loads(value.decode('utf-8')) if value is not None else None
+
+    def set(self, key, value, ttl):
+        self._client.set(self.prefix + key, _serializer.dumps(value), ex=max(1, int(ttl)))
+
+    def delete(self, key):
+        self._client.delete(self.prefix + key)
+
+
+def create_store(backend, path=None, url=None):
+    """The store for SESSION_BACKEND (a MemoryStore for `cookie`, which only needs one for profiles)"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Invalid SESSION_BACKEND '{backend}', expected one of {', '.join(BACKENDS)}")
+    if backend == 'sqlite':
+        return SQLiteStore(path)
+    if backend == 'redis':
+        return RedisStore(url)
+    return MemoryStore()
+
+
+def _logins(session):
+    # dict.get: reading through the session would mark it accessed (and add Vary: Cookie)
+    return tuple(key for key in AUTH_KEYS if dict.get(session, key))
+
+
+class ServerSideSession(SecureCookieSession):
+    """Session data loaded from a store under a random id"""
+
+    def __init__(self, initial=None, sid=None):
+        super().__init__(initial)
+        self.sid = sid
+        self.logins = _logins(self)
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Keeps session data in a store; the cookie holds the signed session id"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt='server-side-session')
+
+    def open_session(self, app, request):
+        value = request.cookies.get(self.get_cookie_name(app))
+        if value:
+            try:
+                sid = self._signer(app).unsign(value).decode('utf-8')
+            except BadSignature:
+                sid = None
+            data = self.store.get(SESSION_PREFIX + sid) if sid else None
+            if data is not None:
+                return ServerSideSession(data, sid)
+        return ServerSideSession()
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        cookie = dict(domain=self.get_cookie_domain(app), path=self.get_cookie_path(app),
+                      secure=self.get_cookie_secure(app), partitioned=self.get_cookie_partitioned(app),
+                      samesite=self.get_cookie_samesite(app), httponly=self.get_cookie_httponly(app))
+
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        if not session:
+            if session.modified and session.sid:
+                self.store.delete(SESSION_PREFIX + session.sid)
+                response.delete_cookie(name, **cookie)
+                response.vary.add('Cookie')
+            return
+
+        sid = session.sid
+        if sid and _logins(session) != session.logins:
+            self.store.delete(SESSION_PREFIX + sid)
+            sid = None
+        if sid and not self.should_set_cookie(app, session):
+            return
+
+        sid = sid or secrets.token_urlsafe(32)
+        self.store.set(SESSION_PREFIX + sid, dict(session), app.permanent_session_lifetime.total_seconds())
+        session.sid, session.logins = sid, _logins(session)
+        response.set_cookie(name, self._signer(app).sign(sid).decode('utf-8'),
+                            expires=self.get_expiration_time(app, session), **cookie)
+        response.vary.add('Cookie')
+
+
+class ProfileCache:
+    """Projected studentdetails rows by student id, read through from load(student_id)"""
+
+    def __init__(self, store, load, ttl=PROFILE_TTL):
+        self.store = store
+        self.load = load
+        self.ttl = ttl
+        self._columns = [column.strip() for column in PROFILE_COLUMNS.split(',')]
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, student_id):
+        """The student's profile, or None if there is no such student"""
+        profile = self.store.get(PROFILE_PREFIX + str(student_id))
+        self._count(profile is not None)
+        if profile is None:
+            row = self.load(student_id)
+            if row:
+                profile = self.put(row)
+        return profile
+
+    def put(self, row):
+        """Cache the profile fields of a full or projected studentdetails row"""
+        profile = {column: row.get(column) for column in self._columns}
+        self.store.set(PROFILE_PREFIX + str(row['id']), profile, self.ttl)
+        return profile
+
+    def invalidate(self, student_id):
+        self.store.delete(PROFILE_PREFIX + str(student_id))
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'ttl': self.ttl
+            }
@@ -0,0 +1,109 @@
+"""
+Sitemap documents, built once per companies version and served from memory.
+
+SitemapCache keeps the rendered XML (and a gzip copy of it) until the
+companies change; the app passes [row count, newest updated_at] of the
+companies table as the version, so edits, inserts and deletes all trigger a
+rebuild and every other request is a dict lookup.
+
+lastmod is the date part of each company's updated_at (created_at if unset);
+the home and developers pages use the newest company date, so the output only
+changes when the data does. Past MAX_URLS_PER_SITEMAP URLs the sitemap is
+split into sitemap-1.xml, sitemap-2.xml, ... and sitemap.xml becomes a
+sitemap index pointing at them.
+"""
+
+import gzip
+import hashlib
+import threading
+from xml.sax.saxutils import escape
+
+from http_caching import parse_timestamp
+
+# Protocol limit per sitemap file
+MAX_URLS_PER_SITEMAP = 50000
+# Distinct base URLs (Host headers) kept; the oldest is dropped past this
+MAX_CACHED_HOSTS = 4
+
+STATIC_PAGES = (
+    ('/', 'daily', '1.0'),
+    ('/developers', 'monthly', '0.7')
+)
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+class SitemapDocument:
+    """One sitemap file: the XML, its gzip encoding and their validators"""
+
+    def __init__(self, xml, last_modified):
+        self.body = xml.encode('utf-8')
+        # mtime=0 keeps the compressed bytes (and so the ETag) stable across rebuilds
+        self.gzipped = gzip.compress(self.body, compresslevel=9, mtime=0)
+        self.etag = hashlib.sha1(self.body).hexdigest()[:32]
+        self.last_modified = last_modified
+
+
+def _row_lastmod(row):
+    value = row.get('updated_at') or row.get('created_at')
+    return value if isinstance(value, str) and len(value) >= 10 else None
+
+
+def _url_entry(loc, lastmod, changefreq, priority):
+    lastmod_tag = f'<lastmod>{lastmod[:10]}</lastmod>' if lastmod else ''
+    return f'<url><loc>{escape(loc)}</loc>{lastmod_tag}<changefreq>{changefreq}</changefreq><priority>{priority}</priority></url>\n'
+
+
+def build_sitemaps(base_url, companies, max_urls=MAX_URLS_PER_SITEMAP):
+    """{file name: SitemapDocument} for the static pages and one URL per company"""
+    newest = max(filter(None, map(_row_lastmod, companies)), default=None)
+    entries = [(f'{base_url}{path}', newest, changefreq, priority) for path, changefreq, priority in STATIC_PAGES]
+    entries.extend((f'{base_url}/company/{company["id"]}', _row_lastmod(company), 'weekly', '0.8') for company in companies)
+
+    chunks = [entries[start:start + max_urls] for start in range(0, len(entries), max_urls)]
+    documents = {}
+    for number, chunk in enumerate(chunks, 1):
+        chunk_newest = max(filter(None, (lastmod for _, lastmod, _, _ in chunk)), default=None)
+        xml = ''.join([XML_HEADER, f'<urlset xmlns="{SITEMAP_NS}">\n'] + [_url_entry(*entry) for entry in chunk] + ['</urlset>\n'])
+        name = 'sitemap.xml' if len(chunks) == 1 else f'sitemap-{number}.xml'
+        documents[name] = SitemapDocument(xml, parse_timestamp(chunk_newest))
+
+    if len(chunks) > 1:
+        parts = [XML_HEADER, f'<sitemapindex xmlns="{SITEMAP_NS}">\n']
+        for number in range(1, len(chunks) + 1):
+            last_modified = documents[f'sitemap-{number}.xml'].last_modified
+            lastmod_tag = f'<lastmod>{last_modified.date().isoformat()}</lastmod>' if last_modified else ''
+            parts.append(f'<sitemap><loc>{escape(base_url)}/sitemap-{number}.xml</loc>{lastmod_tag}</sitemap>\n')
+        parts.append('</sitemapindex>\n')
+        documents['sitemap.xml'] = SitemapDocument(''.join(parts), parse_timestamp(newest))
+    return documents
+
+
+class SitemapCache:
+    """Built sitemaps per base URL, rebuilt when the companies version changes"""
+
+    def __init__(self, max_urls=MAX_URLS_PER_SITEMAP, max_hosts=MAX_CACHED_HOSTS):
+        self.max_urls = max_urls
+        self.max_hosts = max_hosts
+        self._built = {}  # base_url -> (version, documents)
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def get(self, base_url, version, load_companies):
+        """Documents for base_url, calling load_companies() only if version changed since the last build"""
+        entry = self._built.get(base_url)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        with self._lock:
+            # Another request may have rebuilt it while this one waited
+            entry = self._built.get(base_url)
+            if entry is not None and entry[0] == version:
+                return entry[1]
+            documents = build_sitemaps(base_url, load_companies(), self.max_urls)
+            self._built.pop(base_url, None)
+            self._built[base_url] = (version, documents)
+            while len(self._built) > self.max_hosts:
+                self._built.pop(next(iter(self._built)))
+            self.builds += 1
+            return documents
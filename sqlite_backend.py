@@ -0,0 +1,387 @@
+"""
+Local SQLite backend for the repository layer.
+
+The tables are created from the same database_schema.sql and
+studentdetails_schema.sql used for Supabase. Only the CREATE TABLE / CREATE
+INDEX / CREATE TRIGGER statements are read; Postgres-only parts (RLS policies,
+plpgsql functions, operator classes) are skipped or translated:
+
+  UUID / VARCHAR / TEXT / TIMESTAMP  -> TEXT (ISO strings, as PostgREST returns)
+  DECIMAL / NUMERIC                  -> REAL
+  BOOLEAN                            -> INTEGER, converted back to bool on read
+  DEFAULT gen_random_uuid() / NOW()  -> filled in by insert()
+  substring(col from 'regex')        -> regexp_substr(col, 'regex')
+
+This is meant for load testing and local development, not production.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timezone
+
+from company_listing import decode_cursor, escape_like, page_result
+from placement_stats import OFFER_STATUS, build_summary
+from repositories import DuplicateKeyError
+
+SCHEMA_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_FILES = ('database_schema.sql', 'studentdetails_schema.sql')
+
+_CREATE_TABLE_RE = re.compile(r'CREATE TABLE (\w+) \((.*?)\n\);', re.S)
+_CREATE_INDEX_RE = re.compile(r'CREATE (UNIQUE )?INDEX (?:IF NOT EXISTS )?(\w+) ON (\w+)\s*\((.*?)\)(?: WHERE (.*?))?;', re.S)
+_UPDATE_TRIGGER_RE = re.compile(r'CREATE TRIGGER \w+ BEFORE UPDATE\s+ON (\w+)', re.S)
+_SUBSTRING_RE = re.compile(r"substring\((\w+) from '([^']*)'\)::numeric")
+_REFERENCES_RE = re.compile(r'REFERENCES (\w+)\((\w+)\)( ON DELETE CASCADE)?')
+_GENERATED_RE = re.compile(r'GENERATED ALWAYS AS \((.*)\) STORED')
+
+
+def _regexp_substr(value, pattern):
+    match = re.search(pattern, value) if value is not None else None
+    return match.group(0) if match else None
+
+
+def _affinity(sql_type):
+    sql_type = sql_type.upper()
+    if sql_type.startswith(('DECIMAL', 'NUMERIC')):
+        return 'REAL'
+    if sql_type.startswith(('INTEGER', 'BOOLEAN')):
+        return 'INTEGER'
+    return 'TEXT'
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _strip_comments(sql):
+    sql = re.sub(r'/\*.*?\*/', '', sql, flags=re.S)
+    return re.sub(r'--[^\n]*', '', sql)
+
+
+class _Table:
+    """Column metadata for one translated table"""
+
+    def __init__(self, name):
+        self.name = name
+        self.columns = []
+        self.generated = set()
+        self.booleans = set()
+        self.references = {}  # parent table -> foreign key column
+        self.touch_on_update = False
+
+
+def translate_schema(sql):
+    """Return (statements, tables) for the SQLite version of a Postgres schema"""
+    sql = _strip_comments(sql)
+    statements, tables = [], {}
+
+    for table_name, body in _CREATE_TABLE_RE.findall(sql):
+        table = tables[table_name] = _Table(table_name)
+        definitions = []
+        for line in body.split('\n'):
+            line = line.strip().rstrip(',')
+            if not line:
+                continue
+            if line.split()[0].upper() in ('UNIQUE', 'CONSTRAINT', 'PRIMARY', 'CHECK', 'FOREIGN'):
+                definitions.append(line)
+                continue
+
+            name, rest = line.split(None, 1)
+            sql_type = rest.split()[0]
+            parts = [name, _affinity(sql_type)]
+            table.columns.append(name)
+            if sql_type.upper() == 'BOOLEAN':
+                table.booleans.add(name)
+
+            generated = _GENERATED_RE.search(rest)
+            if generated:
+                expression = _SUBSTRING_RE.sub(r"CAST(regexp_substr(\1, '\2') AS REAL)", generated.group(1))
+                parts.append(f'GENERATED ALWAYS AS ({expression}) STORED')
+                table.generated.add(name)
+            if 'PRIMARY KEY' in rest:
+                parts.append('PRIMARY KEY')
+            if 'UNIQUE' in rest:
+                parts.append('UNIQUE')
+            if 'NOT NULL' in rest:
+                parts.append('NOT NULL')
+            if 'DEFAULT FALSE' in rest.upper():
+                parts.append('DEFAULT 0')
+            elif 'DEFAULT TRUE' in rest.upper():
+                parts.append('DEFAULT 1')
+            reference = _REFERENCES_RE.search(rest)
+            if reference:
+                parent, parent_column, cascade = reference.groups()
+                parts.append(f'REFERENCES {parent}({parent_column}){cascade or ""}')
+                table.references[parent] = name
+            definitions.append(' '.join(parts))
+
+        statements.append(f'CREATE TABLE IF NOT EXISTS {table_name} ({", ".join(definitions)})')
+
+    for unique, index_name, table_name, columns, where in _CREATE_INDEX_RE.findall(sql):
+        # Postgres operator classes (varchar_pattern_ops) have no SQLite equivalent
+        columns = ', '.join(column.split()[0] for column in columns.split(','))
+        statement = f'CREATE {unique}INDEX IF NOT EXISTS {index_name} ON {table_name}({columns})'
+        statements.append(f'{statement} WHERE {where}' if where else statement)
+
+    for table_name in _UPDATE_TRIGGER_RE.findall(sql):
+        if table_name in tables:
+            tables[table_name].touch_on_update = True
+
+    return statements, tables
+
+
+class SQLiteBackend:
+    """Repository backend on a local SQLite database (a file path or ':memory:')"""
+
+    def __init__(self, path=':memory:', schema_files=SCHEMA_FILES):
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.create_function('regexp_substr', 2, _regexp_substr, deterministic=True)
+        self._conn.execute('PRAGMA foreign_keys = ON')
+        if path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode = WAL')
+
+        self.tables = {}
+        for schema_file in schema_files:
+            with open(os.path.join(SCHEMA_DIR, schema_file)) as f:
+                statements, tables = translate_schema(f.read())
+            self.tables.update(tables)
+            with self._lock:
+                for statement in statements:
+                    self._conn.execute(statement)
+
+    def __bool__(self):
+        return True
+
+    def close(self):
+        self._conn.close()
+
+    def _columns(self, table, columns):
+        if columns.strip() == '*':
+            return '*'
+        names = [column.strip() for column in columns.split(',')]
+        unknown = [name for name in names if name not in self.tables[table].columns]
+        if unknown:
+            raise ValueError(f'Unknown column(s) for {table}: {", ".join(unknown)}')
+        return ', '.join(names)
+
+    def _where(self, table, filters):
+        clauses, params = [], []
+        for column, value in (filters or {}).items():
+            self._columns(table, column)
+            if value is None:
+                clauses.append(f'{column} IS NULL')
+            else:
+                clauses.append(f'{column} = ?')
+                params.append(value)
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+    def _rows(self, table, cursor):
+        booleans = self.tables[table].booleans
+        rows = []
+        for row in cursor.fetchall():
+            row = dict(row)
+            for column in booleans.intersection(row):
+                if row[column] is not None:
+                    row[column] = bool(row[column])
+            rows.append(row)
+        return rows
+
+    def _query(self, table, sql, params=()):
+        with self._lock:
+            return self._rows(table, self._conn.execute(sql, params))
+
+    def select(self, table, columns='*', filters=None, order=None):
+        where, params = self._where(table, filters)
+        order_by = f' ORDER BY {self._columns(table, ", ".join(order))}' if order else ''
+        return self._query(table, f'SELECT {self._columns(table, columns)} FROM {table}{where}{order_by}', params)
+
+    def select_embedded(self, table, columns, filters, parent, parent_columns):
+        rows = self.select(table, columns, filters)
+        foreign_key = self.tables[table].references[parent]
+        parent_ids = sorted({row[foreign_key] for row in rows if row.get(foreign_key)})
+        parents = {}
+        if parent_ids:
+            placeholders = ', '.join('?' * len(parent_ids))
+            sql = f'SELECT id, {self._columns(parent, parent_columns)} FROM {parent} WHERE id IN ({placeholders})'
+            parent_fields = [column.strip() for column in parent_columns.split(',')]
+            for parent_row in self._query(parent, sql, parent_ids):
+                parents[parent_row['id']] = {column: parent_row[column] for column in parent_fields}
+        for row in rows:
+            row[parent] = parents.get(row.get(foreign_key))
+        return rows
+
+    def select_in(self, table, columns, column, values, filters=None):
+        self._columns(table, column)
+        values = list(values)
+        if not values:
+            return []
+        where, params = self._where(table, filters)
+        clause = f'{column} IN ({", ".join("?" * len(values))})'
+        where = f'{where} AND {clause}' if where else f' WHERE {clause}'
+        return self._query(table, f'SELECT {self._columns(table, columns)} FROM {table}{where}', params + values)
+
+    def insert(self, table, data):
+        """Insert one row (dict) or many (list of dicts); returns the inserted rows"""
+        rows = data if isinstance(data, list) else [data]
+        if not rows:
+            return []
+        meta = self.tables[table]
+        prepared = []
+        for row in rows:
+            row = dict(row)
+            if 'id' in meta.columns:
+                row.setdefault('id', str(uuid.uuid4()))
+            for column in ('created_at', 'updated_at'):
+                if column in meta.columns and not row.get(column):
+                    row[column] = _now()
+            prepared.append(row)
+
+        columns = [column for column in meta.columns if column not in meta.generated and column in prepared[0]]
+        self._columns(table, ', '.join(columns))
+        sql = f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})'
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                self._conn.executemany(sql, [[row.get(column) for column in columns] for row in prepared])
+                self._conn.execute('COMMIT')
+            except sqlite3.IntegrityError as e:
+                self._conn.execute('ROLLBACK')
+                # 'UNIQUE constraint failed: studentdetails.email' -> ('email',)
+                if str(e).startswith('UNIQUE constraint failed: '):
+                    columns = [name.split('.')[-1] for name in str(e).split(': ', 1)[1].split(', ')]
+                    raise DuplicateKeyError(str(e), columns) from e
+                raise
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        if 'id' not in meta.columns:
+            return prepared
+        return self._by_ids(table, [row['id'] for row in prepared])
+
+    def _by_ids(self, table, ids):
+        found = {}
+        # Stay well under SQLite's bound parameter limit
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            sql = f'SELECT * FROM {table} WHERE id IN ({", ".join("?" * len(chunk))})'
+            for row in self._query(table, sql, chunk):
+                found[row['id']] = row
+        return [found[row_id] for row_id in ids if row_id in found]
+
+    def upsert(self, table, rows, on_conflict):
+        """INSERT ... ON CONFLICT DO UPDATE; needs a unique index on the `on_conflict` columns"""
+        if not rows:
+            return []
+        meta = self.tables[table]
+        keys = [column.strip() for column in on_conflict.split(',')]
+        columns = [column for column in meta.columns if column not in meta.generated and column in rows[0]]
+        self._columns(table, ', '.join(columns + keys))
+        insert_columns = list(columns)
+        if 'id' in meta.columns and 'id' not in insert_columns:
+            insert_columns.append('id')
+        for column in ('created_at', 'updated_at'):
+            if column in meta.columns and column not in insert_columns:
+                insert_columns.append(column)
+        updates = [column for column in columns if column not in keys and column not in ('id', 'created_at')]
+        sql = (f'INSERT INTO {table} ({", ".join(insert_columns)}) VALUES ({", ".join("?" * len(insert_columns))}) '
+               f'ON CONFLICT ({", ".join(keys)}) DO '
+               + (f'UPDATE SET {", ".join(f"{column} = excluded.{column}" for column in updates)} ' if updates else 'NOTHING ')
+               + 'RETURNING *')
+        result = []
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                for row in rows:
+                    values = dict(row)
+                    values.setdefault('id', str(uuid.uuid4()))
+                    values['created_at'] = values.get('created_at') or _now()
+                    values['updated_at'] = values.get('updated_at') or _now()
+                    result.extend(self._rows(table, self._conn.execute(sql, [values.get(column) for column in insert_columns])))
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return result
+
+    def update(self, table, data, filters):
+        data = dict(data)
+        if self.tables[table].touch_on_update:
+            data['updated_at'] = _now()
+        self._columns(table, ', '.join(data))
+        assignments = ', '.join(f'{column} = ?' for column in data)
+        where, params = self._where(table, filters)
+        with self._lock:
+            self._conn.execute(f'UPDATE {table} SET {assignments}{where}', list(data.values()) + params)
+        return self.select(table, '*', filters)
+
+    def update_in(self, table, data, column, values, filters=None):
+        data = dict(data)
+        values = list(values)
+        if not values:
+            return []
+        if self.tables[table].touch_on_update:
+            data['updated_at'] = _now()
+        self._columns(table, ', '.join(list(data) + [column]))
+        assignments = ', '.join(f'{name} = ?' for name in data)
+        where, params = self._where(table, filters)
+        clause = f'{column} IN ({", ".join("?" * len(values))})'
+        where = f'{where} AND {clause}' if where else f' WHERE {clause}'
+        with self._lock:
+            return self._rows(table, self._conn.execute(
+                f'UPDATE {table} SET {assignments}{where} RETURNING *', list(data.values()) + params + values
+            ))
+
+    def delete(self, table, filters):
+        where, params = self._where(table, filters)
+        rows = self.select(table, '*', filters)
+        with self._lock:
+            self._conn.execute(f'DELETE FROM {table}{where}', params)
+        return rows
+
+    def latest_change(self, table):
+        with self._lock:
+            count, latest = self._conn.execute(f'SELECT COUNT(*), MAX(updated_at) FROM {table}').fetchone()
+        return [count, latest]
+
+    def placement_summary(self):
+        with self._lock:
+            round_rows = self._conn.execute(
+                'SELECT company_id, max_round_reached, COUNT(*) FROM selected_students GROUP BY company_id, max_round_reached'
+            ).fetchall()
+            total_students = self._conn.execute('SELECT COUNT(DISTINCT student_number) FROM selected_students').fetchone()[0]
+            total_unique_offers = self._conn.execute(
+                'SELECT COUNT(DISTINCT student_number) FROM selected_students WHERE max_round_reached = ?', (OFFER_STATUS,)
+            ).fetchone()[0]
+        return build_summary(round_rows, total_students, total_unique_offers)
+
+    def companies_page(self, listing, columns):
+        clauses, params = [], []
+        if listing['q']:
+            clauses.append("name_search LIKE ? ESCAPE '\\'")
+            params.append(f"{escape_like(listing['q'].lower())}%")
+        if listing['min_ctc'] is not None:
+            clauses.append('ctc_lpa >= ?')
+            params.append(listing['min_ctc'])
+        if listing['max_years'] is not None:
+            clauses.append('agreement_years <= ?')
+            params.append(listing['max_years'])
+        where = ' WHERE ' + ' AND '.join(clauses) if clauses else ''
+
+        after = decode_cursor(listing['cursor'])
+        total = None
+        if not after:
+            with self._lock:
+                total = self._conn.execute(f'SELECT COUNT(*) FROM companies{where}', params).fetchone()[0]
+        else:
+            created_at, company_id = after
+            where += (' AND ' if where else ' WHERE ') + '(created_at < ? OR (created_at = ? AND id < ?))'
+            params += [created_at, created_at, company_id]
+
+        page_size = listing['per_page']
+        sql = f'SELECT {self._columns("companies", columns)} FROM companies{where} ORDER BY created_at DESC, id DESC LIMIT ?'
+        rows = self._query('companies', sql, params + [page_size + 1])
+        return page_result(rows, page_size, total)
@@ -0,0 +1,212 @@
+"""
+Model paper storage: uploads, signed upload URLs and object lookups.
+
+Model papers used to be read into memory, copied into a BytesIO (and possibly
+base64-encoded) and pushed through up to five storage3 upload() call
+signatures. SupabaseStorage talks to the Storage HTTP API directly instead, so
+there is no signature to guess, and sends the file from its stream in chunks:
+
+  files up to RESUMABLE_THRESHOLD  one POST /object/<bucket>/<path> with the
+                                   body streamed CHUNK_SIZE bytes at a time
+  larger files                     a TUS resumable upload (/upload/resumable)
+                                   in TUS_CHUNK_SIZE PATCHes; a failed chunk is
+                                   resumed from the offset the server reports
+                                   instead of restarting the whole file
+
+Werkzeug spools uploaded form files bigger than 500KB to a temporary file, so
+at most one chunk of the paper is held in memory. Every upload is timed and
+its throughput recorded (see MetricsRegistry.record_upload).
+
+Browsers can also skip the app entirely: create_signed_upload_url() returns a
+short-lived URL the browser PUTs the PDF to, and object_size() lets the
+finalize step check what actually arrived. local_storage.LocalStorage keeps
+the same contract on the local disk for offline development and tests.
+"""
+
+import base64
+import logging
+import threading
+import time
+
+logger = logging.getLogger('placement_tracker.storage_uploads')
+
+CHUNK_SIZE = 1024 * 1024
+# Supabase only accepts 6MB chunks for resumable uploads
+TUS_CHUNK_SIZE = 6 * 1024 * 1024
+RESUMABLE_THRESHOLD = TUS_CHUNK_SIZE
+MAX_CHUNK_RETRIES = 3
+
+
+class StorageError(Exception):
+    """Storage API returned an error; `status` is the HTTP status code"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+    @property
+    def bucket_missing(self):
+        return 'bucket not found' in str(self).lower()
+
+
+class UploadResult:
+    def __init__(self, path, size, seconds, resumable):
+        self.path = path
+        self.size = size
+        self.seconds = seconds
+        self.resumable = resumable
+
+    @property
+    def throughput(self):
+        """Bytes per second"""
+        return self.size / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        mode = 'resumable' if self.resumable else 'single request'
+        return f"{self.size / 1024:.0f} KB in {self.seconds:.2f} s ({self.throughput / 1024 / 1024:.2f} MB/s, {mode})"
+
+
+def _read_chunks(stream, size, chunk_size=CHUNK_SIZE):
+    remaining = size
+    while remaining > 0:
+        chunk = stream.read(min(chunk_size, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        yield chunk
+
+
+def _tus_metadata(values):
+    return ','.join(f'{key} {base64.b64encode(value.encode()).decode()}' for key, value in values.items())
+
+
+class SupabaseStorage:
+    """One Supabase Storage bucket, over a kept-alive HTTP client (the shared pool's when given)"""
+
+    def __init__(self, url, key, bucket, metrics=None, timeout=60, resumable_threshold=RESUMABLE_THRESHOLD, pool=None):
+        self.base_url = f"{url.rstrip('/')}/storage/v1"
+        self.bucket = bucket
+        self.metrics = metrics
+        self.timeout = timeout
+        self.resumable_threshold = resumable_threshold
+        self._headers = {'Authorization': f'Bearer {key}', 'apikey': key}
+        self.pool = pool  # supabase_clients.SharedPool, to share connections with the API clients
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _http(self):
+        # httpx is imported with the client, keep it off the cold start path
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    if self.pool is not None:
+                        self._client = self.pool.client(headers=self._headers, read_timeout=self.timeout)
+                    else:
+                        import httpx
+                        self._client = httpx.Client(headers=self._headers, timeout=self.timeout)
+        return self._client
+
+    @staticmethod
+    def _check(response):
+        if response.status_code >= 400:
+            try:
+                message = response.json().get('message') or response.text
+            except ValueError:
+                message = response.text
+            raise StorageError(f'Storage returned {response.status_code}: {message}', response.status_code)
+        return response
+
+    def upload(self, stream, path, size, content_type='application/pdf', cache_control='3600'):
+        """Upload `size` bytes read from `stream` to `path` in the bucket; returns an UploadResult"""
+        resumable = size > self.resumable_threshold
+        start = time.perf_counter()
+        failed = True
+        try:
+            if resumable:
+                self._upload_resumable(stream, path, size, content_type, cache_control)
+            else:
+                self._upload_single(stream, path, size, content_type, cache_control)
+            failed = False
+        finally:
+            elapsed = time.perf_counter() - start
+            if self.metrics is not None:
+                self.metrics.record_upload('resumable' if resumable else 'single', size, elapsed, failed)
+        return UploadResult(path, size, elapsed, resumable)
+
+    def _upload_single(self, stream, path, size, content_type, cache_control):
+        headers = {
+            'Content-Type': content_type,
+            'Content-Length': str(size),
+            'Cache-Control': f'max-age={cache_control}',
+            'x-upsert': 'false'
+        }
+        self._check(self._http().post(f'{self.base_url}/object/{self.bucket}/{path}',
+                                      content=_read_chunks(stream, size), headers=headers))
+
+    def _upload_resumable(self, stream, path, size, content_type, cache_control):
+        import httpx
+
+        http = self._http()
+        created = self._check(http.post(f'{self.base_url}/upload/resumable', headers={
+            'Tus-Resumable': '1.0.0',
+            'Upload-Length': str(size),
+            'Upload-Metadata': _tus_metadata({
+                'bucketName': self.bucket,
+                'objectName': path,
+                'contentType': content_type,
+                'cacheControl': cache_control
+            }),
+            'x-upsert': 'false'
+        }))
+        location = created.headers['Location']
+
+        offset = 0
+        attempts = 0
+        while offset < size:
+            stream.seek(offset)
+            chunk = stream.read(TUS_CHUNK_SIZE)
+            try:
+                response = self._check(http.patch(location, content=chunk, headers={
+                    'Tus-Resumable': '1.0.0',
+                    'Upload-Offset': str(offset),
+                    'Content-Type': 'application/offset+octet-stream'
+                }))
+                offset = int(response.headers['Upload-Offset'])
+                attempts = 0
+            except (httpx.TransportError, StorageError) as e:
+                attempts += 1
+                if attempts > MAX_CHUNK_RETRIES or (isinstance(e, StorageError) and e.status and e.status < 409):
+                    raise
+                logger.warning('Upload chunk at %s failed, resuming: %s', offset, e)
+                time.sleep(0.5 * attempts)
+                # Continue from whatever the server has stored
+                head = self._check(http.head(location, headers={'Tus-Resumable': '1.0.0'}))
+                offset = int(head.headers['Upload-Offset'])
+
+    def public_url(self, path):
+        return f'{self.base_url}/object/public/{self.bucket}/{path}'
+
+    def create_bucket(self, file_size_limit, allowed_mime_types):
+        self._check(self._http().post(f'{self.base_url}/bucket', json={
+            'id': self.bucket,
+            'name': self.bucket,
+            'public': True,
+            'file_size_limit': file_size_limit,
+            'allowed_mime_types': allowed_mime_types
+        }))
+
+    def create_signed_upload_url(self, path):
+        """URL a client can PUT the object to without credentials (Storage expires it after 2 hours)"""
+        response = self._check(self._http().post(f'{self.base_url}/object/upload/sign/{self.bucket}/{path}',
+                                                 headers={'x-upsert': 'false'}))
+        return f"{self.base_url}/{response.json()['url'].lstrip('/')}"
+
+    def object_size(self, path):
+        """Stored size in bytes, or None if the object doesn't exist"""
+        response = self._http().head(f'{self.base_url}/object/{self.bucket}/{path}')
+        if response.status_code in (400, 404):
+            return None
+        return int(self._check(response).headers['Content-Length'])
+
+    def delete(self, paths):
+        self._check(self._http().request('DELETE', f'{self.base_url}/object/{self.bucket}', json={'prefixes': list(paths)}))
@@ -0,0 +1,182 @@
+"""
+Bulk import of selected students from a CSV or XLSX result sheet.
+
+The sheet is read row by row (csv.reader over the upload stream, openpyxl in
+read-only mode), so a large file is never loaded into memory as a whole. The
+first non-empty row is the header; the column names of the Excel report
+('Student Name', 'Roll No', 'Email ID', 'Max Round/Offer') are accepted along
+with the database column names.
+
+Valid rows are checked against the company's existing roll numbers in one
+query and written with chunked upserts on (company_id, student_number):
+students already listed for the company are updated, new ones are inserted.
+Every rejected row is reported with its line number.
+"""
+
+import csv
+import io
+import re
+from datetime import datetime
+
+from placement_stats import OFFER_STATUS, OTHERS_STATUS, normalize_student_number
+
+IMPORT_EXTENSIONS = {'csv', 'xlsx'}
+UPSERT_BATCH_SIZE = 200
+MAX_IMPORT_ROWS = 5000
+
+REQUIRED_FIELDS = ('name', 'student_number', 'email', 'max_round_reached')
+
+# Header cell (lower-cased, letters only) -> selected_students column
+HEADER_ALIASES = {
+    'name': 'name',
+    'studentname': 'name',
+    'fullname': 'name',
+    'studentnumber': 'student_number',
+    'rollno': 'student_number',
+    'rollnumber': 'student_number',
+    'registrationnumber': 'student_number',
+    'email': 'email',
+    'emailid': 'email',
+    'emailaddress': 'email',
+    'linkedin': 'linkedin_id',
+    'linkedinid': 'linkedin_id',
+    'maxroundreached': 'max_round_reached',
+    'maxround': 'max_round_reached',
+    'maxroundoffer': 'max_round_reached',
+    'round': 'max_round_reached',
+    'roundreached': 'max_round_reached',
+    'status': 'max_round_reached'
+}
+
+
+def _cell_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _csv_rows(stream):
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.reader(text)
+    finally:
+        # Leave the upload stream open for Werkzeug to clean up
+        text.detach()
+
+
+def _xlsx_rows(stream):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def read_sheet(stream, filename):
+    """Yield (line number, [cell text, ...]) for each non-empty row of a CSV/XLSX upload"""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension not in IMPORT_EXTENSIONS:
+        raise ValueError('Upload a .csv or .xlsx file')
+    rows = _csv_rows(stream) if extension == 'csv' else _xlsx_rows(stream)
+    for line, row in enumerate(rows, 1):
+        cells = [_cell_text(value) for value in row]
+        if any(cells):
+            yield line, cells
+
+
+def round_values(company_rounds):
+    """Accepted spellings (lower-cased) -> stored max_round_reached value"""
+    values = {OFFER_STATUS.lower(): OFFER_STATUS, OTHERS_STATUS.lower(): OTHERS_STATUS}
+    for i, round_name in enumerate(company_rounds, 1):
+        values[f'round {i}'] = f'Round {i}'
+        values[str(i)] = f'Round {i}'
+        values.setdefault(round_name.strip().lower(), f'Round {i}')
+    return values
+
+
+def parse_students(rows, company_id, company_rounds, validate_number):
+    """Turn sheet rows into (records, errors).
+
+    records are (line, row dict) ready for upsert; errors are dicts with the
+    line, roll number and reason of each rejected row. Raises ValueError if the
+    header is missing a required column or the sheet is too long.
+    """
+    rows = iter(rows)
+    header_line, header = next(rows, (None, None))
+    if header is None:
+        raise ValueError('The file is empty')
+    columns = {}
+    for index, cell in enumerate(header):
+        field = HEADER_ALIASES.get(re.sub(r'[^a-z]', '', cell.lower()))
+        if field and field not in columns:
+            columns[field] = index
+    missing = [field for field in REQUIRED_FIELDS if field not in columns]
+    if missing:
+        raise ValueError(f'Missing column(s) on line {header_line}: {", ".join(missing)}')
+
+    rounds = round_values(company_rounds)
+    now = datetime.now().isoformat()
+    records, errors, seen = [], [], {}
+    for line, cells in rows:
+        if len(records) + len(errors) >= MAX_IMPORT_ROWS:
+            raise ValueError(f'Import at most {MAX_IMPORT_ROWS} students per file')
+        values = {field: cells[index] if index < len(cells) else '' for field, index in columns.items()}
+        student_number = normalize_student_number(values['student_number'])
+
+        def reject(reason):
+            errors.append({'row': line, 'student_number': student_number, 'error': reason})
+
+        empty = [field for field in REQUIRED_FIELDS if not values[field]]
+        if empty:
+            reject(f'Missing {", ".join(empty)}')
+            continue
+        if not validate_number(student_number):
+            reject('Invalid roll number format')
+            continue
+        max_round = rounds.get(values['max_round_reached'].lower())
+        if not max_round:
+            reject(f'Unknown round "{values["max_round_reached"]}"')
+            continue
+        if student_number in seen:
+            reject(f'Duplicate of line {seen[student_number]}')
+            continue
+        seen[student_number] = line
+
+        records.append((line, {
+            'company_id': company_id,
+            'name': values['name'],
+            'student_number': student_number,
+            'email': values['email'],
+            'linkedin_id': values.get('linkedin_id') or None,
+            'max_round_reached': max_round,
+            'updated_at': now
+        }))
+    return records, errors
+
+
+def import_students(student_repo, company_id, records, errors, batch_size=UPSERT_BATCH_SIZE):
+    """Upsert parsed records in batches; returns (written rows, added count, updated count).
+
+    A batch the database rejects is reported in `errors` row by row and the
+    remaining batches are still written.
+    """
+    existing = student_repo.numbers_taken(company_id, [row['student_number'] for _, row in records])
+    written, added, updated = [], 0, 0
+    for start in range(0, len(records), batch_size):
+        batch = records[start:start + batch_size]
+        try:
+            written.extend(student_repo.upsert_many([row for _, row in batch]))
+        except Exception as e:
+            errors.extend({'row': line, 'student_number': row['student_number'], 'error': f'Not saved: {str(e)}'} for line, row in batch)
+            continue
+        for _, row in batch:
+            if row['student_number'] in existing:
+                updated += 1
+            else:
+                added += 1
+    errors.sort(key=lambda error: error['row'])
+    return written, added, updated
@@ -1,6 +1,17 @@
 -- Student Details Table Schema for Placement Tracker
 -- Run this SQL command in your Supabase SQL editor
 
+-- MIGRATION SCRIPT (for an existing studentdetails table)
+/*
+-- Registration inserts directly and relies on the unique constraints to reject
+-- duplicates. Find existing duplicate roll numbers first with:
+-- SELECT student_number, COUNT(*) FROM studentdetails GROUP BY student_number HAVING COUNT(*) > 1;
+DROP INDEX IF EXISTS idx_studentdetails_student_number;
+CREATE UNIQUE INDEX idx_studentdetails_student_number ON studentdetails(student_number);
+-- The UNIQUE constraint on email already has an index
+DROP INDEX IF EXISTS idx_studentdetails_email;
+*/
+
 -- Create studentdetails table for student authentication
 CREATE TABLE studentdetails (
     id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
@@ -15,9 +26,8 @@ CREATE TABLE studentdetails (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
--- Create indexes for better performance
-CREATE INDEX idx_studentdetails_email ON studentdetails(email);
-CREATE INDEX idx_studentdetails_student_number ON studentdetails(student_number);
+-- One account per roll number (email is unique through its column constraint)
+CREATE UNIQUE INDEX idx_studentdetails_student_number ON studentdetails(student_number);
 
 -- Enable Row Level Security (RLS)
 ALTER TABLE studentdetails ENABLE ROW LEVEL SECURITY;
@@ -0,0 +1,167 @@
+"""
+Lazily constructed Supabase clients.
+
+Importing the supabase package and building a client costs a noticeable part
+of a serverless cold start. The proxies returned by build_clients() defer both
+until a route first touches the client, so pages that never query the database
+(/, /robots.txt, the login forms) don't pay for it.
+
+Both clients (and the model paper storage) send their HTTP calls through one
+SharedPool, so keep-alive connections and TLS sessions are reused across
+clients and requests. The pool size, keep-alive, timeouts, HTTP/2 and retry
+policy come from the SUPABASE_POOL_* settings; stats() reports connection
+reuse and pool waits for tuning them to the worker count. Sharing the pool
+needs supabase 2.16+ (SyncClientOptions.httpx_client); older releases get
+clients with their own connections.
+"""
+
+import importlib.util
+import logging
+import threading
+
+logger = logging.getLogger('placement_tracker.supabase_clients')
+
+
+class LazyClient:
+    """Proxy that builds the real client on first use.
+
+    Truthiness mirrors the old `supabase = None` convention: a proxy whose
+    client could not be created is falsy, so `if not supabase:` still works.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._client = None
+        self._created = False
+        self._lock = threading.Lock()
+
+    def _get(self):
+        if not self._created:
+            with self._lock:
+                if not self._created:
+                    self._client = self._factory()
+                    self._created = True
+        return self._client
+
+    def __getattr__(self, name):
+        client = self._get()
+        if client is None:
+            raise RuntimeError('Supabase client not initialized')
+        return getattr(client, name)
+
+    def __bool__(self):
+        return self._get() is not None
+
+
+class SharedPool:
+    """One httpx connection pool (see http_pool.PooledTransport), built on first use"""
+
+    def __init__(self, max_connections=20, max_keepalive=None, keepalive_expiry=60, http2=True,
+                 connect_timeout=5, read_timeout=30, pool_timeout=10, retries=2, backoff=0.2):
+        self.max_connections = max_connections
+        self.max_keepalive = max_connections if max_keepalive is None else max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        # HTTP/2 needs the h2 package; without it the pool quietly speaks HTTP/1.1
+        self.http2 = http2 and importlib.util.find_spec('h2') is not None
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.pool_timeout = pool_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._transport = None
+        self._lock = threading.Lock()
+
+    def transport(self):
+        if self._transport is None:
+            with self._lock:
+                if self._transport is None:
+                    import httpx
+                    from http_pool import PooledTransport
+                    self._transport = PooledTransport(
+                        retries=self.retries, backoff=self.backoff, http2=self.http2,
+                        limits=httpx.Limits(max_connections=self.max_connections,
+                                            max_keepalive_connections=self.max_keepalive,
+                                            keepalive_expiry=self.keepalive_expiry))
+        return self._transport
+
+    def client(self, headers=None, read_timeout=None):
+        """An httpx.Client over the shared transport (clients are cheap; the pool is shared)"""
+        import httpx
+        timeout = httpx.Timeout(connect=self.connect_timeout, read=read_timeout or self.read_timeout,
+                                write=read_timeout or self.read_timeout, pool=self.pool_timeout)
+        return httpx.Client(transport=self.transport(), headers=headers, timeout=timeout, follow_redirects=True)
+
+    def stats(self):
+        if self._transport is None:
+            return {'created': False}
+        open_connections, idle, queued = self._transport.connection_counts()
+        return {
+            'created': True,
+            'http2': self.http2,
+            'max_connections': self.max_connections,
+            'open_connections': open_connections,
+            'idle_connections': idle,
+            'queued_requests': queued,
+            **self._transport.stats.snapshot()
+        }
+
+    def metric_lines(self):
+        """Pool statistics in the Prometheus text format"""
+        stats = self.stats()
+        if not stats['created']:
+            return []
+        lines = ['# HELP placement_http_pool_connections Connections held by the Supabase HTTP pool',
+                 '# TYPE placement_http_pool_connections gauge',
+                 f'placement_http_pool_connections{{state="open"}} {stats["open_connections"]}',
+                 f'placement_http_pool_connections{{state="idle"}} {stats["idle_connections"]}',
+                 '# HELP placement_http_pool_queued_requests Requests waiting for a connection',
+                 '# TYPE placement_http_pool_queued_requests gauge',
+                 f'placement_http_pool_queued_requests {stats["queued_requests"]}']
+        for field, help_text in (('requests', 'Calls sent through the pool'),
+                                 ('new_connections', 'Calls that opened a new connection'),
+                                 ('reused_connections', 'Calls served on a kept-alive connection'),
+                                 ('tls_handshakes', 'TLS handshakes performed'),
+                                 ('http2_requests', 'Calls sent over HTTP/2'),
+                                 ('waits', 'Calls that waited for a free connection'),
+                                 ('wait_seconds', 'Time spent waiting for a free connection'),
+                                 ('retries', 'Calls retried after a failure'),
+                                 ('failures', 'Calls that failed after their retries')):
+            name = f'placement_http_pool_{field}_total'
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter', f'{name} {stats[field]:g}']
+        return lines
+
+
+def _create_client(url, key, pool=None):
+    try:
+        from supabase import create_client
+        if pool is None:
+            return create_client(url, key)
+        from supabase.lib.client_options import SyncClientOptions
+        try:
+            # The API key and JWT are sent per request, so both clients can share the pool
+            options = SyncClientOptions(httpx_client=pool.client())
+        except TypeError:
+            logger.warning('This supabase release has no httpx_client option (needs 2.16+); not using the shared pool')
+            return create_client(url, key)
+        return create_client(url, key, options=options)
+    except Exception as e:
+        logger.error('Error initializing Supabase client: %s', e)
+        return None
+
+
+def build_clients(url, anon_key, service_key=None, pool=None):
+    """Return (supabase, supabase_admin) proxies, or (None, None) without credentials"""
+    if not (url and anon_key):
+        return None, None
+
+    # Regular client for database operations
+    client = LazyClient(lambda: _create_client(url, anon_key, pool))
+
+    # Admin client for storage operations (if service key is available)
+    if service_key:
+        admin_client = LazyClient(lambda: _create_client(url, service_key, pool))
+    else:
+        logger.warning('SUPABASE_SERVICE_KEY not found. Storage operations may fail due to RLS policies.')
+        admin_client = client  # Fallback to regular client
+
+    return client, admin_client
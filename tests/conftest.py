@@ -0,0 +1,34 @@
+"""
+Fixtures that run the app on an in-memory SQLite backend (sqlite_backend.py),
+so the tests need no Supabase project or network.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('REQUEST_LOG', 'false')
+
+import app as placement_app
+from query_cache import QueryCache
+from repositories import Repositories
+from sqlite_backend import SQLiteBackend
+
+
+@pytest.fixture
+def repos(monkeypatch):
+    repos = Repositories(SQLiteBackend())
+    monkeypatch.setattr(placement_app, 'repos', repos)
+    monkeypatch.setattr(placement_app, 'query_cache', QueryCache())
+    return repos
+
+
+@pytest.fixture
+def admin_client(repos):
+    client = placement_app.app.test_client()
+    with client.session_transaction() as session:
+        session['admin_logged_in'] = True
+        session['admin_email'] = 'admin@placement.com'
+    return client
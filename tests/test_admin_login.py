@@ -0,0 +1,18 @@
+import logging
+
+import app as placement_app
+
+
+def test_admin_login_logs_no_passwords(repos, caplog, capsys):
+    repos.admins.backend.insert('admins', {'email': 'admin@placement.com', 'password_hash': 'hunter22'})
+    client = placement_app.app.test_client()
+    with caplog.at_level(logging.DEBUG, logger='placement_tracker'):
+        response = client.post('/admin/authenticate', data={'email': 'admin@placement.com', 'password': 'wrong-pass'})
+        assert response.status_code == 302
+        response = client.post('/admin/authenticate', data={'email': 'admin@placement.com', 'password': 'hunter22'})
+        assert response.headers['Location'].endswith('/admin/dashboard')
+
+    output = caplog.text + capsys.readouterr().out
+    assert 'admin@placement.com' in caplog.text
+    for secret in ('wrong-pass', 'hunter22', 'Bhargav@123'):
+        assert secret not in output
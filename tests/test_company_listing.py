@@ -0,0 +1,48 @@
+from company_listing import decode_cursor, encode_cursor, parse_listing_args
+
+SAME_TIME = '2026-01-05T10:00:00+00:00'
+
+
+def _companies(repos):
+    created = []
+    for i, (ctc, years) in enumerate([('4 LPA', 1), ('12.5 LPA', 2), ('8 LPA', 0), ('30 LPA', 3), ('6 LPA', 1)]):
+        # Three companies share a created_at, so the id tiebreak decides their order
+        created_at = SAME_TIME if i < 3 else f'2026-01-0{i + 3}T10:00:00+00:00'
+        created += repos.companies.create({'name': f'Company {i}', 'hiring_rounds': 'Aptitude', 'ctc_offer': ctc,
+                                           'agreement_years': years, 'created_at': created_at})
+    return created
+
+
+def _pages(repos, **args):
+    listing = parse_listing_args(dict(args, per_page='2'))
+    pages = [repos.companies.page(listing, 'id, name, created_at')]
+    while pages[-1]['next_cursor']:
+        listing['cursor'] = pages[-1]['next_cursor']
+        pages.append(repos.companies.page(listing, 'id, name, created_at'))
+    return pages
+
+
+def test_cursor_pages_visit_every_company_once_newest_first(repos):
+    created = _companies(repos)
+    pages = _pages(repos)
+    rows = [row for page in pages for row in page['rows']]
+
+    expected = sorted(created, key=lambda row: (row['created_at'], row['id']), reverse=True)
+    assert [row['id'] for row in rows] == [row['id'] for row in expected]
+    assert [len(page['rows']) for page in pages] == [2, 2, 1]
+    assert [page['total'] for page in pages] == [5, None, None]
+
+
+def test_filters_apply_on_every_page(repos):
+    _companies(repos)
+    rows = [row['name'] for page in _pages(repos, min_ctc='6', max_years='2') for row in page['rows']]
+    assert rows[0] == 'Company 4' and sorted(rows[1:]) == ['Company 1', 'Company 2']
+    assert [row['name'] for page in _pages(repos, q='company 3') for row in page['rows']] == ['Company 3']
+
+
+def test_cursor_round_trip_and_rejects_tampering():
+    row = {'created_at': SAME_TIME, 'id': '0b7c3c4e-5b7a-4f0e-9d8e-2a1f3c4d5e6f'}
+    assert decode_cursor(encode_cursor(row)) == (SAME_TIME, row['id'])
+    assert decode_cursor(encode_cursor({'created_at': '") or (1=1', 'id': row['id']})) is None
+    assert decode_cursor('not-a-cursor') is None
+    assert decode_cursor('') is None
@@ -0,0 +1,105 @@
+import smtplib
+import threading
+import time
+
+import pytest
+
+from email_outbox import EmailOutbox, SENT, FAILED, EXPIRED, PENDING
+
+
+class FakeConnection:
+    """Records sends and fails if two overlap, standing in for SMTPConnection"""
+
+    idle_timeout = 60
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.sent = []
+        self.overlaps = 0
+        self._busy = False
+
+    def send(self, message):
+        if self._busy:
+            self.overlaps += 1
+        self._busy = True
+        try:
+            time.sleep(0.005)
+            if self.errors:
+                raise self.errors.pop(0)
+            self.sent.append(message['To'])
+        finally:
+            self._busy = False
+
+    def close_if_idle(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def make_outbox(tmp_path):
+    def make(connection, **options):
+        return EmailOutbox(str(tmp_path / 'outbox.db'), connection, 'noreply@example.com', background=False, **options)
+    return make
+
+
+def _row(outbox, message_id):
+    rows, _ = outbox._execute('SELECT * FROM outbox WHERE id = ?', (message_id,))
+    return rows[0]
+
+
+def test_concurrent_inline_deliveries_do_not_share_the_session(make_outbox):
+    connection = FakeConnection()
+    outbox = make_outbox(connection, rate_per_minute=0)
+    ids = [outbox.enqueue(f'user{i}@example.com', 'OTP', 'code') for i in range(8)]
+    threads = [threading.Thread(target=outbox.deliver, args=(message_id,)) for message_id in ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert connection.overlaps == 0
+    assert len(connection.sent) == 8
+    assert outbox.stats() == {SENT: 8}
+
+
+def test_inline_delivery_over_the_rate_fails_without_sleeping(make_outbox):
+    outbox = make_outbox(FakeConnection(), rate_per_minute=1)
+    assert outbox.deliver(outbox.enqueue('a@example.com', 'OTP', 'code')) == SENT
+    started = time.monotonic()
+    second = outbox.enqueue('b@example.com', 'OTP', 'code')
+    assert outbox.deliver(second) == FAILED
+    assert time.monotonic() - started < 1
+    assert _row(outbox, second)['last_error'] == 'Send rate exceeded'
+
+
+def test_transient_failure_is_retried_with_backoff_until_max_attempts(make_outbox):
+    error = smtplib.SMTPServerDisconnected('dropped')
+    outbox = make_outbox(FakeConnection([error, error]), rate_per_minute=0, max_attempts=2, retry_delay=30)
+    message_id = outbox.enqueue('a@example.com', 'OTP', 'code')
+
+    assert outbox.deliver_due() == 1
+    row = _row(outbox, message_id)
+    assert (row['status'], row['attempts']) == (PENDING, 1)
+    assert row['next_attempt_at'] > time.time() + 25
+    assert outbox.deliver_due() == 0
+
+    outbox._execute('UPDATE outbox SET next_attempt_at = 0 WHERE id = ?', (message_id,))
+    assert outbox.deliver_due() == 1
+    assert _row(outbox, message_id)['status'] == FAILED
+
+
+def test_permanent_failure_is_not_retried(make_outbox):
+    connection = FakeConnection([smtplib.SMTPDataError(550, b'No such user')])
+    outbox = make_outbox(connection, rate_per_minute=0)
+    message_id = outbox.enqueue('a@example.com', 'OTP', 'code')
+    outbox.deliver_due()
+    assert _row(outbox, message_id)['status'] == FAILED
+
+
+def test_expired_message_is_dropped_unsent(make_outbox):
+    connection = FakeConnection()
+    outbox = make_outbox(connection, rate_per_minute=0)
+    message_id = outbox.enqueue('a@example.com', 'OTP', 'code', expires_at=time.time() - 1)
+    assert outbox.deliver(message_id) == EXPIRED
+    assert connection.sent == []
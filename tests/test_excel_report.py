@@ -0,0 +1,21 @@
+import openpyxl
+
+from excel_report import write_excel_report
+from placement_stats import PlacementStats, OFFER_STATUS
+
+
+def test_report_has_a_sheet_per_company_and_the_offer_lists(tmp_path):
+    companies = [{'id': 'c1', 'name': 'Acme: Labs', 'hiring_rounds': 'Aptitude', 'ctc_offer': '8 LPA', 'agreement_years': 1}]
+    students = [
+        {'company_id': 'c1', 'name': 'Asha', 'student_number': '22341A1201', 'email': 'a@gmrit.edu.in', 'max_round_reached': OFFER_STATUS},
+        {'company_id': 'c1', 'name': 'Ravi', 'student_number': '22341A1202', 'email': 'r@gmrit.edu.in', 'max_round_reached': 'Round 1'},
+    ]
+    path = str(tmp_path / 'report.xlsx')
+    assert write_excel_report(PlacementStats(companies, students), path) == path
+
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    assert workbook.sheetnames == ['Overall_Statistics', 'Company_Statistics', 'Acme_ Labs_Students',
+                                   'All_Students_With_Offers', 'Unique_Students_With_Offers']
+    offers = workbook['Unique_Students_With_Offers']
+    names = [row[0] for row in offers.iter_rows(min_row=3, values_only=True)]
+    assert names == ['Asha']
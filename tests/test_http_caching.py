@@ -0,0 +1,51 @@
+import app as placement_app
+
+
+def _company(repos):
+    return repos.companies.create({'name': 'Acme', 'hiring_rounds': 'Aptitude', 'ctc_offer': '8 LPA', 'agreement_years': 1})[0]
+
+
+def test_company_page_revalidates_with_etag(repos, admin_client):
+    company = _company(repos)
+    client = placement_app.app.test_client()
+    url = f"/company/{company['id']}"
+
+    first = client.get(url)
+    assert first.status_code == 200
+    assert first.headers['Cache-Control'].startswith('public, max-age=0, s-maxage=')
+    assert 'Cookie' in first.headers['Vary']
+    etag = first.headers['ETag']
+
+    again = client.get(url, headers={'If-None-Match': etag})
+    assert again.status_code == 304 and again.data == b''
+
+    admin_client.post(f"/admin/add_student/{company['id']}", data={
+        'name': 'Asha', 'student_number': '22341A1201', 'email': '22341a1201@gmrit.edu.in', 'max_round_reached': 'Round 1'})
+    changed = client.get(url, headers={'If-None-Match': etag})
+    assert changed.status_code == 200 and changed.headers['ETag'] != etag
+
+
+def test_logged_in_pages_are_private_with_their_own_etag(repos, admin_client):
+    company = _company(repos)
+    url = f"/company/{company['id']}"
+    public = placement_app.app.test_client().get(url)
+    admin = admin_client.get(url)
+    assert admin.headers['Cache-Control'] == 'private, no-cache'
+    assert admin.headers['ETag'] != public.headers['ETag']
+    assert admin_client.get(url, headers={'If-None-Match': public.headers['ETag']}).status_code == 200
+
+
+def test_pages_without_rows_hash_their_body():
+    client = placement_app.app.test_client()
+    first = client.get('/developers')
+    assert first.status_code == 200 and first.headers['ETag']
+    assert client.get('/developers', headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+
+
+def test_versioned_static_urls_are_immutable():
+    with placement_app.app.test_request_context():
+        url = placement_app.url_for('static', filename='css/style.css')
+    assert '?v=' in url
+    client = placement_app.app.test_client()
+    assert 'immutable' in client.get(url).headers['Cache-Control']
+    assert client.get('/static/css/style.css').headers['Cache-Control'] == 'public, max-age=3600'
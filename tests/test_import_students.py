@@ -0,0 +1,56 @@
+import io
+
+import app as placement_app
+from placement_stats import OFFER_STATUS
+
+
+def _import(client, company_id, csv_text):
+    return client.post(f'/admin/import_students/{company_id}',
+                       data={'file': (io.BytesIO(csv_text.encode('utf-8')), 'results.csv')},
+                       content_type='multipart/form-data')
+
+
+def test_import_downgrading_an_offer_holder_drops_cached_offer_list(repos, admin_client):
+    company = repos.companies.create({'name': 'Acme', 'hiring_rounds': 'Aptitude,Interview', 'ctc_offer': '8 LPA', 'agreement_years': 1})[0]
+    header = 'Student Name,Roll No,Email ID,Max Round/Offer\n'
+    assert _import(admin_client, company['id'], header + f'Asha,22341A1201,22341a1201@gmrit.edu.in,{OFFER_STATUS}\n').status_code == 200
+
+    offers = placement_app.cached_select('selected_students', max_round_reached=OFFER_STATUS)
+    assert [row['student_number'] for row in offers] == ['22341A1201']
+
+    assert _import(admin_client, company['id'], header + 'Asha,22341A1201,22341a1201@gmrit.edu.in,Round 1\n').status_code == 200
+
+    assert placement_app.cached_select('selected_students', max_round_reached=OFFER_STATUS) == []
+    assert repos.students.select(student_number='22341A1201')[0]['max_round_reached'] == 'Round 1'
+
+
+def _company(repos):
+    return repos.companies.create({'name': 'Acme', 'hiring_rounds': 'Aptitude,Interview', 'ctc_offer': '8 LPA', 'agreement_years': 1})[0]
+
+
+def test_import_updates_a_student_added_by_hand_in_lower_case(repos, admin_client):
+    company = _company(repos)
+    response = admin_client.post(f"/admin/add_student/{company['id']}", data={
+        'name': 'Asha', 'student_number': ' 22341a1201', 'email': '22341a1201@gmrit.edu.in', 'max_round_reached': 'Round 1'})
+    assert response.status_code == 302
+
+    header = 'Student Name,Roll No,Email ID,Max Round/Offer\n'
+    assert _import(admin_client, company['id'], header + 'Asha,22341A1201,22341a1201@gmrit.edu.in,Interview\n').status_code == 200
+
+    rows = repos.students.select(company_id=company['id'])
+    assert [(row['student_number'], row['max_round_reached']) for row in rows] == [('22341A1201', 'Round 2')]
+
+
+def test_import_reports_rejected_rows_by_line(repos, admin_client):
+    company = _company(repos)
+    csv_text = ('Student Name,Roll No,Email ID,Max Round/Offer\n'
+                'Asha,22341A1201,22341a1201@gmrit.edu.in,Aptitude\n'
+                'Ravi,bad,r@gmrit.edu.in,Aptitude\n'
+                'Asha again,22341a1201,22341a1201@gmrit.edu.in,Aptitude\n'
+                'Kiran,22341A1203,k@gmrit.edu.in,Final\n')
+    response = _import(admin_client, company['id'], csv_text)
+    assert response.status_code == 200
+    assert [row['student_number'] for row in repos.students.select(company_id=company['id'])] == ['22341A1201']
+    body = response.get_data(as_text=True)
+    for expected in ('Invalid roll number format', 'Duplicate of line 2', 'Unknown round'):
+        assert expected in body
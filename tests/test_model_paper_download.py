@@ -0,0 +1,26 @@
+import app as placement_app
+
+
+def _paper(repos, storage_key):
+    company = repos.companies.create({'name': 'Acme', 'hiring_rounds': 'Aptitude', 'ctc_offer': '8 LPA', 'agreement_years': 1})[0]
+    return repos.model_papers.create({'company_id': company['id'], 'paper_name': 'Aptitude', 'storage_key': storage_key,
+                                      'file_url': f'https://cdn.example.com/model-papers/{storage_key}', 'file_size': 10})[0]
+
+
+def test_download_redirects_by_exact_storage_key(repos):
+    _paper(repos, 'abc_paper.pdf')
+    client = placement_app.app.test_client()
+    response = client.get('/uploads/model_papers/abc_paper.pdf')
+    assert response.status_code == 302
+    assert response.headers['Location'] == 'https://cdn.example.com/model-papers/abc_paper.pdf'
+    assert 'max-age' in response.headers['Cache-Control']
+
+    # No substring matching: 'paper.pdf' is not a key, even though it ends one
+    assert client.get('/uploads/model_papers/paper.pdf').headers['Location'] == '/'
+
+
+def test_deleting_a_paper_drops_its_cached_download(repos, admin_client):
+    paper = _paper(repos, 'abc_paper.pdf')
+    assert admin_client.get('/uploads/model_papers/abc_paper.pdf').status_code == 302
+    admin_client.post(f"/admin/delete_model_paper/{paper['id']}")
+    assert admin_client.get('/uploads/model_papers/abc_paper.pdf').headers['Location'] == '/'
@@ -0,0 +1,73 @@
+import io
+
+import pytest
+
+import app as placement_app
+from local_storage import LocalStorage
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    storage = LocalStorage(str(tmp_path), placement_app.MODEL_PAPER_BUCKET, placement_app.app.secret_key,
+                           '/local-storage/storage/v1')
+    monkeypatch.setattr(placement_app, 'paper_storage', storage)
+    return storage
+
+
+@pytest.mark.parametrize('size', ['large', -1, [1]])
+def test_bad_sizes_are_rejected(admin_client, storage, size):
+    response = admin_client.post('/admin/model_papers/company-1/upload_url',
+                                 json={'paper_name': 'Aptitude', 'filename': 'paper.pdf', 'size': size})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid file size'
+
+
+def test_upload_url_is_issued(admin_client, storage):
+    response = admin_client.post('/admin/model_papers/company-1/upload_url',
+                                 json={'paper_name': 'Aptitude', 'filename': 'paper.pdf', 'size': 2048})
+    assert response.status_code == 200
+    assert response.get_json()['upload_url']
+
+
+@pytest.mark.parametrize('body', [['ticket'], 'ticket', {'ticket': 42}])
+def test_finalize_rejects_malformed_bodies(admin_client, storage, body):
+    response = admin_client.post('/admin/model_papers/company-1/finalize', json=body)
+    assert response.status_code == 400
+
+
+def test_finalize_rejects_a_signed_ticket_missing_fields(admin_client, storage):
+    ticket = placement_app.paper_upload_tickets.dumps({'company_id': 'company-1'})
+    response = admin_client.post('/admin/model_papers/company-1/finalize', json={'ticket': ticket})
+    assert response.status_code == 400
+
+
+def test_finalize_without_storage_is_unavailable(admin_client, monkeypatch):
+    monkeypatch.setattr(placement_app, 'paper_storage', None)
+    response = admin_client.post('/admin/model_papers/company-1/finalize', json={'ticket': 'x'})
+    assert response.status_code == 503
+
+
+def test_upload_then_finalize_records_the_paper(admin_client, storage, repos):
+    company = repos.companies.create({'name': 'Acme', 'hiring_rounds': 'Aptitude', 'ctc_offer': '8 LPA', 'agreement_years': 1})[0]
+    url = f"/admin/model_papers/{company['id']}"
+    issued = admin_client.post(f'{url}/upload_url', json={'paper_name': 'Aptitude', 'filename': 'paper.pdf', 'size': 9}).get_json()
+    # The browser's PUT to the signed URL
+    storage.upload(io.BytesIO(b'%PDF-1.4\n'), placement_app.paper_upload_tickets.loads(issued['ticket'])['path'], 9)
+
+    for _ in range(2):  # A double submit records the paper once
+        assert admin_client.post(f'{url}/finalize', json={'ticket': issued['ticket']}).status_code == 200
+    papers = repos.model_papers.select(company_id=company['id'])
+    assert [(paper['paper_name'], paper['file_size']) for paper in papers] == [('Aptitude', 9)]
+
+
+def test_form_upload_streams_the_file_to_storage(admin_client, storage, repos, tmp_path):
+    company = repos.companies.create({'name': 'Acme', 'hiring_rounds': 'Aptitude', 'ctc_offer': '8 LPA', 'agreement_years': 1})[0]
+    data = b'%PDF-1.4\n' + b'0' * 700 * 1024  # Past Werkzeug's in-memory limit, so it is spooled to disk
+    response = admin_client.post(f"/admin/upload_model_paper/{company['id']}",
+                                 data={'paper_name': 'Aptitude', 'model_paper': (io.BytesIO(data), 'paper.pdf')},
+                                 content_type='multipart/form-data')
+    assert response.status_code == 302
+
+    paper, = repos.model_papers.select(company_id=company['id'])
+    assert paper['file_size'] == len(data)
+    assert (tmp_path / placement_app.MODEL_PAPER_BUCKET / paper['storage_key']).read_bytes() == data
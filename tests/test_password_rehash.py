@@ -0,0 +1,33 @@
+import time
+
+from werkzeug.security import generate_password_hash
+
+import app as placement_app
+
+EMAIL = '22341a1200@gmrit.edu.in'
+
+
+def _student(repos, password_hash):
+    return repos.student_details.create({'email': EMAIL, 'password_hash': password_hash, 'full_name': 'Asha',
+                                         'student_number': '22341A1200', 'is_verified': True})[0]
+
+
+def test_login_upgrades_an_old_hash(repos):
+    _student(repos, generate_password_hash('password1', 'pbkdf2:sha256:1000'))
+    response = placement_app.app.test_client().post('/student/login', data={'email': EMAIL, 'password': 'password1'})
+    assert response.status_code == 302
+    # The rehash runs in the background
+    deadline = time.monotonic() + 5
+    while placement_app.password_hasher.needs_rehash(repos.student_details.get_by_email(EMAIL)['password_hash']):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_rehash_does_not_overwrite_a_password_reset(repos):
+    old_hash = generate_password_hash('password1', 'pbkdf2:sha256:1000')
+    student = _student(repos, old_hash)
+    reset_hash = generate_password_hash('password2')
+    repos.student_details.update_by_email(EMAIL, {'password_hash': reset_hash})
+
+    assert repos.student_details.replace_password_hash(student['id'], old_hash, generate_password_hash('password1')) == []
+    assert repos.student_details.get_by_email(EMAIL)['password_hash'] == reset_hash
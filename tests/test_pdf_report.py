@@ -0,0 +1,48 @@
+import io
+
+from pypdf import PdfReader
+
+import pdf_report
+from pdf_report import report_blocks, split_sections, write_pdf_report
+from placement_stats import PlacementStats, OFFER_STATUS
+
+
+def _stats(companies=6, students=40):
+    company_rows = [{'id': f'c{i}', 'name': f'Company {i}', 'hiring_rounds': 'Aptitude,Interview',
+                     'ctc_offer': '8 LPA', 'agreement_years': 1} for i in range(companies)]
+    student_rows = [{'company_id': f'c{i}', 'name': f'Student {i}-{j}', 'student_number': f'22341A{i:02d}{j:02d}',
+                     'email': 's@gmrit.edu.in', 'max_round_reached': OFFER_STATUS if j % 5 == 0 else 'Round 1'}
+                    for i in range(companies) for j in range(students)]
+    return PlacementStats(company_rows, student_rows)
+
+
+def _text(pdf_bytes):
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    return len(reader.pages), ''.join(page.extract_text() for page in reader.pages)
+
+
+def test_sections_are_contiguous_and_cover_every_block():
+    blocks = report_blocks(_stats())
+    sections = split_sections(blocks, 3)
+    assert len(sections) == 3
+    assert [block for section in sections for block in section] == blocks
+
+
+def test_serial_report_lists_every_company():
+    output = io.BytesIO()
+    write_pdf_report(_stats(), output, workers=0)
+    pages, text = _text(output.getvalue())
+    assert pages > 1
+    assert all(f'Company {i}' in text for i in range(6))
+
+
+def test_parallel_report_has_the_same_content(monkeypatch):
+    monkeypatch.setattr(pdf_report, 'MIN_PARALLEL_ROWS', 1)
+    serial, parallel = io.BytesIO(), io.BytesIO()
+    write_pdf_report(_stats(), serial, workers=0)
+    write_pdf_report(_stats(), parallel, workers=2)
+    try:
+        assert pdf_report._executor_workers == 2
+    finally:
+        pdf_report._discard_executor()
+    assert _text(parallel.getvalue())[1].replace('\n', '') == _text(serial.getvalue())[1].replace('\n', '')
@@ -0,0 +1,68 @@
+from placement_stats import PlacementStats, PlacementSummary, OFFER_STATUS, OTHERS_STATUS, summarize_students
+
+COMPANIES = [
+    {'id': 'c1', 'name': 'Acme', 'hiring_rounds': 'Aptitude, Interview'},
+    {'id': 'c2', 'name': 'Globex', 'hiring_rounds': 'Aptitude'},
+]
+STUDENTS = [
+    {'company_id': 'c1', 'name': 'Asha', 'student_number': '22341A1201', 'max_round_reached': OFFER_STATUS},
+    {'company_id': 'c1', 'name': 'Ravi', 'student_number': '22341A1202', 'max_round_reached': 'Round 2'},
+    {'company_id': 'c1', 'name': 'Kiran', 'student_number': '22341A1203', 'max_round_reached': 'Round 2'},
+    {'company_id': 'c1', 'name': 'Meena', 'student_number': '22341A1204', 'max_round_reached': OTHERS_STATUS},
+    {'company_id': 'c2', 'name': 'Asha', 'student_number': '22341A1201', 'max_round_reached': OFFER_STATUS},
+    {'company_id': 'c2', 'name': 'Ravi', 'student_number': '22341A1202', 'max_round_reached': OFFER_STATUS},
+]
+
+
+def test_totals_count_unique_roll_numbers():
+    stats = PlacementStats(COMPANIES, STUDENTS)
+    assert stats.total_companies == 2
+    assert stats.total_students == 4
+    assert stats.total_got_offers == 3
+    assert stats.total_unique_offers == 2
+    assert [row['company_id'] for row in stats.unique_students_with_offers] == ['c1', 'c2']
+
+
+def test_per_company_rounds_and_priority_order():
+    stats = PlacementStats(COMPANIES, STUDENTS)
+    assert stats.got_offer_count('c1') == 1 and stats.got_offer_count('c3') == 0
+    assert stats.round_summary(COMPANIES[0]) == ['Interview: 2']
+    assert [student['name'] for student in stats.students_for('c1')] == ['Asha', 'Kiran', 'Ravi', 'Meena']
+    assert stats.students_for('c1') is stats.students_for('c1')
+    assert stats.company_name('missing') == 'Unknown'
+
+
+def _sorted_summary(summary):
+    return dict(summary, companies=sorted(summary['companies'], key=lambda row: row['company_id']))
+
+
+def test_database_summary_matches_the_python_fallback(repos):
+    ids = {}
+    for company in COMPANIES:
+        ids[company['id']] = repos.companies.create({'name': company['name'], 'hiring_rounds': company['hiring_rounds'],
+                                                     'ctc_offer': '8 LPA', 'agreement_years': 1})[0]['id']
+    for student in STUDENTS:
+        repos.students.create(dict(student, company_id=ids[student['company_id']], email='x@gmrit.edu.in'))
+
+    summary = repos.students.placement_summary()
+    assert _sorted_summary(summary) == _sorted_summary(summarize_students(repos.students.select()))
+    assert (summary['total_students'], summary['total_got_offers'], summary['total_unique_offers']) == (4, 3, 2)
+
+
+def test_summary_lists_companies_with_students_first():
+    companies = COMPANIES + [{'id': 'c0', 'name': 'Initech', 'hiring_rounds': ''}]
+    stats = PlacementSummary(companies, summarize_students(STUDENTS)).company_stats()
+    assert list(stats) == ['c1', 'c2', 'c0']
+    assert stats['c1']['round_stats'] == {'Round 2': 2, OTHERS_STATUS: 1}
+    assert (stats['c1']['student_count'], stats['c1']['got_offer']) == (4, 1)
+    assert (stats['c0']['student_count'], stats['c0']['round_stats']) == (0, {})
+
+
+def test_reports_page_renders_the_summary(repos, admin_client):
+    company = repos.companies.create({'name': 'Acme', 'hiring_rounds': 'Aptitude', 'ctc_offer': '8 LPA', 'agreement_years': 1})[0]
+    repos.students.create({'company_id': company['id'], 'name': 'Asha', 'student_number': '22341A1201',
+                           'email': 'a@gmrit.edu.in', 'max_round_reached': OFFER_STATUS})
+    response = admin_client.get('/admin/reports')
+    assert response.status_code == 200
+    assert 'Error loading reports' not in response.get_data(as_text=True)
+    assert '22341A1201' in response.get_data(as_text=True)
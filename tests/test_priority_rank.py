@@ -0,0 +1,29 @@
+import pytest
+
+from placement_stats import OFFER_STATUS, OTHERS_STATUS, priority_rank, sort_students_by_priority
+
+
+@pytest.mark.parametrize('status, rank', [
+    (OFFER_STATUS, 0),
+    ('Round 3', 996),
+    ('Round 1', 998),
+    ('Round 0', 999),
+    ('Round -2', 999),
+    ('Round 5000', 1),
+    ('Round x', 1000),
+    (OTHERS_STATUS, 1000),
+    (None, 1000)
+])
+def test_priority_rank(status, rank):
+    assert priority_rank(status) == rank
+
+
+def test_round_one_sorts_ahead_of_round_zero():
+    students = [{'name': 'A', 'max_round_reached': 'Round 0'}, {'name': 'B', 'max_round_reached': 'Round 1'},
+                {'name': 'C', 'max_round_reached': OFFER_STATUS}]
+    assert [student['name'] for student in sort_students_by_priority(students)] == ['C', 'B', 'A']
+
+
+def test_round_zero_sorts_ahead_of_others():
+    students = [{'name': 'A', 'max_round_reached': OTHERS_STATUS}, {'name': 'B', 'max_round_reached': 'Round 0'}]
+    assert [student['name'] for student in sort_students_by_priority(students)] == ['B', 'A']
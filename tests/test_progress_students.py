@@ -0,0 +1,36 @@
+import pytest
+
+
+@pytest.fixture
+def company(repos):
+    company = repos.companies.create({'name': 'Acme', 'hiring_rounds': 'Aptitude,Interview', 'ctc_offer': '8 LPA', 'agreement_years': 1})[0]
+    repos.students.create({'company_id': company['id'], 'name': 'Asha', 'student_number': '22341A1201',
+                           'email': '22341a1201@gmrit.edu.in', 'max_round_reached': 'Round 1'})
+    return company
+
+
+@pytest.mark.parametrize('payload', [
+    [],
+    {'student_numbers': [123], 'max_round_reached': 'Interview'},
+    {'student_ids': 'abc', 'max_round_reached': 'Interview'},
+    {'student_numbers': ['22341A1201'], 'max_round_reached': 2}
+])
+def test_malformed_json_is_rejected(admin_client, company, payload):
+    response = admin_client.post(f'/admin/progress_students/{company["id"]}', json=payload)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_unknown_company_is_not_found(admin_client, company):
+    response = admin_client.post('/admin/progress_students/00000000-0000-0000-0000-000000000000',
+                                 json={'student_numbers': ['22341A1201'], 'max_round_reached': 'Interview'})
+    assert response.status_code == 404
+
+
+def test_students_move_to_the_new_round(admin_client, company, repos):
+    response = admin_client.post(f'/admin/progress_students/{company["id"]}',
+                                 json={'student_numbers': ['22341a1201', '22341A9999'], 'max_round_reached': 'interview'})
+    assert response.status_code == 200
+    result = response.get_json()
+    assert result['not_found'] == ['22341A9999']
+    assert repos.students.select(student_number='22341A1201')[0]['max_round_reached'] == result['max_round_reached'] == 'Round 2'
@@ -0,0 +1,39 @@
+import contextvars
+import threading
+
+import pytest
+
+from query_batch import fetch_all
+
+current_request = contextvars.ContextVar('current_request', default=None)
+
+
+def test_results_come_back_in_argument_order_and_run_concurrently():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def loader(value):
+        def load():
+            barrier.wait()  # Deadlocks (and times out) unless all three run at once
+            return value
+        return load
+
+    assert fetch_all(loader('a'), loader('b'), loader('c')) == ['a', 'b', 'c']
+
+
+def test_first_error_in_argument_order_is_raised_after_all_finish():
+    finished = []
+
+    def fail(message):
+        def load():
+            finished.append(message)
+            raise ValueError(message)
+        return load
+
+    with pytest.raises(ValueError, match='first'):
+        fetch_all(fail('first'), fail('second'), lambda: finished.append('ok'))
+    assert sorted(finished) == ['first', 'ok', 'second']
+
+
+def test_loaders_see_the_callers_context_vars():
+    current_request.set('request-1')
+    assert fetch_all(current_request.get, current_request.get) == ['request-1', 'request-1']
@@ -0,0 +1,64 @@
+from query_cache import QueryCache
+
+
+def test_load_racing_an_invalidate_is_not_stored():
+    cache = QueryCache()
+
+    def stale_load():
+        # A write lands while this read is in flight
+        cache.invalidate('companies', id='c1')
+        return [{'id': 'c1', 'name': 'Old name'}]
+
+    assert cache.get_or_load('companies', '*', {'id': 'c1'}, stale_load) == [{'id': 'c1', 'name': 'Old name'}]
+    assert cache.get_or_load('companies', '*', {'id': 'c1'}, lambda: [{'id': 'c1', 'name': 'New name'}]) == [
+        {'id': 'c1', 'name': 'New name'}]
+
+
+def test_invalidating_another_table_keeps_the_load():
+    cache = QueryCache()
+
+    def load():
+        cache.invalidate('model_papers', company_id='c1')
+        return [{'id': 'c1'}]
+
+    cache.get_or_load('companies', '*', {}, load)
+    assert cache.get_or_load('companies', '*', {}, lambda: []) == [{'id': 'c1'}]
+
+
+def _fill(cache, table, filters):
+    return cache.get_or_load(table, '*', filters, lambda: [dict(filters)])
+
+
+def test_invalidate_by_column_keeps_other_values():
+    cache = QueryCache()
+    _fill(cache, 'selected_students', {'company_id': 'c1'})
+    _fill(cache, 'selected_students', {'company_id': 'c2'})
+    _fill(cache, 'selected_students', {})
+    _fill(cache, 'companies', {'id': 'c1'})
+
+    cache.invalidate('selected_students', company_id='c1', max_round_reached='Round 1')
+
+    keys = {key[:1] + key[2:] for key in cache._entries}
+    assert keys == {('selected_students', (('company_id', 'c2'),)), ('companies', (('id', 'c1'),))}
+    assert cache.stats()['invalidations'] == 2
+
+
+def test_invalidate_rows_falls_back_when_a_write_returns_nothing():
+    cache = QueryCache()
+    _fill(cache, 'selected_students', {'company_id': 'c1'})
+    _fill(cache, 'selected_students', {'company_id': 'c2'})
+    cache.invalidate_rows('selected_students', [], company_id='c2')
+    assert [key[2] for key in cache._entries] == [(('company_id', 'c1'),)]
+
+
+def test_ttl_and_row_budget():
+    cache = QueryCache(max_rows=3, ttl=-1)
+    cache.get_or_load('companies', '*', {}, lambda: [1, 2])
+    assert cache.get(QueryCache.make_key('companies')) is None  # Already expired
+
+    cache = QueryCache(max_rows=3)
+    cache.get_or_load('companies', '*', {'id': 'a'}, lambda: [1, 2])
+    cache.get_or_load('companies', '*', {'id': 'b'}, lambda: [3, 4])
+    assert cache.stats()['rows'] == 2 and cache.stats()['evictions'] == 1
+    cache.get_or_load('companies', '*', {}, lambda: [1, 2, 3, 4])
+    assert cache.get(QueryCache.make_key('companies')) is None  # Bigger than the whole budget
@@ -0,0 +1,74 @@
+import pytest
+from flask import Flask
+
+import app as placement_app
+from rate_limiting import Limit, MemoryBucketStore, SQLiteBucketStore, RateLimiter, _take
+from request_metrics import MetricsRegistry
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    return MemoryBucketStore() if request.param == 'memory' else SQLiteBucketStore(str(tmp_path / 'buckets.db'))
+
+
+def test_tokens_are_taken_from_every_bucket_or_none():
+    # The second bucket is empty: the first keeps its tokens
+    wait, updated, slowest = _take([(3.0, 100.0), (0.0, 100.0)], [('a', 3, 1.0), ('b', 3, 0.5)], 100.0)
+    assert (wait, updated, slowest) == (2.0, None, 1)
+
+    wait, updated, _ = _take([None, (0.0, 100.0)], [('a', 3, 1.0), ('b', 3, 0.5)], 102.0)
+    assert wait == 0 and [tokens for tokens, _, _ in updated] == [2.0, 0.0]
+
+
+def test_store_refuses_past_capacity(store):
+    buckets = [('login:ip:x', 2, 2 / 60)]
+    assert store.take(buckets) == (0.0, 0)
+    assert store.take(buckets) == (0.0, 0)
+    wait, _ = store.take(buckets)
+    assert 0 < wait <= 30
+
+
+def _app(metrics, trusted_proxies=1):
+    app = Flask(__name__)
+    limiter = RateLimiter(MemoryBucketStore(), {'login': [Limit('ip', 5, 60), Limit('email', 2, 60)]}, metrics,
+                          trusted_proxies=trusted_proxies)
+    limiter.init_app(app)
+
+    @app.route('/login', methods=['GET', 'POST'])
+    def login():
+        return 'ok'
+
+    return app
+
+
+def test_email_limit_answers_429_with_retry_after():
+    metrics = MetricsRegistry()
+    client = _app(metrics).test_client()
+    for _ in range(2):
+        assert client.post('/login', data={'email': 'A@gmrit.edu.in'}).status_code == 200
+
+    throttled = client.post('/login', data={'email': 'a@gmrit.edu.in '})
+    assert throttled.status_code == 429
+    assert 1 <= int(throttled.headers['Retry-After']) <= 30
+    assert 'placement_rate_limited_total{endpoint="login",scope="email"} 1' in metrics.render()
+
+    # Another email still gets through, and GETs are never limited
+    assert client.post('/login', data={'email': 'b@gmrit.edu.in'}).status_code == 200
+    assert client.get('/login').status_code == 200
+
+
+def test_ip_limit_uses_the_address_added_by_the_trusted_proxy():
+    client = _app(MetricsRegistry()).test_client()
+    for i in range(5):
+        # A spoofed left-most entry must not give each request a fresh bucket
+        headers = {'X-Forwarded-For': f'10.0.0.{i}, 203.0.113.7'}
+        assert client.post('/login', headers=headers).status_code == 200
+    assert client.post('/login', headers={'X-Forwarded-For': '10.9.9.9, 203.0.113.7'}).status_code == 429
+    assert client.post('/login', headers={'X-Forwarded-For': '203.0.113.8'}).status_code == 200
+
+
+def test_app_throttles_password_guessing_before_the_view(repos, monkeypatch):
+    monkeypatch.setattr(placement_app.rate_limiter, 'store', MemoryBucketStore())
+    client = placement_app.app.test_client()
+    form = {'email': '22341a1201@gmrit.edu.in', 'password': 'guess'}
+    assert [client.post('/student/login', data=form).status_code for _ in range(6)] == [200] * 5 + [429]
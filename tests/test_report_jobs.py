@@ -0,0 +1,45 @@
+import app as placement_app
+from report_jobs import ArtifactStore, ReportJobs, DONE, FAILED
+
+
+def test_report_stats_skip_the_query_cache(repos):
+    company = repos.companies.create({'name': 'Acme', 'hiring_rounds': 'Aptitude', 'ctc_offer': '8 LPA', 'agreement_years': 1})[0]
+    assert placement_app.cached_select('selected_students') == []
+
+    # A write from another instance, which this process's cache never hears about
+    repos.students.create({'company_id': company['id'], 'name': 'Asha', 'student_number': '22341A1201',
+                           'email': '22341a1201@gmrit.edu.in', 'max_round_reached': 'Round 1'})
+
+    assert placement_app.cached_select('selected_students') == []
+    stats = placement_app.load_report_stats()
+    assert [row['student_number'] for row in stats.students] == ['22341A1201']
+
+
+def test_report_jobs_build_once_per_version(tmp_path):
+    builds = []
+
+    def build(path):
+        builds.append(path)
+        with open(path, 'w') as f:
+            f.write('report')
+
+    jobs = ReportJobs(ArtifactStore(str(tmp_path)), {'excel': build}, max_workers=1)
+    first = jobs.wait(jobs.submit('excel', 'v1')['id'], 5)
+    assert first['status'] == DONE
+    again = jobs.submit('excel', 'v1')
+    assert again['status'] == DONE and again['path'] == first['path']
+    assert len(builds) == 1
+
+    assert jobs.wait(jobs.submit('excel', 'v2')['id'], 5)['path'] != first['path']
+    assert len(builds) == 2
+
+
+def test_failed_build_leaves_no_artifact(tmp_path):
+    def build(path):
+        open(path, 'w').close()
+        raise RuntimeError('no data')
+
+    jobs = ReportJobs(ArtifactStore(str(tmp_path)), {'pdf': build}, max_workers=1)
+    job = jobs.wait(jobs.submit('pdf', 'v1')['id'], 5)
+    assert job['status'] == FAILED and job['error'] == 'no data'
+    assert list(tmp_path.iterdir()) == []
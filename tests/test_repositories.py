@@ -0,0 +1,59 @@
+import pytest
+
+from repositories import DuplicateKeyError
+
+
+def _company(repos, **fields):
+    data = {'name': 'Acme', 'hiring_rounds': 'Aptitude,Interview', 'ctc_offer': '12.5 LPA', 'agreement_years': 1}
+    return repos.companies.create(dict(data, **fields))[0]
+
+
+def _student(number, round_reached='Round 1', **fields):
+    return dict({'name': f'Student {number}', 'student_number': number, 'email': f'{number.lower()}@gmrit.edu.in',
+                 'max_round_reached': round_reached}, **fields)
+
+
+def test_insert_fills_defaults_and_generated_columns(repos):
+    company = _company(repos)
+    assert company['id'] and company['created_at']
+    assert repos.companies.get(company['id'], 'ctc_lpa, name_search') == {'ctc_lpa': 12.5, 'name_search': 'acme'}
+
+
+def test_students_come_back_in_priority_order_with_their_company(repos):
+    company = _company(repos)
+    for number, round_reached in (('22341A1201', 'Round 1'), ('22341A1202', 'Got Offer'), ('22341A1203', 'Round 2')):
+        repos.students.create(_student(number, round_reached, company_id=company['id']))
+
+    ordered = repos.students.for_company(company['id'], ordered=True)
+    assert [row['student_number'] for row in ordered] == ['22341A1202', '22341A1203', '22341A1201']
+    assert [row['priority_rank'] for row in ordered] == [0, 997, 998]
+
+    student = repos.students.get_with_company(ordered[0]['id'])
+    assert student['companies'] == {'name': 'Acme', 'hiring_rounds': 'Aptitude,Interview'}
+
+
+def test_upsert_updates_existing_roll_numbers_and_set_round_moves_them(repos):
+    company = _company(repos)
+    repos.students.create(_student('22341A1201', company_id=company['id']))
+    repos.students.upsert_many([_student('22341A1201', 'Round 2', company_id=company['id']),
+                                _student('22341A1202', company_id=company['id'])])
+    assert repos.students.numbers_taken(company['id'], ['22341A1201', '22341A1202', '22341A1209']) == {'22341A1201', '22341A1202'}
+    assert repos.students.select('max_round_reached', student_number='22341A1201') == [{'max_round_reached': 'Round 2'}]
+
+    moved = repos.students.set_round(company['id'], 'student_number', ['22341A1202'], 'Got Offer', '2026-01-01T00:00:00')
+    assert [(row['student_number'], row['priority_rank']) for row in moved] == [('22341A1202', 0)]
+
+
+def test_unique_violation_names_its_columns(repos):
+    company = _company(repos)
+    repos.students.create(_student('22341A1201', company_id=company['id']))
+    with pytest.raises(DuplicateKeyError) as error:
+        repos.students.create(_student('22341A1201', company_id=company['id']))
+    assert set(error.value.columns) == {'company_id', 'student_number'}
+
+
+def test_deleting_a_company_cascades_to_its_students(repos):
+    company = _company(repos)
+    repos.students.create(_student('22341A1201', company_id=company['id']))
+    repos.companies.delete(company['id'])
+    assert repos.students.select() == []
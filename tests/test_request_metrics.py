@@ -0,0 +1,56 @@
+import pytest
+from flask import Flask, g, render_template_string
+
+from query_batch import fetch_all
+from request_metrics import MetricsRegistry, InstrumentedBackend, init_app
+from sqlite_backend import SQLiteBackend
+
+
+def _app():
+    registry = MetricsRegistry()
+    backend = InstrumentedBackend(SQLiteBackend(), registry)
+    app = Flask(__name__)
+    init_app(app, registry, log_requests=False)
+    records = []
+
+    @app.route('/companies/<company_id>')
+    def company(company_id):
+        records.append(g.request_metrics)
+        fetch_all(lambda: backend.select('companies', '*', {'id': company_id}),
+                  lambda: backend.select('selected_students', '*', {'company_id': company_id}))
+        return render_template_string('{{ n }} rows', n=0)
+
+    return app, registry, records
+
+
+def test_queries_on_pool_threads_are_attributed_to_the_request():
+    app, registry, records = _app()
+    response = app.test_client().get('/companies/c1')
+    assert response.status_code == 200
+
+    record, = records
+    assert record.route == '/companies/<company_id>'
+    assert sorted(label for label, _ in record.queries) == ['companies.select', 'selected_students.select']
+    assert len(record.templates) == 1
+
+
+def test_registry_renders_prometheus_text():
+    app, registry, _ = _app()
+    client = app.test_client()
+    client.get('/companies/c1')
+    client.get('/companies/c2')
+    client.get('/missing')
+
+    text = registry.render()
+    assert 'placement_requests_total{route="/companies/<company_id>",method="GET",status="200"} 2' in text
+    assert 'placement_requests_total{route="unmatched",method="GET",status="404"} 1' in text
+    assert 'placement_request_queries_sum{route="/companies/<company_id>",method="GET"} 4.000000' in text
+    assert 'placement_query_duration_seconds_count{query="companies.select"} 2' in text
+
+
+def test_failed_queries_are_counted():
+    registry = MetricsRegistry()
+    backend = InstrumentedBackend(SQLiteBackend(), registry)
+    with pytest.raises(Exception):
+        backend.select('no_such_table', '*', {})
+    assert 'placement_query_errors_total{query="no_such_table.select"} 1' in registry.render()
@@ -0,0 +1,83 @@
+import pytest
+from flask import Flask, session
+
+from session_store import MemoryStore, SQLiteStore, ServerSideSessionInterface, ProfileCache
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    return MemoryStore() if request.param == 'memory' else SQLiteStore(str(tmp_path / 'sessions.db'))
+
+
+def test_store_round_trips_and_expires(store):
+    store.set('session:a', {'student_id': 's1', 'at': (1, 2)}, 60)
+    assert store.get('session:a') == {'student_id': 's1', 'at': (1, 2)}
+    store.set('session:b', {'x': 1}, -1)
+    assert store.get('session:b') is None
+    store.delete('session:a')
+    assert store.get('session:a') is None
+
+
+def _app(store):
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.session_interface = ServerSideSessionInterface(store)
+
+    @app.route('/login/<student_id>')
+    def login(student_id):
+        session['student_id'] = student_id
+        return 'ok'
+
+    @app.route('/visit')
+    def visit():
+        session['visits'] = session.get('visits', 0) + 1
+        return str(session.get('student_id'))
+
+    @app.route('/logout')
+    def logout():
+        session.clear()
+        return 'bye'
+
+    return app
+
+
+def _sid(client):
+    return client.get_cookie('session').value.split('.')[0]
+
+
+def test_session_lives_on_the_server_and_login_rotates_the_id():
+    store = MemoryStore()
+    client = _app(store).test_client()
+    client.get('/visit')
+    before = _sid(client)
+    assert store.get(f'session:{before}') == {'visits': 1}
+
+    client.get('/login/s1')
+    after = _sid(client)
+    assert after != before
+    assert store.get(f'session:{before}') is None
+    assert client.get('/visit').get_data(as_text=True) == 's1'
+
+    client.get('/logout')
+    assert store.get(f'session:{after}') is None
+    assert client.get_cookie('session') is None
+
+
+def test_forged_session_cookie_is_ignored():
+    client = _app(MemoryStore()).test_client()
+    client.set_cookie('session', 'planted.signature')
+    assert client.get('/visit').get_data(as_text=True) == 'None'
+
+
+def test_profile_cache_reads_through_and_invalidates():
+    loads = []
+    row = {'id': 's1', 'email': 'a@gmrit.edu.in', 'full_name': 'Asha', 'student_number': '22341A1201',
+           'is_verified': True, 'created_at': '2026-01-01', 'password_hash': 'secret'}
+    cache = ProfileCache(MemoryStore(), lambda student_id: loads.append(student_id) or row)
+
+    assert cache.get('s1')['full_name'] == 'Asha'
+    assert 'password_hash' not in cache.get('s1')
+    assert loads == ['s1'] and cache.stats()['hits'] == 1
+    cache.invalidate('s1')
+    cache.get('s1')
+    assert loads == ['s1', 's1']
@@ -0,0 +1,43 @@
+import gzip
+
+import app as placement_app
+from sitemap import SitemapCache, build_sitemaps
+
+COMPANIES = [{'id': f'c{i}', 'updated_at': f'2026-01-0{i + 1}T10:00:00+00:00'} for i in range(3)]
+
+
+def test_split_sitemap_has_an_index():
+    documents = build_sitemaps('https://example.com', COMPANIES, max_urls=2)
+    assert sorted(documents) == ['sitemap-1.xml', 'sitemap-2.xml', 'sitemap-3.xml', 'sitemap.xml']
+    index = documents['sitemap.xml'].body.decode()
+    assert '<sitemapindex' in index and 'https://example.com/sitemap-3.xml' in index
+    assert '<lastmod>2026-01-03</lastmod>' in documents['sitemap-3.xml'].body.decode()
+    assert gzip.decompress(documents['sitemap-2.xml'].gzipped) == documents['sitemap-2.xml'].body
+
+
+def test_cache_rebuilds_only_when_the_version_changes():
+    cache = SitemapCache()
+    loads = []
+
+    def load():
+        loads.append(1)
+        return COMPANIES
+
+    first = cache.get('https://example.com', [3, 'v1'], load)
+    assert cache.get('https://example.com', [3, 'v1'], load) is first
+    cache.get('https://example.com', [4, 'v2'], load)
+    assert len(loads) == cache.builds == 2
+
+
+def test_sitemap_route_picks_up_new_companies_and_serves_gzip(repos, admin_client, monkeypatch):
+    monkeypatch.setattr(placement_app, 'sitemaps', SitemapCache())
+    client = placement_app.app.test_client()
+    assert '/company/' not in client.get('/sitemap.xml', headers={'Accept-Encoding': 'identity'}).get_data(as_text=True)
+
+    admin_client.post('/admin/add_company', data={'name': 'Acme', 'hiring_rounds': 'Aptitude', 'ctc_offer': '8 LPA',
+                                                   'agreement_years': '1'})
+    company, = repos.companies.select('id')
+    response = client.get('/sitemap.xml', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert f"/company/{company['id']}" in gzip.decompress(response.data).decode()
+    assert client.get('/sitemap.xml', headers={'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']}).status_code == 304
@@ -0,0 +1,82 @@
+import io
+
+import httpx
+import pytest
+
+import storage_uploads
+from request_metrics import MetricsRegistry
+from storage_uploads import StorageError, SupabaseStorage
+
+BASE = 'https://project.supabase.co/storage/v1'
+
+
+class FakeStorageServer:
+    """Just enough of the Storage API: single uploads and TUS uploads that can drop a PATCH"""
+
+    def __init__(self, fail_patches=0):
+        self.fail_patches = fail_patches
+        self.objects = {}
+        self.uploads = {}
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append((request.method, request.url.path))
+        path = request.url.path
+        if request.method == 'POST' and path == '/storage/v1/upload/resumable':
+            self.uploads['u1'] = bytearray()
+            return httpx.Response(201, headers={'Location': f'{BASE}/upload/resumable/u1'})
+        if path == '/storage/v1/upload/resumable/u1':
+            upload = self.uploads['u1']
+            if request.method == 'PATCH':
+                assert int(request.headers['Upload-Offset']) == len(upload)
+                body = request.read()
+                if self.fail_patches:
+                    # Half the chunk arrived before the connection broke
+                    self.fail_patches -= 1
+                    upload.extend(body[:len(body) // 2])
+                    return httpx.Response(502, json={'message': 'Bad gateway'})
+                upload.extend(body)
+            return httpx.Response(204 if request.method == 'PATCH' else 200, headers={'Upload-Offset': str(len(upload))})
+        if request.method == 'POST' and path.startswith('/storage/v1/object/papers/'):
+            self.objects[path.rsplit('/', 1)[1]] = request.read()
+            return httpx.Response(200, json={'Key': path})
+        return httpx.Response(404, json={'message': 'Not found'})
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    monkeypatch.setattr(storage_uploads, 'TUS_CHUNK_SIZE', 1000)
+    monkeypatch.setattr(storage_uploads.time, 'sleep', lambda seconds: None)
+
+    def make(server):
+        storage = SupabaseStorage('https://project.supabase.co', 'key', 'papers', MetricsRegistry(), resumable_threshold=1500)
+        storage._client = httpx.Client(transport=httpx.MockTransport(server))
+        return storage
+    return make
+
+
+def test_small_files_go_up_in_one_request(storage):
+    server = FakeStorageServer()
+    data = b'%PDF' + b'x' * 996
+    result = storage(server).upload(io.BytesIO(data), 'a.pdf', len(data))
+    assert not result.resumable
+    assert server.objects == {'a.pdf': data}
+
+
+def test_large_files_resume_from_the_server_offset(storage):
+    server = FakeStorageServer(fail_patches=1)
+    data = bytes(range(256)) * 16
+    store = storage(server)
+    result = store.upload(io.BytesIO(data), 'b.pdf', len(data))
+    assert result.resumable
+    assert bytes(server.uploads['u1']) == data
+    assert ('HEAD', '/storage/v1/upload/resumable/u1') in server.requests
+    assert 'placement_storage_upload_bytes_total{mode="resumable"} 4096' in store.metrics.render()
+
+
+def test_failed_uploads_are_counted(storage):
+    store = storage(lambda request: httpx.Response(400, json={'message': 'Bucket not found'}))
+    with pytest.raises(StorageError) as error:
+        store.upload(io.BytesIO(b'x' * 10), 'c.pdf', 10)
+    assert error.value.bucket_missing
+    assert 'placement_storage_upload_errors_total{mode="single"} 1' in store.metrics.render()
@@ -0,0 +1,42 @@
+import pytest
+
+import app as placement_app
+from repositories import DuplicateKeyError, SupabaseBackend
+
+FORM = {'full_name': 'Asha', 'student_number': '22341a1201', 'email': '22341A1201@gmrit.edu.in',
+        'password': 'password1', 'confirm_password': 'password1'}
+
+
+def _register(**fields):
+    return placement_app.app.test_client().post('/student/register', data=dict(FORM, **fields))
+
+
+def test_register_then_duplicates_are_named(repos):
+    assert _register().status_code == 302
+    student = repos.student_details.get_by_email('22341a1201@gmrit.edu.in')
+    assert student['student_number'] == '22341A1201'
+
+    assert 'Email already registered' in _register(student_number='22341A1202').get_data(as_text=True)
+    assert 'Student number already registered' in _register(email='22341a1202@gmrit.edu.in').get_data(as_text=True)
+    assert len(repos.student_details.select()) == 1
+
+
+def test_supabase_unique_violation_becomes_duplicate_key_error():
+    class APIError(Exception):
+        code = '23505'
+        details = 'Key (email)=(a@gmrit.edu.in) already exists.'
+
+    class Query:
+        def insert(self, data):
+            return self
+
+        def execute(self):
+            raise APIError('duplicate key value violates unique constraint')
+
+    class Client:
+        def table(self, name):
+            return Query()
+
+    with pytest.raises(DuplicateKeyError) as error:
+        SupabaseBackend(Client()).insert('studentdetails', {'email': 'a@gmrit.edu.in'})
+    assert error.value.columns == ('email',)
@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+
+import pytest
+import supabase
+from supabase.lib import client_options
+
+import supabase_clients
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakePool:
+    def client(self):
+        return 'shared-httpx-client'
+
+
+def test_client_uses_the_shared_pool(monkeypatch):
+    calls = []
+    monkeypatch.setattr(supabase, 'create_client', lambda url, key, options=None: calls.append(options) or 'client')
+    assert supabase_clients._create_client('https://x.supabase.co', 'key', FakePool()) == 'client'
+    assert calls[0].httpx_client == 'shared-httpx-client'
+
+
+def test_older_supabase_gets_a_client_without_the_pool(monkeypatch):
+    class OldSyncClientOptions:
+        def __init__(self, schema='public'):
+            self.schema = schema
+
+    calls = []
+    monkeypatch.setattr(client_options, 'SyncClientOptions', OldSyncClientOptions)
+    monkeypatch.setattr(supabase, 'create_client', lambda url, key, options=None: calls.append(options) or 'client')
+    assert supabase_clients._create_client('https://x.supabase.co', 'key', FakePool()) == 'client'
+    assert calls == [None]
+
+
+def test_lazy_client_builds_once_on_first_use():
+    calls = []
+
+    class Client:
+        def table(self, name):
+            return name
+
+    client = supabase_clients.LazyClient(lambda: calls.append(1) or Client())
+    assert calls == []
+    assert client.table('companies') == 'companies'
+    assert client and calls == [1]
+
+
+def test_lazy_client_that_failed_is_falsy():
+    client = supabase_clients.LazyClient(lambda: None)
+    assert not client
+    with pytest.raises(RuntimeError):
+        client.table('companies')
+
+
+def test_clients_are_not_built_without_credentials():
+    assert supabase_clients.build_clients('', '') == (None, None)
+
+
+def test_importing_the_app_loads_no_report_libraries():
+    code = 'import sys, app; print(sorted(m for m in ("reportlab", "xlsxwriter", "pypdf", "supabase") if m in sys.modules))'
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True,
+                            env=dict(os.environ, REQUEST_LOG='false'))
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == '[]'